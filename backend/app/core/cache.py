@@ -0,0 +1,72 @@
+"""
+MindSupport Backend - In-Process Cache
+Small TTL + LRU cache shared by the caching layers
+"""
+from collections import OrderedDict
+from typing import Any, Hashable, Iterator, Optional, Tuple
+import time
+
+
+class TTLCache:
+    """Per-process cache with TTL expiry, LRU eviction and hit/miss counters."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def replace(self, key: Hashable, value: Any):
+        """Swap the value of a live entry without extending its TTL."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries[key] = (entry[0], value)
+
+    def items(self) -> Iterator[Tuple[Hashable, Any]]:
+        """Snapshot of live entries (does not touch LRU order or counters)."""
+        now = time.monotonic()
+        return iter([(key, value) for key, (expires_at, value) in self._entries.items() if expires_at > now])
+
+    def delete(self, key: Hashable):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
@@ -2,7 +2,7 @@
 MindSupport Backend - Configuration Settings
 """
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 import os
 
 
@@ -23,11 +23,87 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 1440  # 24 hours
     
-    # OpenAI
+    # Password hashing
+    BCRYPT_ROUNDS: int = 12  # Existing hashes are upgraded on next login
+    PASSWORD_HASH_WORKERS: int = 4  # Threads for bcrypt work
+    
+    # Authenticated user cache (per worker, invalidated on account changes)
+    USER_CACHE_ENABLED: bool = True
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAX_ENTRIES: int = 10000
+    
+    # Admin statistics
+    STATS_RECONCILE_INTERVAL_SECONDS: int = 600  # Recount counters to correct drift
+    
+    # Forum read cache (per worker; writes invalidate it locally)
+    FORUM_CACHE_ENABLED: bool = True
+    FORUM_CACHE_TTL_SECONDS: int = 30  # Bounds staleness across workers
+    FORUM_CACHE_MAX_ENTRIES: int = 512
+    
+    # Read coalescing (per worker): identical reads in flight share one query
+    READ_COALESCING_ENABLED: bool = True
+    
+    # Forum real-time events (per worker)
+    FORUM_EVENTS_QUEUE_SIZE: int = 64  # Pending events per client before it is evicted
+    FORUM_EVENTS_MAX_SUBSCRIBERS: int = 10000
+    FORUM_EVENTS_HEARTBEAT_SECONDS: int = 20
+    
+    # Observability (per worker; scrape every worker or run one)
+    METRICS_ENABLED: bool = False  # /metrics endpoint plus request and MongoDB timing
+    METRICS_TOKEN: str = ""  # When set, /metrics requires "Authorization: Bearer <token>"
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"  # json | text
+    LOG_QUEUE_SIZE: int = 10000  # Records waiting for the writer thread; extra ones are dropped
+    LOG_EVENT_BURST: int = 20  # Max records per event per second (0 = unlimited)
+    LOG_REQUEST_SAMPLE_RATE: float = 0.01  # Share of ordinary requests logged; errors and slow ones always are
+    LOG_SLOW_REQUEST_MS: int = 1000
+    LOG_SLOW_MONGO_MS: int = 200
+    
+    # Pagination
+    COUNT_CACHE_TTL_SECONDS: int = 15  # How long list totals may be reused
+    POST_COMMENTS_PAGE_SIZE: int = 20  # Comments returned with a post detail
+    
+    # LLM provider: gemini | openai | stub
+    LLM_PROVIDER: str = "gemini"
+    LLM_MAX_CONCURRENCY: int = 32  # Max in-flight model calls per worker
+    FALLBACK_INTENTS_FILE: str = ""  # Intent table for offline replies (empty = bundled)
+    
+    # LLM deadlines and circuit breaker (per worker)
+    LLM_TIMEOUT_SECONDS: float = 30.0  # Whole reply, including the wait for a concurrency slot
+    LLM_FIRST_TOKEN_TIMEOUT_SECONDS: float = 10.0  # Streams: until the first chunk
+    LLM_STREAM_IDLE_TIMEOUT_SECONDS: float = 15.0  # Streams: between chunks
+    LLM_HEDGE_AFTER_SECONDS: float = 0.0  # Start a second attempt if no reply/first chunk yet (0 = off)
+    LLM_BREAKER_FAILURE_THRESHOLD: int = 5  # Consecutive failures or slow calls that open the breaker
+    LLM_BREAKER_SLOW_CALL_SECONDS: float = 15.0  # Calls slower than this count as failures
+    LLM_BREAKER_OPEN_SECONDS: float = 30.0  # Serve fallbacks this long before probing again
+    
+    # OpenAI (or any OpenAI-compatible server via OPENAI_BASE_URL)
     OPENAI_API_KEY: str = ""
+    OPENAI_MODEL: str = "gpt-4o-mini"
+    OPENAI_BASE_URL: str = ""
     
     # Google Gemini
     GEMINI_API_KEY: str = ""
+    GEMINI_MODEL: str = "gemini-2.5-flash-lite"
+    
+    # Stub provider (offline load tests): time to first token, then streamed tokens
+    LLM_STUB_LATENCY_DISTRIBUTION: str = "lognormal"  # fixed | uniform | normal | lognormal
+    LLM_STUB_LATENCY_MS: float = 800  # Median time to first token
+    LLM_STUB_LATENCY_SPREAD: float = 0.5  # lognormal sigma / normal stddev / uniform +- (fractions)
+    LLM_STUB_TOKENS_PER_SECOND: float = 50
+    LLM_STUB_REPLY_TOKENS: int = 120
+    LLM_STUB_ERROR_RATE: float = 0.0  # Probability a call fails
+    LLM_STUB_SEED: Optional[int] = None
+    
+    # Chat context
+    CHAT_CONTEXT_TOKEN_BUDGET: int = 3000  # Prompt budget incl. system prompt and summary
+    CHAT_SUMMARY_MAX_TOKENS: int = 300  # Size of the rolling per-session summary
+    
+    # Chat response cache (only for context-free openers, never crisis messages)
+    CHAT_CACHE_ENABLED: bool = True
+    CHAT_CACHE_TTL_SECONDS: int = 3600
+    CHAT_CACHE_MAX_ENTRIES: int = 1000
+    CHAT_CACHE_SAFE_MESSAGES: str = "halo,hai,hi,hello,hallo,pagi,selamat pagi,selamat siang,selamat sore,selamat malam,aku cemas,aku sedih,aku stress,aku lelah,aku bingung"
     
     # CORS
     CORS_ORIGINS: str = "http://localhost:3000,http://127.0.0.1:3000"
@@ -36,6 +112,10 @@ class Settings(BaseSettings):
     def cors_origins_list(self) -> List[str]:
         return [origin.strip() for origin in self.CORS_ORIGINS.split(",")]
     
+    @property
+    def chat_cache_safe_messages_list(self) -> List[str]:
+        return [message.strip() for message in self.CHAT_CACHE_SAFE_MESSAGES.split(",")]
+    
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -0,0 +1,339 @@
+"""
+MindSupport Backend - Structured Logging
+JSON log lines written by a background thread, with request IDs and per-event sampling
+"""
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+import atexit
+import json
+import logging
+import queue
+import random
+import re
+import sys
+import time
+import uuid
+
+from pymongo import monitoring
+
+from app.core.config import settings
+from app.core.metrics import log_records_dropped
+
+
+ROOT_LOGGER = "mindsupport"
+REQUEST_ID_HEADER = b"x-request-id"
+_VALID_REQUEST_ID = re.compile(rb"[A-Za-z0-9._:-]{1,64}")
+
+# Set per request by RequestContextMiddleware; Motor copies it into its worker threads
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+
+# ==================== Formatting (runs on the writer thread) ====================
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, event, message, request ID and fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "event": getattr(record, "event", None),
+            "message": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            entry["request_id"] = request_id
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable variant for local development (LOG_FORMAT=text)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = dict(getattr(record, "fields", {}))
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            fields["request_id"] = request_id
+        extras = " ".join(f"{key}={value}" for key, value in fields.items())
+        line = f"{self.formatTime(record)} {record.levelname:<7} {getattr(record, 'event', '-')}: {record.getMessage()}"
+        if extras:
+            line += f" [{extras}]"
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+# ==================== Queue ====================
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Hands records to the writer thread without ever blocking the caller.
+
+    Only the message is rendered here (so later mutation of the arguments
+    can't change it); JSON encoding and the write happen on the listener
+    thread. When the queue is full the record is dropped and counted.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            log_records_dropped.inc("queue_full")
+
+
+class EventSampler:
+    """
+    Caps how often one event is logged: at most `burst` records per event
+    per second. The number suppressed is attached to the first record of
+    the next second, so error storms stay visible without flooding stdout.
+
+    Counts are approximate when threads race; that is fine for sampling.
+    """
+
+    def __init__(self, burst: int):
+        self.burst = burst
+        # event -> [window start, records emitted, records suppressed]
+        self._windows: Dict[str, list] = {}
+
+    def admit(self, event: str) -> Optional[int]:
+        """None to drop the record, otherwise how many were suppressed before it."""
+        if self.burst <= 0:
+            return 0
+
+        now = time.monotonic()
+        window = self._windows.get(event)
+        if window is None or now - window[0] >= 1.0:
+            suppressed = window[2] if window else 0
+            self._windows[event] = [now, 1, 0]
+            return suppressed
+
+        if window[1] < self.burst:
+            window[1] += 1
+            return 0
+
+        window[2] += 1
+        log_records_dropped.inc("sampled")
+        return None
+
+
+class EventLogger:
+    """
+    Logger for named events with structured fields.
+
+        log = get_logger("llm")
+        log.warning("llm_error", "LLM call failed", provider="gemini", error=str(e))
+
+    The request ID is captured at call time. Sampling happens before a
+    LogRecord is built, so suppressed events cost almost nothing.
+    """
+
+    def __init__(self, logger: logging.Logger, sampler: EventSampler):
+        self.logger = logger
+        self.sampler = sampler
+
+    def debug(self, event: str, message: str, **fields):
+        self._log(logging.DEBUG, event, message, fields)
+
+    def info(self, event: str, message: str, **fields):
+        self._log(logging.INFO, event, message, fields)
+
+    def warning(self, event: str, message: str, **fields):
+        self._log(logging.WARNING, event, message, fields)
+
+    def error(self, event: str, message: str, **fields):
+        self._log(logging.ERROR, event, message, fields)
+
+    def exception(self, event: str, message: str, **fields):
+        """Log at ERROR with the active exception's traceback."""
+        self._log(logging.ERROR, event, message, fields, exc_info=True)
+
+    def _log(self, level: int, event: str, message: str, fields: dict, exc_info: bool = False):
+        if not self.logger.isEnabledFor(level):
+            return
+        suppressed = self.sampler.admit(event)
+        if suppressed is None:
+            return
+        if suppressed:
+            fields["suppressed"] = suppressed
+        # makeRecord + handle skips Logger.log's stack walk for the caller's file and line
+        record = self.logger.makeRecord(
+            self.logger.name,
+            level,
+            "",
+            0,
+            message,
+            None,
+            sys.exc_info() if exc_info else None,
+            extra={"event": event, "fields": fields, "request_id": request_id_var.get()}
+        )
+        self.logger.handle(record)
+
+
+# ==================== Setup ====================
+
+_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=max(1, settings.LOG_QUEUE_SIZE))
+_listener: Optional[QueueListener] = None
+_sampler = EventSampler(settings.LOG_EVENT_BURST)
+
+
+def setup_logging():
+    """Attach the queue handler and start the writer thread (idempotent)."""
+    global _listener
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(TextFormatter() if settings.LOG_FORMAT == "text" else JSONFormatter())
+    _listener = QueueListener(_queue, output)
+    _listener.start()
+
+    root = logging.getLogger(ROOT_LOGGER)
+    if not any(isinstance(handler, NonBlockingQueueHandler) for handler in root.handlers):
+        root.addHandler(NonBlockingQueueHandler(_queue))
+    root.setLevel(settings.LOG_LEVEL.upper())
+    root.propagate = False
+
+
+def shutdown_logging():
+    """Write out queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def get_logger(name: str) -> EventLogger:
+    return EventLogger(logging.getLogger(f"{ROOT_LOGGER}.{name}"), _sampler)
+
+
+setup_logging()
+atexit.register(shutdown_logging)
+
+
+# ==================== Request context ====================
+
+access_log = get_logger("http")
+
+
+def _incoming_request_id(scope) -> Optional[str]:
+    """A well-formed X-Request-ID from the client or proxy, if any."""
+    for name, value in scope["headers"]:
+        if name == REQUEST_ID_HEADER:
+            return value.decode("ascii") if _VALID_REQUEST_ID.fullmatch(value) else None
+    return None
+
+
+class RequestContextMiddleware:
+    """
+    ASGI middleware giving every request an ID and an access log line.
+
+    The ID comes from X-Request-ID when a proxy supplies one, is echoed in
+    the response header, and is attached to every log record written while
+    serving the request (router, MongoDB and LLM layers alike). Server
+    errors and slow requests are always logged; other requests are sampled
+    at LOG_REQUEST_SAMPLE_RATE. Server-Sent Events responses stay open by
+    design, so their duration never makes them "slow".
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = _incoming_request_id(scope) or uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+        status = 500  # Reported when the app raises before responding
+        event_stream = False
+
+        async def send_with_request_id(message):
+            nonlocal status, event_stream
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                event_stream = any(
+                    name == b"content-type" and value.startswith(b"text/event-stream")
+                    for name, value in message.get("headers", ())
+                )
+                message["headers"] = [*message.get("headers", ()), (REQUEST_ID_HEADER, request_id.encode("ascii"))]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        except Exception:
+            access_log.exception("unhandled_error", "Unhandled error while serving request", path=scope["path"])
+            raise
+        finally:
+            self._log_request(scope, status, (time.perf_counter() - started) * 1000, event_stream)
+            request_id_var.reset(token)
+
+    @staticmethod
+    def _log_request(scope, status: int, duration_ms: float, event_stream: bool = False):
+        if status >= 500:
+            log = access_log.error
+        elif duration_ms >= settings.LOG_SLOW_REQUEST_MS and not event_stream:
+            log = access_log.warning
+        elif random.random() < settings.LOG_REQUEST_SAMPLE_RATE:
+            log = access_log.info
+        else:
+            return
+
+        route = getattr(scope.get("route"), "path_format", "unmatched")
+        log(
+            "http_request",
+            f"{scope['method']} {route} {status}",
+            method=scope["method"],
+            route=route,
+            path=scope["path"],
+            status=status,
+            duration_ms=round(duration_ms, 2)
+        )
+
+
+# ==================== MongoDB ====================
+
+class MongoCommandLogger(monitoring.CommandListener):
+    """Logs failed and slow MongoDB commands with the request that issued them."""
+
+    def __init__(self):
+        self.log = get_logger("mongodb")
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        duration_ms = event.duration_micros / 1000
+        if duration_ms >= settings.LOG_SLOW_MONGO_MS:
+            self.log.warning(
+                "mongo_slow_command",
+                f"Slow MongoDB {event.command_name}",
+                command=event.command_name,
+                database=event.database_name,
+                duration_ms=round(duration_ms, 2)
+            )
+
+    def failed(self, event):
+        self.log.warning(
+            "mongo_command_failed",
+            f"MongoDB {event.command_name} failed",
+            command=event.command_name,
+            database=event.database_name,
+            duration_ms=round(event.duration_micros / 1000, 2),
+            error=str(event.failure.get("errmsg", event.failure))
+        )
+
+
+mongo_command_logger = MongoCommandLogger()
@@ -0,0 +1,359 @@
+"""
+MindSupport Backend - Metrics
+In-process counters, gauges and histograms rendered in the Prometheus text format
+"""
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Sequence, Tuple
+import threading
+import time
+
+from pymongo import monitoring
+
+
+# Latency buckets in seconds: sub-millisecond cache hits up to slow LLM calls
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+DB_LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric(ABC):
+    """
+    Base for labelled metrics; children are keyed by label values.
+
+    Metrics updated only from the event loop skip locking. Pass
+    `thread_safe=True` for metrics fed from other threads (pymongo calls
+    command listeners from Motor's worker threads).
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (), thread_safe: bool = False):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock() if thread_safe else None
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+        yield from self._samples()
+
+    @abstractmethod
+    def _samples(self) -> Iterable[str]:
+        """Sample lines in the exposition format."""
+
+
+class Counter(Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (), thread_safe: bool = False):
+        super().__init__(name, documentation, labels, thread_safe)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1):
+        if self._lock is None:
+            self._values[labels] = self._values.get(labels, 0) + amount
+            return
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def _samples(self) -> Iterable[str]:
+        # list() of a dict view runs without releasing the GIL
+        for labels, value in sorted(list(self._values.items())):
+            yield f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    """Value that goes up and down (e.g. requests in flight)."""
+
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels: str, value: float):
+        self._values[labels] = value
+
+
+class Histogram(Metric):
+    """
+    Bucketed observations with sum and count.
+
+    Buckets are stored non-cumulatively so an observation is one bisect and
+    two additions; they are made cumulative only when rendered.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+        thread_safe: bool = False
+    ):
+        super().__init__(name, documentation, labels, thread_safe)
+        self.buckets = tuple(sorted(buckets))
+        self._bound_texts = [_format_value(bound) for bound in self.buckets] + ["+Inf"]
+        # label values -> [bucket counts..., +Inf count, sum]
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, *labels: str):
+        if self._lock is None:
+            self._observe(value, labels)
+            return
+        with self._lock:
+            self._observe(value, labels)
+
+    def _observe(self, value: float, labels: LabelValues):
+        entry = self._values.get(labels)
+        if entry is None:
+            entry = self._values[labels] = [0] * (len(self.buckets) + 2)
+        entry[bisect_left(self.buckets, value)] += 1
+        entry[-1] += value
+
+    def count(self, *labels: str) -> int:
+        entry = self._values.get(labels)
+        return int(sum(entry[:-1])) if entry else 0
+
+    def _samples(self) -> Iterable[str]:
+        snapshot = sorted((labels, list(entry)) for labels, entry in list(self._values.items()))
+        for labels, entry in snapshot:
+            label_text = _format_labels(self.label_names, labels)
+            # Label text without the closing brace, so `le` can be appended
+            bucket_prefix = f"{self.name}_bucket{label_text[:-1]}," if label_text else f"{self.name}_bucket{{"
+            cumulative = 0
+            for bound_text, count in zip(self._bound_texts, entry):
+                cumulative += count
+                yield f'{bucket_prefix}le="{bound_text}"}} {cumulative}'
+            yield f"{self.name}_sum{label_text} {_format_value(entry[-1])}"
+            yield f"{self.name}_count{label_text} {cumulative}"
+
+
+class MetricsRegistry:
+    """Holds every metric of this worker and renders them for /metrics."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def counter(self, name: str, documentation: str, labels: Sequence[str] = (), thread_safe: bool = False) -> Counter:
+        return self._register(Counter(name, documentation, labels, thread_safe))
+
+    def gauge(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labels))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+        thread_safe: bool = False
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labels, buckets, thread_safe))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric: Metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+
+registry = MetricsRegistry()
+
+
+# ==================== HTTP ====================
+
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template and status code",
+    ("method", "route", "status")
+)
+http_requests_in_progress = registry.gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being served (includes open SSE streams)",
+    ("method",)
+)
+
+# ==================== MongoDB ====================
+
+mongo_command_duration = registry.histogram(
+    "mongodb_command_duration_seconds",
+    "MongoDB command latency by collection and command",
+    ("collection", "command"),
+    DB_LATENCY_BUCKETS,
+    thread_safe=True
+)
+mongo_command_failures = registry.counter(
+    "mongodb_command_failures_total",
+    "MongoDB commands that returned an error",
+    ("collection", "command"),
+    thread_safe=True
+)
+
+# ==================== Read coalescing ====================
+
+singleflight_calls = registry.counter(
+    "singleflight_calls_total",
+    "Coalesced reads: leaders ran the query, followers shared a query already in flight",
+    ("group", "role")
+)
+
+# ==================== LLM ====================
+
+llm_request_duration = registry.histogram(
+    "llm_request_duration_seconds",
+    "LLM call latency (whole reply) by provider, operation and outcome",
+    ("provider", "operation", "outcome")
+)
+llm_time_to_first_token = registry.histogram(
+    "llm_time_to_first_token_seconds",
+    "Time until a streamed LLM reply produced its first chunk",
+    ("provider",)
+)
+llm_requests_in_progress = registry.gauge(
+    "llm_requests_in_progress",
+    "LLM calls in flight, including those waiting for a concurrency slot",
+    ("provider",)
+)
+llm_tokens = registry.counter(
+    "llm_tokens_total",
+    "LLM tokens sent and received, estimated from characters",
+    ("provider", "direction")
+)
+llm_errors = registry.counter(
+    "llm_errors_total",
+    "LLM calls that raised, by provider, operation and exception type",
+    ("provider", "operation", "error")
+)
+llm_fallback_responses = registry.counter(
+    "llm_fallback_responses_total",
+    "Replies served by the offline fallback instead of the model",
+    ("reason",)
+)
+
+llm_hedged_requests = registry.counter(
+    "llm_hedged_requests_total",
+    "LLM calls that started a second attempt, by which attempt answered first",
+    ("provider", "winner")
+)
+circuit_breaker_state = registry.gauge(
+    "circuit_breaker_state",
+    "Circuit breaker state: 0 closed, 1 half-open, 2 open",
+    ("breaker",)
+)
+circuit_breaker_transitions = registry.counter(
+    "circuit_breaker_transitions_total",
+    "Circuit breaker state changes, by the state entered",
+    ("breaker", "state")
+)
+
+# ==================== Logging ====================
+
+log_records_dropped = registry.counter(
+    "log_records_dropped_total",
+    "Log records not written, because the queue was full or the event was sampled out",
+    ("reason",),
+    thread_safe=True
+)
+
+# ==================== Recording ====================
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing every HTTP request.
+
+    Requests are labelled with the matched route template (e.g.
+    /forum/posts/{post_id}), read from the scope after routing, so label
+    cardinality stays bounded; unmatched paths share one label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500  # Reported when the app raises before responding
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_requests_in_progress.inc(method)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_progress.dec(method)
+            route = getattr(scope.get("route"), "path_format", "unmatched")
+            http_request_duration.observe(time.perf_counter() - started, method, route, str(status))
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """
+    pymongo command listener recording latency per collection and command.
+
+    The collection is only part of the started event, so it is kept until
+    the matching succeeded/failed event arrives.
+    """
+
+    def __init__(self):
+        self._collections: Dict[Tuple, str] = {}
+
+    def started(self, event):
+        command_name = event.command_name
+        collection = event.command.get("collection" if command_name == "getMore" else command_name)
+        self._collections[(event.connection_id, event.request_id)] = (
+            collection if isinstance(collection, str) else "none"
+        )
+
+    def succeeded(self, event):
+        collection = self._collections.pop((event.connection_id, event.request_id), "none")
+        mongo_command_duration.observe(event.duration_micros / 1e6, collection, event.command_name)
+
+    def failed(self, event):
+        collection = self._collections.pop((event.connection_id, event.request_id), "none")
+        mongo_command_duration.observe(event.duration_micros / 1e6, collection, event.command_name)
+        mongo_command_failures.inc(collection, event.command_name)
+
+
+mongo_command_metrics = MongoCommandMetrics()
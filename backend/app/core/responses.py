@@ -0,0 +1,28 @@
+"""
+MindSupport Backend - JSON Responses
+Send bodies that the endpoint has already serialized
+"""
+from typing import Any, Dict, Optional
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+
+# Serializer for plain dicts and lists (datetimes become ISO 8601, like FastAPI's encoder)
+_plain_json = TypeAdapter(Any)
+
+
+def dump_plain_json(value: Any) -> bytes:
+    return _plain_json.dump_json(value)
+
+
+def json_response(body: bytes, headers: Optional[Dict[str, str]] = None) -> Response:
+    """
+    Wrap a serialized JSON body in a response.
+
+    FastAPI returns Response objects untouched, so the route's
+    response_model is neither validated nor encoded a second time; it only
+    documents the schema. Bodies must be compact UTF-8 JSON, which is what
+    FastAPI itself sends.
+    """
+    return Response(content=body, media_type="application/json", headers=headers)
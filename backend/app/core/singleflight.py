@@ -0,0 +1,75 @@
+"""
+MindSupport Backend - Single-Flight
+Collapses concurrent identical reads into one backend query
+"""
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+import asyncio
+
+from app.core.config import settings
+from app.core.metrics import singleflight_calls
+
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Per-process request coalescing for one kind of read.
+
+    The first caller for a key starts the load; callers arriving while it
+    is in flight await the same result instead of querying again. The
+    load runs in its own task, so a caller that disconnects doesn't cancel
+    it for everyone else. Results are shared between callers and must be
+    treated as read-only; overlay per-user fields on a copy.
+
+    This only merges loads that overlap in time. Keeping a result around
+    afterwards is the job of the caches in front of it.
+    """
+
+    def __init__(self, name: str, enabled: bool = True):
+        self.name = name
+        self.enabled = enabled
+        self._inflight: Dict[Hashable, "asyncio.Task"] = {}
+
+    async def do(self, key: Hashable, load: Callable[[], Awaitable[T]]) -> T:
+        if not self.enabled:
+            return await load()
+
+        task = self._inflight.get(key)
+        if task is None:
+            singleflight_calls.inc(self.name, "leader")
+            task = asyncio.ensure_future(load())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            singleflight_calls.inc(self.name, "follower")
+        return await asyncio.shield(task)
+
+    def forget(self, key: Hashable):
+        """
+        Make the next caller start a fresh load (e.g. after a write).
+
+        The forgotten load still runs to completion for the callers already
+        waiting on it, so a load that caches its result must itself check
+        that no write happened meanwhile (see ForumCache.generation).
+        """
+        self._inflight.pop(key, None)
+
+    def forget_all(self):
+        self._inflight.clear()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._inflight)
+
+    def _finish(self, key: Hashable, task: "asyncio.Task"):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception retrieved even if every caller went away
+        if not task.cancelled():
+            task.exception()
+
+
+def single_flight(name: str) -> SingleFlight:
+    """A SingleFlight group that honours READ_COALESCING_ENABLED."""
+    return SingleFlight(name, enabled=settings.READ_COALESCING_ENABLED)
@@ -0,0 +1,363 @@
+"""
+MindSupport Backend - Database Migrations
+Versioned index/schema migrations applied idempotently at startup
+"""
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Tuple
+import asyncio
+import uuid
+
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING, IndexModel, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from app.core.logging import get_logger
+from app.models.forum import COMMENT_PREVIEW_SIZE
+from app.services.user_search import build_search_fields
+
+
+Migration = Tuple[int, str, Callable[[AsyncIOMotorDatabase], Awaitable[None]]]
+
+MIGRATIONS_COLLECTION = "schema_migrations"
+
+# Lease document in MIGRATIONS_COLLECTION; only its holder runs migrations
+LEASE_ID = "lease"
+LEASE_SECONDS = 60  # Renewed while migrations run; taken over if the holder dies
+LEASE_POLL_SECONDS = 1.0
+
+log = get_logger("migrations")
+
+
+# ==================== Migrations ====================
+
+async def _create_initial_indexes(database: AsyncIOMotorDatabase):
+    """Indexes for every query shape used by the routers."""
+    await database["users"].create_indexes([
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        IndexModel([("nim", ASCENDING)], name="nim_unique", unique=True),
+        IndexModel([("created_at", DESCENDING)], name="created_at_desc"),
+    ])
+
+    await database["chats"].create_indexes([
+        IndexModel([("session_id", ASCENDING)], name="session_id_unique", unique=True),
+        IndexModel([("user_id", ASCENDING), ("updated_at", DESCENDING)], name="user_updated"),
+        IndexModel([("updated_at", DESCENDING)], name="updated_at_desc"),
+    ])
+
+    await database["posts"].create_indexes([
+        IndexModel([("is_deleted", ASCENDING), ("created_at", DESCENDING)], name="feed"),
+        IndexModel(
+            [("is_deleted", ASCENDING), ("mood", ASCENDING), ("created_at", DESCENDING)],
+            name="feed_by_mood"
+        ),
+        IndexModel([("created_at", DESCENDING)], name="created_at_desc"),
+        IndexModel([("user_id", ASCENDING)], name="user_id"),
+    ])
+
+    await database["reports"].create_indexes([
+        IndexModel([("status", ASCENDING), ("created_at", DESCENDING)], name="status_created"),
+        IndexModel([("created_at", DESCENDING)], name="created_at_desc"),
+        IndexModel([("post_id", ASCENDING), ("reporter_id", ASCENDING)], name="post_reporter"),
+    ])
+
+
+async def _create_keyset_indexes(database: AsyncIOMotorDatabase):
+    """Extend list indexes with _id so keyset pagination needs no in-memory sort."""
+    await database["users"].create_indexes([
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created_id"),
+    ])
+    await database["chats"].create_indexes([
+        IndexModel(
+            [("user_id", ASCENDING), ("updated_at", DESCENDING), ("_id", DESCENDING)],
+            name="user_updated_id"
+        ),
+    ])
+    await database["posts"].create_indexes([
+        IndexModel(
+            [("is_deleted", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="feed_id"
+        ),
+        IndexModel(
+            [("is_deleted", ASCENDING), ("mood", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="feed_by_mood_id"
+        ),
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created_id"),
+    ])
+    await database["reports"].create_indexes([
+        IndexModel(
+            [("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="status_created_id"
+        ),
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created_id"),
+    ])
+
+    # The new indexes cover every query the old prefixes served
+    await _drop_indexes(database, {
+        "users": ["created_at_desc"],
+        "chats": ["user_updated"],
+        "posts": ["feed", "feed_by_mood", "created_at_desc"],
+        "reports": ["status_created", "created_at_desc"],
+    })
+
+
+async def _drop_indexes(database: AsyncIOMotorDatabase, indexes: Dict[str, List[str]]):
+    """Drop indexes by name, ignoring ones that no longer exist."""
+    for collection, names in indexes.items():
+        existing = await database[collection].index_information()
+        for name in names:
+            if name in existing:
+                await database[collection].drop_index(name)
+
+
+async def _move_likes_to_collection(database: AsyncIOMotorDatabase):
+    """Move embedded post likes to post_likes and add like/comment counters."""
+    posts = database["posts"]
+    likes = database["post_likes"]
+
+    await likes.create_indexes([
+        IndexModel([("post_id", ASCENDING), ("user_id", ASCENDING)], name="post_user_unique", unique=True),
+    ])
+
+    cursor = posts.find(
+        {"$or": [{"likes": {"$exists": True}}, {"like_count": {"$exists": False}}]},
+        {"likes": 1, "comments": 1, "created_at": 1}
+    )
+    async for post in cursor:
+        post_id = str(post["_id"])
+        user_ids = list(dict.fromkeys(post.get("likes", [])))  # Dedupe, keep order
+
+        if user_ids:
+            try:
+                await likes.insert_many(
+                    [
+                        {"post_id": post_id, "user_id": user_id, "created_at": post["created_at"]}
+                        for user_id in user_ids
+                    ],
+                    ordered=False
+                )
+            except BulkWriteError:
+                pass  # Already copied by an interrupted earlier run
+
+        await posts.update_one(
+            {"_id": post["_id"]},
+            {
+                "$set": {
+                    "like_count": len(user_ids),
+                    "comment_count": len(post.get("comments", []))
+                },
+                "$unset": {"likes": ""}
+            }
+        )
+
+
+async def _move_chat_messages_to_collection(database: AsyncIOMotorDatabase):
+    """Move embedded session messages to chat_messages and add session summaries."""
+    chats = database["chats"]
+    messages = database["chat_messages"]
+
+    await messages.create_indexes([
+        IndexModel(
+            [("session_id", ASCENDING), ("timestamp", ASCENDING), ("_id", ASCENDING)],
+            name="session_timestamp"
+        ),
+        IndexModel([("user_id", ASCENDING)], name="user_id"),
+        # Identifies copied messages, so the copy can never be duplicated
+        IndexModel(
+            [("session_id", ASCENDING), ("legacy_index", ASCENDING)],
+            name="session_legacy_index_unique",
+            unique=True,
+            partialFilterExpression={"legacy_index": {"$exists": True}}
+        ),
+    ])
+
+    cursor = chats.find(
+        {"$or": [{"messages": {"$exists": True}}, {"message_count": {"$exists": False}}]},
+        {"session_id": 1, "user_id": 1, "created_at": 1, "messages": 1}
+    )
+    async for session in cursor:
+        session_messages = session.get("messages", [])
+
+        # Upsert by position in the old array so an interrupted run can be repeated;
+        # ordered, so upserted _ids keep the conversation order for equal timestamps
+        if session_messages:
+            await messages.bulk_write(
+                [
+                    UpdateOne(
+                        {"session_id": session["session_id"], "legacy_index": index},
+                        {"$setOnInsert": {
+                            "user_id": session["user_id"],
+                            "role": msg["role"],
+                            "content": msg["content"],
+                            "timestamp": msg.get("timestamp", session["created_at"])
+                        }},
+                        upsert=True
+                    )
+                    for index, msg in enumerate(session_messages)
+                ]
+            )
+
+        last_message = session_messages[-1]["content"][:100] if session_messages else None
+        await chats.update_one(
+            {"_id": session["_id"]},
+            {
+                "$set": {"message_count": len(session_messages), "last_message": last_message},
+                "$unset": {"messages": ""}
+            }
+        )
+
+
+async def _create_user_search_fields(database: AsyncIOMotorDatabase):
+    """Backfill normalized user search fields and index them."""
+    users = database["users"]
+    async for user in users.find(
+        {"search": {"$exists": False}},
+        {"email": 1, "full_name": 1, "nim": 1}
+    ):
+        await users.update_one(
+            {"_id": user["_id"]},
+            {"$set": {"search": build_search_fields(user["email"], user["full_name"], user["nim"])}}
+        )
+
+    await users.create_indexes([
+        IndexModel([("search.email", ASCENDING)], name="search_email"),
+        IndexModel([("search.nim", ASCENDING)], name="search_nim"),
+        IndexModel([("search.name_prefixes", ASCENDING)], name="search_name_prefixes"),
+    ])
+
+
+async def _add_like_state(database: AsyncIOMotorDatabase):
+    """Likes are toggled in place; existing like documents are active likes."""
+    await database["post_likes"].update_many(
+        {"liked": {"$exists": False}},
+        {"$set": {"liked": True}}
+    )
+
+
+async def _move_comments_to_collection(database: AsyncIOMotorDatabase):
+    """Move embedded post comments to post_comments, keeping a short preview on the post."""
+    posts = database["posts"]
+    comments = database["post_comments"]
+
+    await comments.create_indexes([
+        IndexModel(
+            [("post_id", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)],
+            name="post_created"
+        ),
+        IndexModel([("comment_id", ASCENDING)], name="comment_id_unique", unique=True),
+    ])
+
+    cursor = posts.find(
+        {"$or": [{"comments": {"$exists": True}}, {"comment_preview": {"$exists": False}}]},
+        {"comments": 1}
+    )
+    async for post in cursor:
+        post_id = str(post["_id"])
+        post_comments = post.get("comments", [])
+
+        # Upsert by comment_id so an interrupted run can be repeated (ordered, like the old insert)
+        if post_comments:
+            await comments.bulk_write(
+                [
+                    UpdateOne(
+                        {"comment_id": comment["comment_id"]},
+                        {"$setOnInsert": {**comment, "post_id": post_id}},
+                        upsert=True
+                    )
+                    for comment in post_comments
+                ]
+            )
+
+        await posts.update_one(
+            {"_id": post["_id"]},
+            {
+                "$set": {
+                    "comment_count": len(post_comments),
+                    "comment_preview": post_comments[:COMMENT_PREVIEW_SIZE]
+                },
+                "$unset": {"comments": ""}
+            }
+        )
+
+
+# Ordered list of (version, name, migration). Append only - never renumber.
+MIGRATIONS: List[Migration] = [
+    (1, "initial_indexes", _create_initial_indexes),
+    (2, "keyset_indexes", _create_keyset_indexes),
+    (3, "post_likes_collection", _move_likes_to_collection),
+    (4, "chat_messages_collection", _move_chat_messages_to_collection),
+    (5, "user_search_fields", _create_user_search_fields),
+    (6, "post_likes_state", _add_like_state),
+    (7, "post_comments_collection", _move_comments_to_collection),
+]
+
+
+# ==================== Runner ====================
+
+async def _acquire_lease(history: AsyncIOMotorCollection, owner: str) -> bool:
+    """Take or renew the migration lease; False while another worker holds it."""
+    now = datetime.utcnow()
+    try:
+        await history.find_one_and_update(
+            {"_id": LEASE_ID, "$or": [{"owner": owner}, {"expires_at": {"$lte": now}}]},
+            {"$set": {"owner": owner, "expires_at": now + timedelta(seconds=LEASE_SECONDS)}},
+            upsert=True
+        )
+        return True
+    except DuplicateKeyError:
+        return False  # The lease exists and is held by someone else
+
+
+async def _keep_lease(history: AsyncIOMotorCollection, owner: str):
+    """Renew the lease until cancelled, so long migrations keep it."""
+    while True:
+        await asyncio.sleep(LEASE_SECONDS / 3)
+        if not await _acquire_lease(history, owner):
+            log.error("migration_lease_lost", "Migration lease was taken over by another worker", owner=owner)
+            return
+
+
+async def run_migrations(database: AsyncIOMotorDatabase) -> List[int]:
+    """
+    Apply pending migrations in version order.
+
+    Workers starting together serialize on a lease document: one applies
+    the migrations while the others wait, then find nothing left to do.
+    Migrations must still be safe to re-run, since a worker can die after
+    migrating but before recording the version.
+
+    Returns:
+        The versions applied by this call
+    """
+    history = database[MIGRATIONS_COLLECTION]
+    owner = uuid.uuid4().hex
+
+    waiting_logged = False
+    while not await _acquire_lease(history, owner):
+        if not waiting_logged:
+            log.info("migration_lease_waiting", "Waiting for another worker to finish migrations")
+            waiting_logged = True
+        await asyncio.sleep(LEASE_POLL_SECONDS)
+
+    keeper = asyncio.create_task(_keep_lease(history, owner))
+    try:
+        # Read only once holding the lease, so another worker's work is seen
+        applied = {doc["_id"] async for doc in history.find({"_id": {"$type": "number"}}, {"_id": 1})}
+
+        newly_applied = []
+        for version, name, migrate in sorted(MIGRATIONS, key=lambda m: m[0]):
+            if version in applied:
+                continue
+
+            log.info("migration_started", f"Applying migration {version:03d}_{name}", version=version, name=name)
+            await migrate(database)
+            await history.update_one(
+                {"_id": version},
+                {"$setOnInsert": {"name": name, "applied_at": datetime.utcnow()}},
+                upsert=True
+            )
+            newly_applied.append(version)
+
+        return newly_applied
+    finally:
+        keeper.cancel()
+        await history.delete_one({"_id": LEASE_ID, "owner": owner})
@@ -3,8 +3,13 @@ MindSupport Backend - MongoDB Database Connection
 """
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 from typing import Optional
+import asyncio
+import re
 
 from app.core.config import settings
+from app.core.logging import get_logger, mongo_command_logger
+from app.core.metrics import mongo_command_metrics
+from app.db.migrations import run_migrations
 
 
 class MongoDB:
@@ -15,28 +20,53 @@ class MongoDB:
 
 
 db = MongoDB()
+log = get_logger("mongodb")
+
+
+def _redacted_url(url: str) -> str:
+    """Connection string without credentials, for logs."""
+    return re.sub(r"//[^@/]+@", "//***@", url)
 
 
 async def connect_to_mongo():
     """Connect to MongoDB."""
-    print(f"Connecting to MongoDB at {settings.MONGODB_URL}...")
-    db.client = AsyncIOMotorClient(settings.MONGODB_URL)
+    log.info("mongo_connecting", "Connecting to MongoDB", url=_redacted_url(settings.MONGODB_URL))
+    listeners = [mongo_command_logger]
+    if settings.METRICS_ENABLED:
+        listeners.append(mongo_command_metrics)
+    db.client = AsyncIOMotorClient(settings.MONGODB_URL, event_listeners=listeners)
     db.database = db.client[settings.DATABASE_NAME]
     
     # Ping to verify connection
     try:
         await db.client.admin.command('ping')
-        print(f"✅ Connected to MongoDB database: {settings.DATABASE_NAME}")
+        log.info("mongo_connected", "Connected to MongoDB", database=settings.DATABASE_NAME)
     except Exception as e:
-        print(f"❌ Failed to connect to MongoDB: {e}")
+        log.error("mongo_connect_failed", "Failed to connect to MongoDB", error=str(e))
         raise e
+    
+    # Ensure indexes and schema are up to date
+    applied = await run_migrations(db.database)
+    if applied:
+        log.info("migrations_applied", f"Applied {len(applied)} database migration(s)", versions=applied)
 
 
 async def close_mongo_connection():
     """Close MongoDB connection."""
     if db.client:
         db.client.close()
-        print("MongoDB connection closed.")
+        log.info("mongo_closed", "MongoDB connection closed")
+
+
+async def ping_database(timeout: float = 2.0) -> bool:
+    """Whether MongoDB answers a ping within `timeout` seconds."""
+    if not db.client:
+        return False
+    try:
+        await asyncio.wait_for(db.client.admin.command('ping'), timeout)
+        return True
+    except Exception:
+        return False
 
 
 def get_database() -> AsyncIOMotorDatabase:
@@ -53,9 +83,25 @@ def get_chats_collection():
     return db.database["chats"]
 
 
+def get_chat_messages_collection():
+    return db.database["chat_messages"]
+
+
 def get_posts_collection():
     return db.database["posts"]
 
 
 def get_reports_collection():
     return db.database["reports"]
+
+
+def get_comments_collection():
+    return db.database["post_comments"]
+
+
+def get_likes_collection():
+    return db.database["post_likes"]
+
+
+def get_stats_collection():
+    return db.database["stats"]
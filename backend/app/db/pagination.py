@@ -0,0 +1,141 @@
+"""
+MindSupport Backend - Pagination Helpers
+Opaque keyset cursors and cached totals for list endpoints
+"""
+from bson import ObjectId
+from datetime import datetime
+from fastapi import HTTPException, status
+from typing import Any, Dict, List, Optional, Tuple
+import base64
+import json
+import time
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import ASCENDING, DESCENDING
+
+from app.core.config import settings
+
+
+# ==================== Cursors ====================
+
+def encode_cursor(sort_value: datetime, doc_id: ObjectId) -> str:
+    """Encode the (sort value, _id) of the last item on a page as an opaque cursor."""
+    raw = json.dumps([sort_value.isoformat(), str(doc_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    """Decode an opaque cursor produced by `encode_cursor`."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, doc_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(sort_value), ObjectId(doc_id)
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor tidak valid"
+        )
+
+
+def keyset_query(
+    query: Dict[str, Any],
+    field: str,
+    cursor: Optional[str],
+    direction: int = DESCENDING
+) -> Dict[str, Any]:
+    """
+    Restrict `query` to documents after `cursor` in (field, _id) order.
+
+    Returns the query unchanged when no cursor is given.
+    """
+    if not cursor:
+        return query
+
+    sort_value, doc_id = decode_cursor(cursor)
+    after = "$gt" if direction == ASCENDING else "$lt"
+    after_cursor = {
+        "$or": [
+            {field: {after: sort_value}},
+            {field: sort_value, "_id": {after: doc_id}},
+        ]
+    }
+    return {"$and": [query, after_cursor]} if query else after_cursor
+
+
+def keyset_sort(field: str, direction: int = DESCENDING) -> List[Tuple[str, int]]:
+    """Sort specification matching `keyset_query`."""
+    return [(field, direction), ("_id", direction)]
+
+
+async def fetch_page(
+    collection: AsyncIOMotorCollection,
+    query: Dict[str, Any],
+    field: str,
+    page_size: int,
+    cursor: Optional[str] = None,
+    page: int = 1,
+    projection: Optional[Dict[str, Any]] = None,
+    direction: int = DESCENDING
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    Fetch one page ordered by (field, _id), newest first unless `direction` is ASCENDING.
+
+    Uses the keyset cursor when given, otherwise falls back to page-number
+    skipping for compatibility with existing clients.
+
+    Returns:
+        The documents and the cursor for the next page (None on the last page)
+    """
+    find_cursor = collection.find(
+        keyset_query(query, field, cursor, direction), projection
+    ).sort(keyset_sort(field, direction))
+    if not cursor:
+        find_cursor = find_cursor.skip((page - 1) * page_size)
+
+    # Fetch one extra document to know whether another page exists
+    docs = await find_cursor.limit(page_size + 1).to_list(page_size + 1)
+
+    next_cursor = None
+    if len(docs) > page_size:
+        docs = docs[:page_size]
+        last = docs[-1]
+        next_cursor = encode_cursor(last[field], last["_id"])
+
+    return docs, next_cursor
+
+
+# ==================== Totals ====================
+
+class CountCache:
+    """Small in-process TTL cache for collection counts."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: Dict[str, Tuple[float, int]] = {}
+
+    async def count(self, collection: AsyncIOMotorCollection, query: Dict[str, Any]) -> int:
+        """Return a count for `query`, reusing a recent result when available."""
+        key = f"{collection.name}:{json.dumps(query, sort_keys=True, default=str)}"
+        now = time.monotonic()
+
+        cached = self._entries.get(key)
+        if cached and cached[0] > now:
+            return cached[1]
+
+        if query:
+            total = await collection.count_documents(query)
+        else:
+            # Metadata-based count, no collection scan
+            total = await collection.estimated_document_count()
+
+        if len(self._entries) >= self.max_entries:
+            self._entries.clear()
+        self._entries[key] = (now + self.ttl_seconds, total)
+        return total
+
+    def clear(self):
+        self._entries.clear()
+
+
+count_cache = CountCache(ttl_seconds=settings.COUNT_CACHE_TTL_SECONDS)
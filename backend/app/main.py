@@ -2,25 +2,43 @@
 MindSupport Backend - Main Application Entry Point
 FastAPI application with all routes and middleware configured.
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
+import asyncio
+import hmac
 
 from app.core.config import settings
-from app.db.mongodb import connect_to_mongo, close_mongo_connection
+from app.core.logging import RequestContextMiddleware, get_logger, setup_logging, shutdown_logging
+from app.core.metrics import MetricsMiddleware, registry
+from app.core.security import shutdown_password_executor
+from app.db.mongodb import connect_to_mongo, close_mongo_connection, ping_database
 from app.routers import auth, users, chat, forum, admin
+from app.services.openai_service import openai_service
+from app.services.forum_events import forum_events
+from app.services.stats_service import ensure_stats, run_stats_reconciliation
+
+
+log = get_logger("app")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan events - startup and shutdown."""
     # Startup
-    print("🚀 Starting MindSupport API...")
+    setup_logging()
+    log.info("app_starting", "Starting MindSupport API", version=settings.APP_VERSION)
     await connect_to_mongo()
+    await ensure_stats()
+    reconcile_task = asyncio.create_task(run_stats_reconciliation())
     yield
     # Shutdown
+    reconcile_task.cancel()
     await close_mongo_connection()
-    print("👋 MindSupport API shutdown complete.")
+    shutdown_password_executor()
+    log.info("app_stopped", "MindSupport API shutdown complete")
+    shutdown_logging()
 
 
 # Create FastAPI application
@@ -63,8 +81,16 @@ app.add_middleware(
     allow_credentials=False,  # Must be False when using wildcard origin
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Request-ID"],  # Pagination cursor, log correlation
 )
 
+# Request IDs and the sampled access log
+app.add_middleware(RequestContextMiddleware)
+
+# Request latency and in-flight metrics (outermost, so it times everything)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 
 # Include routers
 app.include_router(auth.router)
@@ -88,12 +114,36 @@ async def root():
 
 @app.get("/health", tags=["Health"])
 async def health_check():
-    """Detailed health check."""
-    return {
-        "status": "healthy",
-        "database": "connected",
-        "openai": "configured" if settings.OPENAI_API_KEY else "not configured (using fallback)"
+    """Detailed health check; 503 when MongoDB does not answer, "degraded" while the LLM breaker is open."""
+    database_ok = await ping_database()
+    llm_circuit = openai_service.breaker.stats()
+    if not database_ok:
+        status = "unhealthy"
+    elif llm_circuit["state"] != "closed":
+        status = "degraded"  # Chat still answers, from the fallback
+    else:
+        status = "healthy"
+    body = {
+        "status": status,
+        "database": "connected" if database_ok else "unreachable",
+        "llm_provider": openai_service.provider.name if openai_service.provider else "not configured (using fallback)",
+        "llm_circuit": llm_circuit,
+        "response_cache": openai_service.cache.stats() if openai_service.cache else "disabled",
+        "forum_events": forum_events.stats()
     }
+    return JSONResponse(body, status_code=200 if database_ok else 503)
+
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", tags=["Health"], include_in_schema=False)
+    async def metrics(request: Request):
+        """Prometheus metrics for this worker."""
+        # Served on the public API port, so guard it when a token is configured
+        if settings.METRICS_TOKEN:
+            expected = f"Bearer {settings.METRICS_TOKEN}"
+            if not hmac.compare_digest(request.headers.get("Authorization", ""), expected):
+                return Response(status_code=401, headers={"WWW-Authenticate": "Bearer"})
+        return Response(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 
 if __name__ == "__main__":
@@ -45,7 +45,8 @@ class ChatSession(BaseModel):
     title: str = "Sesi Baru"
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
-    messages: List[ChatMessage] = []
+    message_count: int = 0  # Messages live in the chat_messages collection
+    last_message: Optional[str] = None
     
     class Config:
         from_attributes = True
@@ -17,6 +17,10 @@ class MoodType(str, Enum):
     SUKSES = "Sukses"
 
 
+# Comments stored inline on each post for feed previews
+COMMENT_PREVIEW_SIZE = 3
+
+
 # ==================== Request Models ====================
 
 class PostCreate(BaseModel):
@@ -39,8 +43,9 @@ class ReportCreate(BaseModel):
 # ==================== Internal Models ====================
 
 class Comment(BaseModel):
-    """Schema for post comment."""
+    """Schema for post comment (post_comments collection)."""
     comment_id: str
+    post_id: str
     user_id: str
     anonymous_id: str
     content: str
@@ -55,8 +60,9 @@ class Post(BaseModel):
     mood: MoodType
     content: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
-    likes: List[str] = []  # List of user_ids
-    comments: List[Comment] = []
+    like_count: int = 0  # Likes live in the post_likes collection
+    comment_count: int = 0
+    comment_preview: List[Comment] = []  # First few comments; all live in post_comments
     is_deleted: bool = False
     
     class Config:
@@ -84,17 +90,25 @@ class PostResponse(BaseModel):
     is_liked: bool = False  # Whether current user liked it
     comment_count: int
     comments: List[CommentResponse] = []
+    comments_next_cursor: Optional[str] = None  # Pass to /posts/{id}/comments for more
     
     class Config:
         from_attributes = True
 
 
+class CommentListResponse(BaseModel):
+    """Schema for one page of comments, oldest first."""
+    comments: List[CommentResponse]
+    next_cursor: Optional[str] = None
+
+
 class PostListResponse(BaseModel):
     """Schema for list of posts with pagination."""
     posts: List[PostResponse]
-    total: int
+    total: Optional[int] = None  # None when include_total=false
     page: int
     page_size: int
+    next_cursor: Optional[str] = None  # Pass as `cursor` to fetch the next page
 
 
 # ==================== Report Models ====================
@@ -5,10 +5,17 @@ Handles admin dashboard, reports, and moderation
 from fastapi import APIRouter, HTTPException, status, Depends, Query
 from bson import ObjectId
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
+import asyncio
 
-from app.routers.users import get_current_user
-from app.db.mongodb import get_users_collection, get_posts_collection, get_reports_collection, get_chats_collection
+from app.routers.users import get_current_user, invalidate_user_cache
+from app.core.responses import dump_plain_json, json_response
+from app.db.mongodb import get_users_collection, get_posts_collection, get_reports_collection
+from app.db.pagination import fetch_page, count_cache
+from app.services.stats_service import get_stats, increment_stats
+from app.services.forum_cache import forum_cache
+from app.services.forum_events import forum_events
+from app.services.user_search import build_search_match, build_search_pipeline
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
@@ -28,64 +35,63 @@ async def get_admin_user(current_user: dict = Depends(get_current_user)) -> dict
 @router.get("/stats")
 async def get_admin_stats(admin: dict = Depends(get_admin_user)):
     """Mendapatkan statistik dashboard admin."""
-    users = get_users_collection()
-    posts = get_posts_collection()
-    reports = get_reports_collection()
-    chats = get_chats_collection()
-    
-    # Count totals
-    total_users = await users.count_documents({})
-    total_posts = await posts.count_documents({"is_deleted": {"$ne": True}})
-    pending_reports = await reports.count_documents({"status": "pending"})
-    
-    # Count today's active sessions (approximation)
-    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-    active_sessions = await chats.count_documents({"updated_at": {"$gte": today}})
-    
-    return {
-        "total_users": total_users,
-        "total_posts": total_posts,
-        "pending_reports": pending_reports,
-        "active_sessions": active_sessions
-    }
+    # Counters are maintained by the write paths and reconciled periodically
+    return await get_stats()
 
 
 # ==================== REPORTS ====================
 
+async def get_post_previews(post_ids: List[str]) -> Dict[str, dict]:
+    """Fetch report post previews (first 200 chars + author) for many posts in one query."""
+    object_ids = [ObjectId(post_id) for post_id in set(post_ids) if ObjectId.is_valid(post_id)]
+    if not object_ids:
+        return {}
+    
+    posts = get_posts_collection()
+    cursor = posts.find(
+        {"_id": {"$in": object_ids}},
+        {"content": {"$substrCP": ["$content", 0, 200]}, "anonymous_id": 1}
+    )
+    return {str(post["_id"]): post async for post in cursor}
+
+
 @router.get("/reports")
 async def get_reports(
     status_filter: Optional[str] = Query("pending", description="Filter by status: pending, resolved, dismissed"),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=50),
+    cursor: Optional[str] = None,
+    include_total: bool = Query(True),
     admin: dict = Depends(get_admin_user)
 ):
     """Mendapatkan daftar laporan."""
     reports = get_reports_collection()
-    posts = get_posts_collection()
     
     # Build query
     query = {}
     if status_filter:
         query["status"] = status_filter
     
-    # Get paginated reports
-    skip = (page - 1) * page_size
-    cursor = reports.find(query).sort("created_at", -1).skip(skip).limit(page_size)
-    report_list = await cursor.to_list(page_size)
+    async def count_total():
+        return await count_cache.count(reports, query) if include_total else None
+    
+    # Get paginated reports and the (independent) total concurrently
+    (report_list, next_cursor), total = await asyncio.gather(
+        fetch_page(reports, query, "created_at", page_size, cursor=cursor, page=page),
+        count_total()
+    )
+    
+    # Enrich with post content in a single query
+    previews = await get_post_previews([report["post_id"] for report in report_list])
     
-    # Enrich with post content
     result = []
     for report in report_list:
-        post = None
-        try:
-            post = await posts.find_one({"_id": ObjectId(report["post_id"])})
-        except:
-            pass
+        post = previews.get(report["post_id"])
         
         result.append({
             "id": str(report["_id"]),
             "post_id": report["post_id"],
-            "post_content": post["content"][:200] if post else "[Post dihapus]",
+            "post_content": post["content"] if post else "[Post dihapus]",
             "post_author": post.get("anonymous_id", "Unknown") if post else "Unknown",
             "reason": report["reason"],
             "note": report.get("note", ""),
@@ -94,13 +100,12 @@ async def get_reports(
             "created_at": report["created_at"].isoformat()
         })
     
-    total = await reports.count_documents(query)
-    
     return {
         "reports": result,
         "total": total,
         "page": page,
-        "page_size": page_size
+        "page_size": page_size,
+        "next_cursor": next_cursor
     }
 
 
@@ -125,7 +130,7 @@ async def handle_report(
     
     # Update report status
     new_status = "resolved" if action == "resolve" else "dismissed"
-    await reports.update_one(
+    previous = await reports.find_one_and_update(
         {"_id": ObjectId(report_id)},
         {
             "$set": {
@@ -133,15 +138,23 @@ async def handle_report(
                 "handled_by": str(admin["_id"]),
                 "handled_at": datetime.utcnow()
             }
-        }
+        },
+        projection={"status": 1}
     )
+    if previous and previous.get("status") == "pending":
+        await increment_stats(pending_reports=-1)
     
     # Optionally delete the post
     if delete_post and action == "resolve":
-        await posts.update_one(
-            {"_id": ObjectId(report["post_id"])},
+        result = await posts.update_one(
+            {"_id": ObjectId(report["post_id"]), "is_deleted": {"$ne": True}},
             {"$set": {"is_deleted": True}}
         )
+        await increment_stats(total_posts=-result.modified_count)
+        forum_cache.invalidate_post(report["post_id"])
+        forum_cache.invalidate_feeds()
+        if result.modified_count:
+            forum_events.publish("post_deleted", {"post_id": report["post_id"]})
     
     return {"message": f"Laporan berhasil di-{new_status}", "status": new_status}
 
@@ -153,24 +166,31 @@ async def get_all_users(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=50),
     search: Optional[str] = None,
+    cursor: Optional[str] = None,
+    include_total: bool = Query(True),
     admin: dict = Depends(get_admin_user)
 ):
-    """Mendapatkan daftar semua pengguna."""
+    """
+    Mendapatkan daftar semua pengguna.
+    
+    - **search**: Awalan email/NIM atau awalan kata pada nama, diurutkan
+      berdasarkan relevansi (mode pencarian memakai nomor halaman, bukan cursor)
+    """
     users = get_users_collection()
     
-    # Build query
     query = {}
-    if search:
-        query["$or"] = [
-            {"email": {"$regex": search, "$options": "i"}},
-            {"full_name": {"$regex": search, "$options": "i"}},
-            {"nim": {"$regex": search, "$options": "i"}}
-        ]
-    
-    # Get paginated users
-    skip = (page - 1) * page_size
-    cursor = users.find(query).sort("created_at", -1).skip(skip).limit(page_size)
-    user_list = await cursor.to_list(page_size)
+    next_cursor = None
+    if search and search.strip():
+        # Indexed prefix search ranked by relevance
+        query = build_search_match(search)
+        pipeline = build_search_pipeline(search, skip=(page - 1) * page_size, limit=page_size)
+        user_list = await users.aggregate(pipeline).to_list(page_size)
+    else:
+        # Get paginated users
+        user_list, next_cursor = await fetch_page(
+            users, query, "created_at", page_size, cursor=cursor, page=page,
+            projection={"search": 0, "hashed_password": 0}
+        )
     
     result = []
     for user in user_list:
@@ -185,13 +205,14 @@ async def get_all_users(
             "created_at": user["created_at"].isoformat()
         })
     
-    total = await users.count_documents(query)
+    total = await count_cache.count(users, query) if include_total else None
     
     return {
         "users": result,
         "total": total,
         "page": page,
-        "page_size": page_size
+        "page_size": page_size,
+        "next_cursor": next_cursor
     }
 
 
@@ -220,6 +241,7 @@ async def toggle_user_status(
         {"_id": ObjectId(user_id)},
         {"$set": {"is_active": new_status}}
     )
+    invalidate_user_cache(user_id)
     
     return {
         "message": f"Pengguna berhasil {'diaktifkan' if new_status else 'dinonaktifkan'}",
@@ -248,6 +270,7 @@ async def make_user_admin(
         {"_id": ObjectId(user_id)},
         {"$set": {"is_superuser": new_status}}
     )
+    invalidate_user_cache(user_id)
     
     return {
         "message": f"Pengguna berhasil {'dijadikan admin' if new_status else 'dicopot dari admin'}",
@@ -262,6 +285,8 @@ async def get_all_posts(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=50),
     include_deleted: bool = Query(False),
+    cursor: Optional[str] = None,
+    include_total: bool = Query(True),
     admin: dict = Depends(get_admin_user)
 ):
     """Mendapatkan semua postingan (termasuk yang dihapus jika diminta)."""
@@ -271,9 +296,10 @@ async def get_all_posts(
     if not include_deleted:
         query["is_deleted"] = {"$ne": True}
     
-    skip = (page - 1) * page_size
-    cursor = posts.find(query).sort("created_at", -1).skip(skip).limit(page_size)
-    post_list = await cursor.to_list(page_size)
+    post_list, next_cursor = await fetch_page(
+        posts, query, "created_at", page_size, cursor=cursor, page=page,
+        projection={"comment_preview": 0}
+    )
     
     result = []
     for post in post_list:
@@ -282,20 +308,22 @@ async def get_all_posts(
             "anonymous_id": post["anonymous_id"],
             "mood": post["mood"],
             "content": post["content"],
-            "like_count": len(post.get("likes", [])),
-            "comment_count": len(post.get("comments", [])),
+            "like_count": post.get("like_count", 0),
+            "comment_count": post.get("comment_count", 0),
             "is_deleted": post.get("is_deleted", False),
             "created_at": post["created_at"].isoformat()
         })
     
-    total = await posts.count_documents(query)
+    total = await count_cache.count(posts, query) if include_total else None
     
-    return {
+    # Plain JSON values already; skip FastAPI's recursive jsonable_encoder
+    return json_response(dump_plain_json({
         "posts": result,
         "total": total,
         "page": page,
-        "page_size": page_size
-    }
+        "page_size": page_size,
+        "next_cursor": next_cursor
+    }))
 
 
 @router.delete("/posts/{post_id}")
@@ -314,8 +342,8 @@ async def admin_delete_post(
     if not post:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post tidak ditemukan")
     
-    await posts.update_one(
-        {"_id": ObjectId(post_id)},
+    result = await posts.update_one(
+        {"_id": ObjectId(post_id), "is_deleted": {"$ne": True}},
         {
             "$set": {
                 "is_deleted": True,
@@ -324,5 +352,10 @@ async def admin_delete_post(
             }
         }
     )
+    await increment_stats(total_posts=-result.modified_count)
+    forum_cache.invalidate_post(post_id)
+    forum_cache.invalidate_feeds()
+    if result.modified_count:
+        forum_events.publish("post_deleted", {"post_id": post_id})
     
     return {"message": "Postingan berhasil dihapus"}
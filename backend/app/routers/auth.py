@@ -2,15 +2,23 @@
 MindSupport Backend - Authentication Router
 Handles user registration and login
 """
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, BackgroundTasks
 from fastapi.security import OAuth2PasswordRequestForm
 from datetime import datetime, timedelta
+from pymongo.errors import DuplicateKeyError
 import random
 
-from app.core.security import get_password_hash, verify_password, create_access_token
+from app.core.security import (
+    get_password_hash_async,
+    verify_password_async,
+    password_needs_rehash,
+    create_access_token
+)
 from app.core.config import settings
 from app.db.mongodb import get_users_collection
 from app.models.user import UserCreate, UserResponse, Token
+from app.services.stats_service import increment_stats
+from app.services.user_search import build_search_fields
 
 router = APIRouter(prefix="/auth", tags=["Autentikasi"])
 
@@ -20,6 +28,15 @@ def generate_anonymous_id() -> str:
     return f"Anonim#{random.randint(100, 9999)}"
 
 
+async def _rehash_password(user_id, password: str):
+    """Re-hash a verified password with the current bcrypt cost."""
+    users = get_users_collection()
+    await users.update_one(
+        {"_id": user_id},
+        {"$set": {"hashed_password": await get_password_hash_async(password)}}
+    )
+
+
 @router.post("/register", response_model=Token, status_code=status.HTTP_201_CREATED)
 async def register(user_data: UserCreate):
     """
@@ -34,36 +51,41 @@ async def register(user_data: UserCreate):
     """
     users = get_users_collection()
     
-    # Check if email already exists
-    existing_user = await users.find_one({"email": user_data.email})
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email sudah terdaftar"
-        )
-    
-    # Check if NIM already exists
-    existing_nim = await users.find_one({"nim": user_data.nim})
-    if existing_nim:
+    # Cheap indexed check first, so duplicate sign-ups don't cost a bcrypt hash
+    existing = await users.find_one(
+        {"$or": [{"email": user_data.email}, {"nim": user_data.nim}]},
+        {"email": 1, "nim": 1}
+    )
+    if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="NIM sudah terdaftar"
+            detail="Email sudah terdaftar" if existing.get("email") == user_data.email else "NIM sudah terdaftar"
         )
     
     # Create new user document
     user_doc = {
         "email": user_data.email,
-        "hashed_password": get_password_hash(user_data.password),
+        "hashed_password": await get_password_hash_async(user_data.password),
         "full_name": user_data.full_name,
         "nim": user_data.nim,
+        "search": build_search_fields(user_data.email, user_data.full_name, user_data.nim),
         "anonymous_id": generate_anonymous_id(),
         "created_at": datetime.utcnow(),
         "is_active": True,
         "is_superuser": False
     }
     
-    result = await users.insert_one(user_doc)
+    # Unique indexes still settle concurrent sign-ups that passed the check
+    try:
+        result = await users.insert_one(user_doc)
+    except DuplicateKeyError as e:
+        key_pattern = (e.details or {}).get("keyPattern", {})
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="NIM sudah terdaftar" if "nim" in key_pattern else "Email sudah terdaftar"
+        )
     user_doc["id"] = str(result.inserted_id)
+    await increment_stats(total_users=1)
     
     # Create access token
     access_token = create_access_token(data={"sub": str(result.inserted_id)})
@@ -84,7 +106,10 @@ async def register(user_data: UserCreate):
 
 
 @router.post("/token", response_model=Token)
-async def login(form_data: OAuth2PasswordRequestForm = Depends()):
+async def login(
+    background_tasks: BackgroundTasks,
+    form_data: OAuth2PasswordRequestForm = Depends()
+):
     """
     Login untuk mendapatkan access token.
     
@@ -105,7 +130,7 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
         )
     
     # Verify password
-    if not verify_password(form_data.password, user["hashed_password"]):
+    if not await verify_password_async(form_data.password, user["hashed_password"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Email atau password salah",
@@ -119,6 +144,10 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
             detail="Akun dinonaktifkan"
         )
     
+    # Upgrade the hash after the response when the configured cost changed
+    if password_needs_rehash(user["hashed_password"]):
+        background_tasks.add_task(_rehash_password, user["_id"], form_data.password)
+    
     # Create access token
     access_token = create_access_token(data={"sub": str(user["_id"])})
     
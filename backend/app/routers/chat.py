@@ -2,44 +2,57 @@
 MindSupport Backend - Chat Router
 Handles AI chatbot interactions and chat history
 """
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Query, BackgroundTasks
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from bson import ObjectId
 from datetime import datetime
-from typing import List
+from pydantic import TypeAdapter
+from typing import List, Optional
+import asyncio
+import json
 import uuid
 
 from app.routers.users import get_current_user
-from app.db.mongodb import get_chats_collection
+from app.core.responses import json_response
+from app.db.mongodb import get_chats_collection, get_chat_messages_collection
+from app.db.pagination import fetch_page
 from app.models.chat import (
     ChatMessageRequest, 
     ChatSessionResponse, 
     ChatSessionDetailResponse,
-    ChatMessageResponse,
     AIResponse,
     MessageRole
 )
-from app.services.openai_service import openai_service
+from app.services.openai_service import openai_service, SYSTEM_PROMPT
+from app.services.context_builder import ConversationContext, build_context, estimate_tokens
+from app.services.stats_service import increment_active_sessions, is_today, today_start
 
 router = APIRouter(prefix="/chat", tags=["Chat AI"])
 
+# Max unsummarized messages loaded when building AI context
+CONTEXT_FETCH_LIMIT = 50
 
-@router.post("/message", response_model=AIResponse)
-async def send_message(
-    message: ChatMessageRequest,
-    current_user: dict = Depends(get_current_user)
-):
-    """
-    Mengirim pesan ke chatbot AI.
-    
-    - **content**: Isi pesan (maksimal 4000 karakter)
-    - **session_id**: ID sesi (opsional, jika kosong akan membuat sesi baru)
-    
-    Mengembalikan respons AI dan session_id.
-    """
+# Max messages folded into the summary per LLM call while catching up
+SUMMARY_BATCH_SIZE = 50
+
+# Length of the last-message preview kept on the session document
+LAST_MESSAGE_PREVIEW_LENGTH = 100
+
+# Built once: responses are validated in one pass and serialized straight to JSON
+_session_list = TypeAdapter(List[ChatSessionResponse])
+_session_detail = TypeAdapter(ChatSessionDetailResponse)
+
+SESSION_LIST_PROJECTION = {
+    "session_id": 1, "title": 1, "created_at": 1, "updated_at": 1,
+    "message_count": 1, "last_message": 1
+}
+
+
+async def _get_or_create_session(message: ChatMessageRequest, user_id: str) -> dict:
+    """Load the user's session for this message, or create a new one."""
     chats = get_chats_collection()
-    user_id = str(current_user["_id"])
     
-    # Get or create session
     if message.session_id:
         session = await chats.find_one({
             "session_id": message.session_id,
@@ -50,52 +63,204 @@ async def send_message(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Sesi tidak ditemukan"
             )
+        return session
+    
+    # Create new session
+    session_id = str(uuid.uuid4())
+    session = {
+        "user_id": user_id,
+        "session_id": session_id,
+        "title": message.content[:50] + "..." if len(message.content) > 50 else message.content,
+        "created_at": datetime.utcnow(),
+        "updated_at": datetime.utcnow(),
+        "message_count": 0,
+        "last_message": None
+    }
+    await chats.insert_one(session)
+    await increment_active_sessions()
+    session["session_id"] = session_id
+    return session
+
+
+async def _build_context(session: dict, user_message: str) -> ConversationContext:
+    """Build the token-budgeted AI context for the next turn of a session."""
+    summary = session.get("summary")
+    if not session.get("message_count"):
+        return ConversationContext(summary=summary)
+    
+    # Only messages after the summarized prefix are candidates for the window
+    query = {"session_id": session["session_id"]}
+    summary_until = session.get("summary_until")
+    if summary_until:
+        query.update(_after(summary_until))
+    
+    messages = get_chat_messages_collection()
+    recent = await messages.find(
+        query,
+        {"role": 1, "content": 1, "timestamp": 1}
+    ).sort([("timestamp", -1), ("_id", -1)]).limit(CONTEXT_FETCH_LIMIT).to_list(CONTEXT_FETCH_LIMIT)
+    
+    context = build_context(
+        recent,
+        summary=summary,
+        reserved_tokens=estimate_tokens(SYSTEM_PROMPT) + estimate_tokens(user_message)
+    )
+    if len(recent) == CONTEXT_FETCH_LIMIT:
+        # There may be older unsummarized messages that were never loaded
+        context.backlog_before = recent[-1]
+    return context
+
+
+def _after(position: dict) -> dict:
+    """Filter for messages strictly after a (timestamp, message_id) position."""
+    return {"$or": [
+        {"timestamp": {"$gt": position["timestamp"]}},
+        {"timestamp": position["timestamp"], "_id": {"$gt": position["message_id"]}}
+    ]}
+
+
+def _before(position: dict) -> dict:
+    """Filter for messages strictly before a (timestamp, message_id) position."""
+    return {"$or": [
+        {"timestamp": {"$lt": position["timestamp"]}},
+        {"timestamp": position["timestamp"], "_id": {"$lt": position["message_id"]}}
+    ]}
+
+
+def _up_to(position: dict) -> dict:
+    """Filter for messages at or before a (timestamp, message_id) position."""
+    return {"$or": [
+        {"timestamp": {"$lt": position["timestamp"]}},
+        {"timestamp": position["timestamp"], "_id": {"$lte": position["message_id"]}}
+    ]}
+
+
+async def _refresh_summary(session: dict, context: ConversationContext):
+    """
+    Fold messages that left the context window into the session summary.
+    
+    The window only sees the newest CONTEXT_FETCH_LIMIT messages, so anything
+    older that was never summarized (e.g. a backlog from before summaries
+    existed) is read forward from summary_until in batches and folded in
+    order, advancing summary_until after each batch.
+    """
+    if context.to_summarize:
+        last = context.to_summarize[-1]
+        boundary = _up_to({"timestamp": last["timestamp"], "message_id": last["_id"]})
+    elif context.backlog_before:
+        # The window fits, but older messages beyond the fetch limit don't
+        oldest = context.backlog_before
+        boundary = _before({"timestamp": oldest["timestamp"], "message_id": oldest["_id"]})
     else:
-        # Create new session
-        session_id = str(uuid.uuid4())
-        session = {
-            "user_id": user_id,
-            "session_id": session_id,
-            "title": message.content[:50] + "..." if len(message.content) > 50 else message.content,
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow(),
-            "messages": []
+        return
+    
+    summary = context.summary
+    summary_until = session.get("summary_until")
+    
+    chats = get_chats_collection()
+    messages = get_chat_messages_collection()
+    while True:
+        conditions = [boundary]
+        if summary_until:
+            conditions.append(_after(summary_until))
+        batch = await messages.find(
+            {"session_id": session["session_id"], "$and": conditions},
+            {"role": 1, "content": 1, "timestamp": 1}
+        ).sort([("timestamp", 1), ("_id", 1)]).limit(SUMMARY_BATCH_SIZE).to_list(SUMMARY_BATCH_SIZE)
+        if not batch:
+            return
+        
+        summary = await openai_service.summarize(summary, batch)
+        position = {"timestamp": batch[-1]["timestamp"], "message_id": batch[-1]["_id"]}
+        
+        # Only apply on top of the summary we started from, so concurrent turns can't regress it
+        result = await chats.update_one(
+            {"session_id": session["session_id"], "summary_until": summary_until},
+            {"$set": {"summary": summary, "summary_until": position}}
+        )
+        if not result.modified_count or len(batch) < SUMMARY_BATCH_SIZE:
+            return
+        summary_until = position
+
+
+async def _save_messages(session: dict, *turn: tuple) -> datetime:
+    """Persist (role, content) messages to a session, in order."""
+    chats = get_chats_collection()
+    messages = get_chat_messages_collection()
+    
+    now = datetime.utcnow()
+    await messages.insert_many([
+        {
+            "session_id": session["session_id"],
+            "user_id": session["user_id"],
+            "role": role.value,
+            "content": content,
+            "timestamp": now
         }
-        await chats.insert_one(session)
-        session["session_id"] = session_id
+        for role, content in turn
+    ])
+    previous = await chats.find_one_and_update(
+        {"session_id": session["session_id"]},
+        {
+            "$set": {
+                "updated_at": now,
+                "last_message": turn[-1][1][:LAST_MESSAGE_PREVIEW_LENGTH]
+            },
+            "$inc": {"message_count": len(turn)}
+        },
+        projection={"updated_at": 1}
+    )
     
-    # Build chat history for context
-    chat_history = [
-        {"role": msg["role"], "content": msg["content"]}
-        for msg in session.get("messages", [])
-    ]
+    # First activity of the day for this session counts towards today's active sessions
+    if previous and not is_today(previous.get("updated_at")):
+        await increment_active_sessions()
+    return now
+
+
+async def _save_turn(session: dict, user_content: str, ai_content: str) -> datetime:
+    """Persist one user/assistant exchange."""
+    return await _save_messages(
+        session,
+        (MessageRole.USER, user_content),
+        (MessageRole.ASSISTANT, ai_content)
+    )
+
+
+def _sse_event(event: str, data: dict) -> str:
+    """Format a Server-Sent Events frame."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/message", response_model=AIResponse)
+async def send_message(
+    message: ChatMessageRequest,
+    background_tasks: BackgroundTasks,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Mengirim pesan ke chatbot AI.
+    
+    - **content**: Isi pesan (maksimal 4000 karakter)
+    - **session_id**: ID sesi (opsional, jika kosong akan membuat sesi baru)
+    
+    Mengembalikan respons AI dan session_id.
+    """
+    user_id = str(current_user["_id"])
+    session = await _get_or_create_session(message, user_id)
+    context = await _build_context(session, message.content)
     
     # Get AI response
     ai_response = await openai_service.get_response(
         user_message=message.content,
-        chat_history=chat_history
+        chat_history=context.messages,
+        summary=context.summary
     )
     
     # Save messages to session
-    now = datetime.utcnow()
-    user_msg = {
-        "role": MessageRole.USER.value,
-        "content": message.content,
-        "timestamp": now
-    }
-    ai_msg = {
-        "role": MessageRole.ASSISTANT.value,
-        "content": ai_response,
-        "timestamp": now
-    }
+    now = await _save_turn(session, message.content, ai_response)
     
-    await chats.update_one(
-        {"session_id": session["session_id"]},
-        {
-            "$push": {"messages": {"$each": [user_msg, ai_msg]}},
-            "$set": {"updated_at": now}
-        }
-    )
+    # Update the rolling summary after the response is sent
+    background_tasks.add_task(_refresh_summary, session, context)
     
     return AIResponse(
         content=ai_response,
@@ -104,33 +269,98 @@ async def send_message(
     )
 
 
+@router.post("/message/stream")
+async def stream_message(
+    message: ChatMessageRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Mengirim pesan ke chatbot AI dengan respons streaming (Server-Sent Events).
+    
+    Event yang dikirim:
+    - **session**: `{"session_id": ...}` segera setelah sesi siap
+    - **token**: `{"content": ...}` potongan teks respons AI
+    - **done**: `{"session_id": ..., "timestamp": ...}` setelah respons disimpan
+    """
+    user_id = str(current_user["_id"])
+    session = await _get_or_create_session(message, user_id)
+    context = await _build_context(session, message.content)
+    
+    # Save the user's message up front so a disconnect mid-stream can't drop it
+    await _save_messages(session, (MessageRole.USER, message.content))
+    
+    async def event_stream():
+        yield _sse_event("session", {"session_id": session["session_id"]})
+        
+        chunks = []
+        now = None
+        try:
+            async for chunk in openai_service.stream_response(
+                user_message=message.content,
+                chat_history=context.messages,
+                summary=context.summary
+            ):
+                chunks.append(chunk)
+                yield _sse_event("token", {"content": chunk})
+        finally:
+            # Keep the partial reply if the client went away; shielded so the
+            # save completes even when the stream is cancelled
+            reply = "".join(chunks)
+            if reply:
+                save = asyncio.ensure_future(
+                    _save_messages(session, (MessageRole.ASSISTANT, reply))
+                )
+                now = await asyncio.shield(save)
+        
+        yield _sse_event("done", {
+            "session_id": session["session_id"],
+            "timestamp": (now or datetime.utcnow()).isoformat()
+        })
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(_refresh_summary, session, context)
+    )
+
+
 @router.get("/history", response_model=List[ChatSessionResponse])
 async def get_chat_history(
+    limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = None,
     current_user: dict = Depends(get_current_user)
 ):
-    """Mendapatkan daftar sesi chat pengguna."""
+    """
+    Mendapatkan daftar sesi chat pengguna.
+    
+    Jika masih ada sesi lain, cursor halaman berikutnya dikirim lewat
+    header `X-Next-Cursor`.
+    """
     chats = get_chats_collection()
     user_id = str(current_user["_id"])
     
-    sessions = await chats.find(
-        {"user_id": user_id}
-    ).sort("updated_at", -1).to_list(100)
+    sessions, next_cursor = await fetch_page(
+        chats, {"user_id": user_id}, "updated_at", limit, cursor=cursor,
+        projection=SESSION_LIST_PROJECTION
+    )
     
     result = []
     for session in sessions:
-        messages = session.get("messages", [])
-        last_message = messages[-1]["content"] if messages else None
+        last_message = session.get("last_message")
         
-        result.append(ChatSessionResponse(
-            session_id=session["session_id"],
-            title=session.get("title", "Sesi Tanpa Judul"),
-            created_at=session["created_at"],
-            updated_at=session.get("updated_at", session["created_at"]),
-            message_count=len(messages),
-            last_message=last_message[:100] if last_message else None
-        ))
+        result.append({
+            "session_id": session["session_id"],
+            "title": session.get("title", "Sesi Tanpa Judul"),
+            "created_at": session["created_at"],
+            "updated_at": session.get("updated_at", session["created_at"]),
+            "message_count": session.get("message_count", 0),
+            "last_message": last_message[:LAST_MESSAGE_PREVIEW_LENGTH] if last_message else None
+        })
     
-    return result
+    # One validation pass for the whole list, then straight to JSON
+    body = _session_list.dump_json(_session_list.validate_python(result))
+    return json_response(body, headers={"X-Next-Cursor": next_cursor} if next_cursor else None)
 
 
 @router.get("/history/{session_id}", response_model=ChatSessionDetailResponse)
@@ -153,21 +383,27 @@ async def get_session_detail(
             detail="Sesi tidak ditemukan"
         )
     
+    message_docs = await get_chat_messages_collection().find(
+        {"session_id": session_id},
+        {"role": 1, "content": 1, "timestamp": 1}
+    ).sort([("timestamp", 1), ("_id", 1)]).to_list(None)
+    
     messages = [
-        ChatMessageResponse(
-            role=MessageRole(msg["role"]),
-            content=msg["content"],
-            timestamp=msg.get("timestamp", session["created_at"])
-        )
-        for msg in session.get("messages", [])
+        {
+            "role": msg["role"],
+            "content": msg["content"],
+            "timestamp": msg.get("timestamp", session["created_at"])
+        }
+        for msg in message_docs
     ]
     
-    return ChatSessionDetailResponse(
-        session_id=session["session_id"],
-        title=session.get("title", "Sesi Tanpa Judul"),
-        created_at=session["created_at"],
-        messages=messages
-    )
+    detail = _session_detail.validate_python({
+        "session_id": session["session_id"],
+        "title": session.get("title", "Sesi Tanpa Judul"),
+        "created_at": session["created_at"],
+        "messages": messages
+    })
+    return json_response(_session_detail.dump_json(detail))
 
 
 @router.delete("/history/{session_id}")
@@ -179,17 +415,22 @@ async def delete_session(
     chats = get_chats_collection()
     user_id = str(current_user["_id"])
     
-    result = await chats.delete_one({
-        "session_id": session_id,
-        "user_id": user_id
-    })
+    deleted = await chats.find_one_and_delete(
+        {"session_id": session_id, "user_id": user_id},
+        projection={"updated_at": 1}
+    )
     
-    if result.deleted_count == 0:
+    if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Sesi tidak ditemukan"
         )
     
+    if is_today(deleted.get("updated_at")):
+        await increment_active_sessions(-1)
+    
+    await get_chat_messages_collection().delete_many({"session_id": session_id})
+    
     return {"message": "Sesi berhasil dihapus"}
 
 
@@ -201,6 +442,13 @@ async def delete_all_history(
     chats = get_chats_collection()
     user_id = str(current_user["_id"])
     
+    active_today = await chats.count_documents({
+        "user_id": user_id,
+        "updated_at": {"$gte": today_start()}
+    })
+    
     result = await chats.delete_many({"user_id": user_id})
+    await increment_active_sessions(-active_today)
+    await get_chat_messages_collection().delete_many({"user_id": user_id})
     
     return {"message": f"{result.deleted_count} sesi berhasil dihapus"}
@@ -2,87 +2,249 @@
 MindSupport Backend - Forum Router
 Handles anonymous forum posts and comments
 """
-from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request
+from fastapi.responses import StreamingResponse
 from bson import ObjectId
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Tuple
+from pymongo import ASCENDING, ReturnDocument
+import asyncio
 import uuid
 
 from app.routers.users import get_current_user
-from app.db.mongodb import get_posts_collection, get_reports_collection
+from app.db.mongodb import (
+    get_posts_collection,
+    get_reports_collection,
+    get_likes_collection,
+    get_comments_collection
+)
+from app.db.pagination import fetch_page, count_cache
+from app.services.stats_service import increment_stats
+from app.services.forum_cache import FeedPage, feed_page_json, forum_cache, with_is_liked
+from app.services.forum_events import forum_events
+from app.core.config import settings
+from app.core.responses import json_response
 from app.models.forum import (
     PostCreate, 
     PostResponse, 
     PostListResponse,
     CommentCreate,
     CommentResponse,
+    CommentListResponse,
     ReportCreate,
-    MoodType
+    MoodType,
+    COMMENT_PREVIEW_SIZE
 )
 
 router = APIRouter(prefix="/forum", tags=["Forum Anonim"])
 
 
+async def get_liked_post_ids(user_id: str, post_ids: List[str]) -> set:
+    """Resolve which of the given posts the user has liked, in one query."""
+    if not post_ids:
+        return set()
+    
+    likes = get_likes_collection()
+    cursor = likes.find(
+        {"user_id": user_id, "post_id": {"$in": post_ids}, "liked": True},
+        {"post_id": 1, "_id": 0}
+    )
+    return {like["post_id"] async for like in cursor}
+
+
+def build_comment_response(comment: dict) -> CommentResponse:
+    return CommentResponse(
+        comment_id=comment["comment_id"],
+        anonymous_id=comment["anonymous_id"],
+        content=comment["content"],
+        created_at=comment["created_at"]
+    )
+
+
+def build_post_response(
+    post: dict,
+    comments: List[dict],
+    comments_next_cursor: Optional[str] = None
+) -> PostResponse:
+    """Build the user-independent PostResponse (is_liked is overlaid later)."""
+    return PostResponse(
+        id=str(post["_id"]),
+        anonymous_id=post["anonymous_id"],
+        mood=MoodType(post["mood"]),
+        content=post["content"],
+        created_at=post["created_at"],
+        like_count=post.get("like_count", 0),
+        comment_count=post.get("comment_count", len(comments)),
+        comments=[build_comment_response(c) for c in comments],
+        comments_next_cursor=comments_next_cursor
+    )
+
+
+async def fetch_comments_page(
+    post_id: str,
+    page_size: int,
+    cursor: Optional[str] = None
+) -> Tuple[List[dict], Optional[str]]:
+    """One page of a post's comments, oldest first."""
+    return await fetch_page(
+        get_comments_collection(), {"post_id": post_id}, "created_at", page_size,
+        cursor=cursor, direction=ASCENDING
+    )
+
+
+async def load_feed_page(
+    mood: Optional[MoodType],
+    page: int,
+    page_size: int,
+    cursor: Optional[str],
+    include_total: bool
+) -> FeedPage:
+    """Query one feed page from the database."""
+    posts_collection = get_posts_collection()
+    
+    # Build query
+    query = {"is_deleted": {"$ne": True}}
+    if mood:
+        query["mood"] = mood.value
+    
+    # Get paginated posts
+    posts, next_cursor = await fetch_page(
+        posts_collection, query, "created_at", page_size,
+        cursor=cursor, page=page
+    )
+    
+    # Get total count (cached briefly)
+    total = await count_cache.count(posts_collection, query) if include_total else None
+    
+    return FeedPage(
+        # Feed items carry only the inline comment preview
+        posts=[build_post_response(post, post.get("comment_preview", [])) for post in posts],
+        total=total,
+        next_cursor=next_cursor
+    )
+
+
+async def load_and_cache_feed_page(
+    feed_key: tuple,
+    mood: Optional[MoodType],
+    page: int,
+    page_size: int,
+    cursor: Optional[str],
+    include_total: bool
+) -> FeedPage:
+    # Captured before querying, so a write during the query keeps the result out of the cache
+    generation = forum_cache.generation
+    feed = await load_feed_page(mood, page, page_size, cursor, include_total)
+    forum_cache.set_feed(feed_key, feed, generation)
+    return feed
+
+
+async def load_post_detail(post_id: str) -> Optional[PostResponse]:
+    """Query a post with its first comment page and cache it; None if it doesn't exist."""
+    try:
+        post_oid = ObjectId(post_id)
+    except:
+        return None
+    
+    generation = forum_cache.generation
+    post, (comments, comments_next_cursor) = await asyncio.gather(
+        get_posts_collection().find_one(
+            {"_id": post_oid, "is_deleted": {"$ne": True}},
+            {"comment_preview": 0}
+        ),
+        fetch_comments_page(post_id, settings.POST_COMMENTS_PAGE_SIZE)
+    )
+    if not post:
+        return None
+    
+    post_response = build_post_response(post, comments, comments_next_cursor)
+    forum_cache.set_post(post_id, post_response, generation)
+    return post_response
+
+
+@router.get("/events")
+async def subscribe_forum_events(
+    request: Request,
+    mood: Optional[MoodType] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Berlangganan pembaruan forum secara real-time (Server-Sent Events).
+    
+    Event yang dikirim: **post_created**, **post_deleted**, **post_liked**,
+    **comment_added**. Jika **mood** diisi, post baru dari mood lain tidak dikirim.
+    Klien yang terlalu lambat membaca akan menerima **evicted** lalu diputus.
+    """
+    subscription = forum_events.subscribe(mood.value if mood else None)
+    if subscription is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Terlalu banyak koneksi, coba lagi nanti"
+        )
+    
+    async def event_stream():
+        try:
+            yield ": connected\n\n"
+            while True:
+                try:
+                    frame = await asyncio.wait_for(
+                        subscription.queue.get(),
+                        timeout=settings.FORUM_EVENTS_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    # Keep proxies from closing idle connections
+                    yield ": ping\n\n"
+                    continue
+                
+                if frame is None:
+                    yield "event: evicted\ndata: {}\n\n"
+                    break
+                yield frame
+        finally:
+            forum_events.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/posts", response_model=PostListResponse)
 async def get_posts(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=50),
     mood: Optional[MoodType] = None,
+    cursor: Optional[str] = Query(None, description="Cursor dari next_cursor halaman sebelumnya"),
+    include_total: bool = Query(True),
     current_user: dict = Depends(get_current_user)
 ):
     """
     Mendapatkan daftar postingan forum.
     
-    - **page**: Nomor halaman (default 1)
+    - **page**: Nomor halaman (default 1, diabaikan jika cursor diisi)
     - **page_size**: Jumlah item per halaman (default 20, maks 50)
     - **mood**: Filter opsional berdasarkan kategori mood
+    - **cursor**: Cursor halaman berikutnya (lebih cepat untuk scroll dalam)
+    - **include_total**: Sertakan total postingan (bisa dimatikan untuk scroll)
     """
-    posts_collection = get_posts_collection()
     user_id = str(current_user["_id"])
     
-    # Build query
-    query = {"is_deleted": {"$ne": True}}
-    if mood:
-        query["mood"] = mood.value
+    # The page itself is shared by all users; only is_liked is per user
+    feed_key = (mood.value if mood else None, page_size, None if cursor else page, cursor, include_total)
+    feed = forum_cache.get_feed(feed_key)
+    if feed is None:
+        # Concurrent misses for the same page share one query
+        feed = await forum_cache.feed_loads.do(
+            feed_key, lambda: load_and_cache_feed_page(feed_key, mood, page, page_size, cursor, include_total)
+        )
     
-    # Get total count
-    total = await posts_collection.count_documents(query)
+    # Resolve is_liked for the whole page at once
+    liked_ids = await get_liked_post_ids(user_id, [post.id for post in feed.posts])
     
-    # Get paginated posts
-    skip = (page - 1) * page_size
-    cursor = posts_collection.find(query).sort("created_at", -1).skip(skip).limit(page_size)
-    posts = await cursor.to_list(page_size)
-    
-    # Format response
-    result_posts = []
-    for post in posts:
-        comments = post.get("comments", [])
-        result_posts.append(PostResponse(
-            id=str(post["_id"]),
-            anonymous_id=post["anonymous_id"],
-            mood=MoodType(post["mood"]),
-            content=post["content"],
-            created_at=post["created_at"],
-            like_count=len(post.get("likes", [])),
-            is_liked=user_id in post.get("likes", []),
-            comment_count=len(comments),
-            comments=[
-                CommentResponse(
-                    comment_id=c["comment_id"],
-                    anonymous_id=c["anonymous_id"],
-                    content=c["content"],
-                    created_at=c["created_at"]
-                )
-                for c in comments[:3]  # Only return first 3 comments in list
-            ]
-        ))
-    
-    return PostListResponse(
-        posts=result_posts,
-        total=total,
-        page=page,
-        page_size=page_size
-    )
+    return json_response(feed_page_json(feed, liked_ids, page, page_size))
 
 
 @router.post("/posts", response_model=PostResponse, status_code=status.HTTP_201_CREATED)
@@ -105,14 +267,17 @@ async def create_post(
         "mood": post_data.mood.value,
         "content": post_data.content,
         "created_at": datetime.utcnow(),
-        "likes": [],
-        "comments": [],
+        "like_count": 0,
+        "comment_count": 0,
+        "comment_preview": [],
         "is_deleted": False
     }
     
     result = await posts_collection.insert_one(post_doc)
+    await increment_stats(total_posts=1)
+    forum_cache.invalidate_feeds()
     
-    return PostResponse(
+    post_response = PostResponse(
         id=str(result.inserted_id),
         anonymous_id=post_doc["anonymous_id"],
         mood=post_data.mood,
@@ -123,6 +288,9 @@ async def create_post(
         comment_count=0,
         comments=[]
     )
+    forum_events.publish("post_created", {"post": post_response.model_dump(mode="json")}, mood=post_data.mood.value)
+    
+    return post_response
 
 
 @router.get("/posts/{post_id}", response_model=PostResponse)
@@ -130,41 +298,55 @@ async def get_post(
     post_id: str,
     current_user: dict = Depends(get_current_user)
 ):
-    """Mendapatkan detail satu postingan beserta semua komentar."""
-    posts_collection = get_posts_collection()
+    """
+    Mendapatkan detail satu postingan beserta halaman pertama komentar.
+    
+    Komentar berikutnya diambil lewat **/posts/{post_id}/comments** dengan
+    cursor dari **comments_next_cursor**.
+    """
     user_id = str(current_user["_id"])
     
+    post_response = forum_cache.get_post(post_id)
+    if post_response is None:
+        # Concurrent misses for the same post share one query
+        post_response = await forum_cache.post_loads.do(post_id, lambda: load_post_detail(post_id))
+        if post_response is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post tidak ditemukan")
+    
+    liked_ids = await get_liked_post_ids(user_id, [post_id])
+    
+    return with_is_liked([post_response], liked_ids)[0]
+
+
+@router.get("/posts/{post_id}/comments", response_model=CommentListResponse)
+async def get_comments(
+    post_id: str,
+    page_size: int = Query(20, ge=1, le=50),
+    cursor: Optional[str] = Query(None, description="Cursor dari next_cursor / comments_next_cursor"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Mendapatkan komentar sebuah postingan, dari yang terlama.
+    
+    - **page_size**: Jumlah komentar per halaman (default 20, maks 50)
+    - **cursor**: Cursor halaman berikutnya
+    """
     try:
-        post = await posts_collection.find_one({
-            "_id": ObjectId(post_id),
-            "is_deleted": {"$ne": True}
-        })
+        post_oid = ObjectId(post_id)
     except:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post tidak ditemukan")
     
+    post, (comments, next_cursor) = await asyncio.gather(
+        get_posts_collection().find_one({"_id": post_oid, "is_deleted": {"$ne": True}}, {"_id": 1}),
+        fetch_comments_page(post_id, page_size, cursor)
+    )
+    
     if not post:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post tidak ditemukan")
     
-    comments = post.get("comments", [])
-    
-    return PostResponse(
-        id=str(post["_id"]),
-        anonymous_id=post["anonymous_id"],
-        mood=MoodType(post["mood"]),
-        content=post["content"],
-        created_at=post["created_at"],
-        like_count=len(post.get("likes", [])),
-        is_liked=user_id in post.get("likes", []),
-        comment_count=len(comments),
-        comments=[
-            CommentResponse(
-                comment_id=c["comment_id"],
-                anonymous_id=c["anonymous_id"],
-                content=c["content"],
-                created_at=c["created_at"]
-            )
-            for c in comments
-        ]
+    return CommentListResponse(
+        comments=[build_comment_response(c) for c in comments],
+        next_cursor=next_cursor
     )
 
 
@@ -175,32 +357,46 @@ async def toggle_like(
 ):
     """Toggle like/unlike pada postingan."""
     posts_collection = get_posts_collection()
+    likes_collection = get_likes_collection()
     user_id = str(current_user["_id"])
     
     try:
-        post = await posts_collection.find_one({"_id": ObjectId(post_id)})
+        post_oid = ObjectId(post_id)
     except:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post tidak ditemukan")
     
+    # Flip this user's like state in one atomic upsert; concurrent taps serialize on
+    # the unique (post_id, user_id) document, so each one sees and applies a real transition
+    like_filter = {"post_id": post_id, "user_id": user_id}
+    now = datetime.utcnow()
+    like = await likes_collection.find_one_and_update(
+        like_filter,
+        [{"$set": {
+            "liked": {"$not": [{"$ifNull": ["$liked", False]}]},
+            "created_at": {"$ifNull": ["$created_at", now]},
+            "updated_at": now
+        }}],
+        upsert=True,
+        projection={"liked": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    liked = like["liked"]
+    
+    post = await posts_collection.find_one_and_update(
+        {"_id": post_oid},
+        {"$inc": {"like_count": 1 if liked else -1}},
+        projection={"like_count": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    
     if not post:
+        await likes_collection.delete_one(like_filter)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post tidak ditemukan")
     
-    likes = post.get("likes", [])
+    forum_cache.update_like_count(post_id, post["like_count"])
+    forum_events.publish("post_liked", {"post_id": post_id, "like_count": post["like_count"]})
     
-    if user_id in likes:
-        # Unlike
-        await posts_collection.update_one(
-            {"_id": ObjectId(post_id)},
-            {"$pull": {"likes": user_id}}
-        )
-        return {"liked": False, "like_count": len(likes) - 1}
-    else:
-        # Like
-        await posts_collection.update_one(
-            {"_id": ObjectId(post_id)},
-            {"$push": {"likes": user_id}}
-        )
-        return {"liked": True, "like_count": len(likes) + 1}
+    return {"liked": liked, "like_count": post["like_count"]}
 
 
 @router.post("/posts/{post_id}/comments", response_model=CommentResponse)
@@ -214,7 +410,7 @@ async def add_comment(
     user_id = str(current_user["_id"])
     
     try:
-        post = await posts_collection.find_one({"_id": ObjectId(post_id)})
+        post = await posts_collection.find_one({"_id": ObjectId(post_id)}, {"_id": 1})
     except:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post tidak ditemukan")
     
@@ -229,17 +425,23 @@ async def add_comment(
         "created_at": datetime.utcnow()
     }
     
+    await get_comments_collection().insert_one({**comment, "post_id": post_id})
+    
+    # Only the first few comments are kept inline; later pushes are sliced off
     await posts_collection.update_one(
-        {"_id": ObjectId(post_id)},
-        {"$push": {"comments": comment}}
+        {"_id": post["_id"]},
+        {
+            "$push": {"comment_preview": {"$each": [comment], "$slice": COMMENT_PREVIEW_SIZE}},
+            "$inc": {"comment_count": 1}
+        }
     )
+    forum_cache.invalidate_post(post_id)
+    forum_cache.invalidate_feeds()
     
-    return CommentResponse(
-        comment_id=comment["comment_id"],
-        anonymous_id=comment["anonymous_id"],
-        content=comment["content"],
-        created_at=comment["created_at"]
-    )
+    comment_response = build_comment_response(comment)
+    forum_events.publish("comment_added", {"post_id": post_id, "comment": comment_response.model_dump(mode="json")})
+    
+    return comment_response
 
 
 @router.post("/posts/{post_id}/report")
@@ -284,6 +486,7 @@ async def report_post(
     }
     
     await reports_collection.insert_one(report_doc)
+    await increment_stats(pending_reports=1)
     
     return {"message": "Laporan berhasil dikirim. Tim kami akan meninjau laporan ini."}
 
@@ -311,9 +514,14 @@ async def delete_post(
             detail="Post tidak ditemukan atau bukan milikmu"
         )
     
-    await posts_collection.update_one(
-        {"_id": ObjectId(post_id)},
+    result = await posts_collection.update_one(
+        {"_id": ObjectId(post_id), "is_deleted": {"$ne": True}},
         {"$set": {"is_deleted": True}}
     )
+    await increment_stats(total_posts=-result.modified_count)
+    forum_cache.invalidate_post(post_id)
+    forum_cache.invalidate_feeds()
+    if result.modified_count:
+        forum_events.publish("post_deleted", {"post_id": post_id})
     
     return {"message": "Post berhasil dihapus"}
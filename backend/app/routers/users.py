@@ -4,14 +4,34 @@ Handles user profile operations
 """
 from fastapi import APIRouter, HTTPException, status, Depends
 from bson import ObjectId
+from bson.errors import InvalidId
 import random
 
-from app.core.security import oauth2_scheme, decode_access_token, get_password_hash, verify_password
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.security import oauth2_scheme, decode_access_token, get_password_hash_async, verify_password_async
 from app.db.mongodb import get_users_collection
 from app.models.user import UserResponse, UserUpdate, PasswordChange
+from app.services.user_search import build_search_fields
 
 router = APIRouter(prefix="/users", tags=["Pengguna"])
 
+# Fields the routers read from current_user (password hash is fetched only when needed)
+CURRENT_USER_PROJECTION = {
+    "email": 1, "full_name": 1, "nim": 1, "anonymous_id": 1,
+    "created_at": 1, "is_active": 1, "is_superuser": 1
+}
+
+user_cache = TTLCache(
+    max_entries=settings.USER_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS
+)
+
+
+def invalidate_user_cache(user_id):
+    """Drop a cached user so the next request reloads it from the database."""
+    user_cache.delete(str(user_id))
+
 
 async def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
     """Get current authenticated user from token."""
@@ -30,16 +50,31 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
             detail="Token tidak valid"
         )
     
-    users = get_users_collection()
-    user = await users.find_one({"_id": ObjectId(user_id)})
+    user = user_cache.get(user_id) if settings.USER_CACHE_ENABLED else None
+    if user is None:
+        users = get_users_collection()
+        try:
+            user = await users.find_one({"_id": ObjectId(user_id)}, CURRENT_USER_PROJECTION)
+        except InvalidId:
+            user = None
+        
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User tidak ditemukan"
+            )
+        
+        if settings.USER_CACHE_ENABLED:
+            user_cache.set(user_id, user)
     
-    if not user:
+    if not user.get("is_active", True):
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User tidak ditemukan"
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Akun dinonaktifkan"
         )
     
-    return user
+    # Copy so handlers can modify their dict without touching the cache
+    return dict(user)
 
 
 @router.get("/me", response_model=UserResponse)
@@ -69,10 +104,16 @@ async def update_profile(
         update_fields["full_name"] = update_data.full_name
     
     if update_fields:
+        search_fields = build_search_fields(
+            current_user["email"],
+            update_fields.get("full_name", current_user["full_name"]),
+            current_user["nim"]
+        )
         await users.update_one(
             {"_id": current_user["_id"]},
-            {"$set": update_fields}
+            {"$set": {**update_fields, "search": search_fields}}
         )
+        invalidate_user_cache(current_user["_id"])
         current_user.update(update_fields)
     
     return UserResponse(
@@ -92,19 +133,22 @@ async def change_password(
     current_user: dict = Depends(get_current_user)
 ):
     """Mengubah password pengguna yang sedang login."""
+    users = get_users_collection()
+    user = await users.find_one({"_id": current_user["_id"]}, {"hashed_password": 1})
+    
     # Verify old password
-    if not verify_password(password_data.old_password, current_user["hashed_password"]):
+    if not await verify_password_async(password_data.old_password, user["hashed_password"]):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Password lama salah"
         )
     
     # Update password
-    users = get_users_collection()
     await users.update_one(
         {"_id": current_user["_id"]},
-        {"$set": {"hashed_password": get_password_hash(password_data.new_password)}}
+        {"$set": {"hashed_password": await get_password_hash_async(password_data.new_password)}}
     )
+    invalidate_user_cache(current_user["_id"])
     
     return {"message": "Password berhasil diubah"}
 
@@ -120,6 +164,7 @@ async def regenerate_anonymous_id(current_user: dict = Depends(get_current_user)
         {"_id": current_user["_id"]},
         {"$set": {"anonymous_id": new_anonymous_id}}
     )
+    invalidate_user_cache(current_user["_id"])
     
     return UserResponse(
         id=str(current_user["_id"]),
@@ -0,0 +1,153 @@
+"""
+MindSupport Backend - Circuit Breaker
+Stops calling a failing dependency for a while, then probes it before trusting it again
+"""
+from typing import Any, Dict, Optional, Set
+import time
+
+from app.core.logging import get_logger
+from app.core.metrics import circuit_breaker_state, circuit_breaker_transitions
+
+
+log = get_logger("circuit_breaker")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Gauge values for circuit_breaker_state
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class Permit:
+    """Handed out by CircuitBreaker.allow(); pass it back with the call's outcome."""
+
+    __slots__ = ("probe",)
+
+    def __init__(self, probe: bool):
+        self.probe = probe
+
+
+# Calls let through while closed need no identity
+_CLOSED_PERMIT = Permit(probe=False)
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker with half-open probing.
+
+    - closed: calls go through; `failure_threshold` failures in a row
+      (slow calls count as failures) open the breaker.
+    - open: calls are rejected for `open_seconds`, so callers can serve a
+      fallback at once instead of waiting on a dependency that is down.
+    - half_open: up to `half_open_probes` calls are let through; one
+      success closes the breaker, one failure opens it again.
+
+    allow() returns a Permit per call, and outcomes are reported with it,
+    so only the probes themselves decide a half-open breaker. Calls let
+    through while closed that finish after it opened are ignored.
+
+    Used from the event loop only, so no locking.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        open_seconds: float,
+        slow_call_seconds: Optional[float] = None,
+        half_open_probes: int = 1
+    ):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.open_seconds = open_seconds
+        self.slow_call_seconds = slow_call_seconds
+        self.half_open_probes = max(1, half_open_probes)
+
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes: Set[Permit] = set()
+        self.consecutive_failures = 0
+        self.rejected = 0
+        self.times_opened = 0
+        circuit_breaker_state.set(self.name, value=STATE_VALUES[CLOSED])
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._transition(HALF_OPEN)
+        return self._state
+
+    def allow(self) -> Optional[Permit]:
+        """A permit if a call may go ahead now; None is counted as rejected."""
+        state = self.state
+        if state == CLOSED:
+            return _CLOSED_PERMIT
+        if state == HALF_OPEN and len(self._probes) < self.half_open_probes:
+            permit = Permit(probe=True)
+            self._probes.add(permit)
+            return permit
+        self.rejected += 1
+        return None
+
+    def record_success(self, permit: Permit, duration: float):
+        """A call completed; it still counts as a failure if it was too slow."""
+        if self.slow_call_seconds and duration >= self.slow_call_seconds:
+            self.record_failure(permit)
+            return
+        if self._finish_probe(permit):
+            self.consecutive_failures = 0
+            self._transition(CLOSED)
+        elif self._state == CLOSED:
+            self.consecutive_failures = 0
+
+    def record_failure(self, permit: Permit):
+        if self._finish_probe(permit):
+            self.consecutive_failures += 1
+            self._transition(OPEN)
+        elif self._state == CLOSED:
+            self.consecutive_failures += 1
+            if self.consecutive_failures >= self.failure_threshold:
+                self._transition(OPEN)
+
+    def release(self, permit: Permit):
+        """A call allowed through ended without an outcome (e.g. the client went away)."""
+        self._finish_probe(permit)
+
+    def stats(self) -> Dict[str, Any]:
+        state = self.state
+        stats = {
+            "state": state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
+        if state == OPEN:
+            stats["retry_in_seconds"] = round(max(0.0, self._opened_at + self.open_seconds - time.monotonic()), 1)
+        return stats
+
+    def _finish_probe(self, permit: Permit) -> bool:
+        """Whether `permit` is a probe of the current half-open period (now finished)."""
+        if permit.probe and permit in self._probes:
+            self._probes.discard(permit)
+            return True
+        return False
+
+    def _transition(self, state: str):
+        previous, self._state = self._state, state
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+            self.times_opened += 1
+        if state != HALF_OPEN:
+            self._probes.clear()
+        circuit_breaker_state.set(self.name, value=STATE_VALUES[state])
+        circuit_breaker_transitions.inc(self.name, state)
+        level = log.warning if state == OPEN else log.info
+        level(
+            "circuit_breaker_transition",
+            f"Circuit breaker '{self.name}' {previous} -> {state}",
+            breaker=self.name,
+            previous=previous,
+            state=state,
+            consecutive_failures=self.consecutive_failures
+        )
@@ -0,0 +1,83 @@
+"""
+MindSupport Backend - Conversation Context Builder
+Fits chat history into a token budget and tracks what needs summarizing
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+
+
+# Rough average for Indonesian/English text with Gemini tokenizers
+CHARS_PER_TOKEN = 4
+
+# Per-message overhead (role markers, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Cheap token estimate without calling the tokenizer."""
+    if not text:
+        return 0
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+@dataclass
+class ConversationContext:
+    """Context sent to the AI for one turn."""
+    summary: Optional[str] = None
+    messages: List[Dict[str, str]] = field(default_factory=list)  # Oldest first
+    # Messages that fell out of the window but are not in the summary yet (oldest first)
+    to_summarize: List[dict] = field(default_factory=list)
+    # Oldest loaded message, when the load was truncated and older
+    # unsummarized messages were left out of both the window and to_summarize
+    backlog_before: Optional[dict] = None
+
+    @property
+    def estimated_tokens(self) -> int:
+        return estimate_tokens(self.summary) + sum(
+            estimate_tokens(msg["content"]) + MESSAGE_OVERHEAD_TOKENS
+            for msg in self.messages
+        )
+
+
+def build_context(
+    recent_messages: List[dict],
+    summary: Optional[str] = None,
+    reserved_tokens: int = 0,
+    token_budget: Optional[int] = None
+) -> ConversationContext:
+    """
+    Select as many recent messages as fit in the token budget.
+
+    Args:
+        recent_messages: Unsummarized messages, newest first
+        summary: Rolling summary of everything older
+        reserved_tokens: Tokens already used by the system prompt and new message
+        token_budget: Total prompt budget (defaults to CHAT_CONTEXT_TOKEN_BUDGET)
+
+    Returns:
+        The context window plus the older messages that should be folded
+        into the summary
+    """
+    if token_budget is None:
+        token_budget = settings.CHAT_CONTEXT_TOKEN_BUDGET
+
+    remaining = token_budget - reserved_tokens - estimate_tokens(summary)
+
+    window = []
+    cutoff = len(recent_messages)
+    for index, msg in enumerate(recent_messages):
+        cost = estimate_tokens(msg["content"]) + MESSAGE_OVERHEAD_TOKENS
+        if cost > remaining:
+            cutoff = index
+            break
+        remaining -= cost
+        window.append({"role": msg["role"], "content": msg["content"]})
+
+    window.reverse()
+    return ConversationContext(
+        summary=summary,
+        messages=window,
+        to_summarize=list(reversed(recent_messages[cutoff:]))
+    )
@@ -0,0 +1,178 @@
+"""
+MindSupport Backend - Forum Cache
+Shared feed pages and post details, kept fresh by the forum write paths
+"""
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from pydantic import TypeAdapter
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.responses import dump_plain_json
+from app.core.singleflight import single_flight
+from app.models.forum import PostResponse
+
+
+_post_json = TypeAdapter(PostResponse)
+_NOT_LIKED = b'"is_liked":false'
+_LIKED = b'"is_liked":true'
+
+
+@dataclass(frozen=True)
+class FeedPage:
+    """User-independent part of a feed page (is_liked is overlaid per request)."""
+    posts: List[PostResponse]
+    total: Optional[int]
+    next_cursor: Optional[str]
+
+    @cached_property
+    def posts_json(self) -> List[Tuple[bytes, bytes]]:
+        """Each post serialized once per cached page: (not liked, liked)."""
+        variants = []
+        for post in self.posts:
+            body = _post_json.dump_json(post)
+            # Quotes inside JSON strings are escaped, so this only matches the field itself
+            variants.append((body, body.replace(_NOT_LIKED, _LIKED, 1)))
+        return variants
+
+
+class ForumCache:
+    """
+    In-process cache for forum reads.
+
+    Cached PostResponse objects always have is_liked=False and are shared
+    between requests, so callers must copy before changing them.
+
+    Cache misses go through `feed_loads` / `post_loads`, so a burst of
+    identical misses runs one query. Writes make the next miss start a
+    fresh load rather than join one that began before the write, and the
+    coalesced load itself applies the generation check below.
+
+    Every write bumps `generation`. A load captures it before querying and
+    passes it to set_feed/set_post, which drop the result if a write that
+    touches it happened meanwhile; otherwise a slow read could put a
+    deleted post back for the whole TTL.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, enabled: bool = True):
+        self.enabled = enabled
+        self.feeds = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self.posts = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self.feed_loads = single_flight("forum_feed")
+        self.post_loads = single_flight("forum_post")
+
+        self.generation = 0
+        self._feeds_changed_at = 0
+        # post ID -> generation of its last write; bounded, see _mark_post_changed
+        self._post_changed_at: Dict[str, int] = {}
+        self._max_tracked_posts = max(1, max_entries) * 4
+        self._untracked_posts_changed_at = 0
+
+    # ==================== Reads ====================
+
+    def get_feed(self, key: Hashable) -> Optional[FeedPage]:
+        return self.feeds.get(key) if self.enabled else None
+
+    def set_feed(self, key: Hashable, page: FeedPage, generation: int):
+        """Cache a page loaded since `generation`, unless it is already stale."""
+        if not self.enabled or self._feeds_changed_at > generation:
+            return
+        if any(self._post_changed_since(post.id, generation) for post in page.posts):
+            return
+        self.feeds.set(key, page)
+
+    def get_post(self, post_id: str) -> Optional[PostResponse]:
+        return self.posts.get(post_id) if self.enabled else None
+
+    def set_post(self, post_id: str, post: PostResponse, generation: int):
+        """Cache a post loaded since `generation`, unless it is already stale."""
+        if self.enabled and not self._post_changed_since(post_id, generation):
+            self.posts.set(post_id, post)
+
+    # ==================== Writes ====================
+
+    def invalidate_feeds(self):
+        """Drop all feed pages (new post, deletion, comment)."""
+        self.generation += 1
+        self._feeds_changed_at = self.generation
+        self.feeds.clear()
+        self.feed_loads.forget_all()
+
+    def invalidate_post(self, post_id: str):
+        self._mark_post_changed(post_id)
+        self.posts.delete(post_id)
+        self.post_loads.forget(post_id)
+
+    def update_like_count(self, post_id: str, like_count: int):
+        """Write a new like count through to every cached copy of the post."""
+        self._mark_post_changed(post_id)
+        # Loads in flight may carry the old count; new readers must not join them
+        self.post_loads.forget(post_id)
+        self.feed_loads.forget_all()
+        post = self.posts.get(post_id)
+        if post is not None:
+            self.posts.replace(post_id, post.model_copy(update={"like_count": like_count}))
+
+        for key, page in self.feeds.items():
+            if not any(p.id == post_id for p in page.posts):
+                continue
+            posts = [
+                p.model_copy(update={"like_count": like_count}) if p.id == post_id else p
+                for p in page.posts
+            ]
+            self.feeds.replace(key, FeedPage(posts=posts, total=page.total, next_cursor=page.next_cursor))
+
+    def stats(self) -> dict:
+        return {"feeds": self.feeds.stats(), "posts": self.posts.stats()}
+
+    # ==================== Generations ====================
+
+    def _mark_post_changed(self, post_id: str):
+        self.generation += 1
+        if len(self._post_changed_at) >= self._max_tracked_posts:
+            # Forget per-post history: every post counts as changed now
+            self._post_changed_at.clear()
+            self._untracked_posts_changed_at = self.generation
+        self._post_changed_at[post_id] = self.generation
+
+    def _post_changed_since(self, post_id: str, generation: int) -> bool:
+        changed_at = self._post_changed_at.get(post_id, self._untracked_posts_changed_at)
+        return changed_at > generation
+
+
+def with_is_liked(posts: List[PostResponse], liked_ids: set) -> List[PostResponse]:
+    """Overlay the per-user is_liked flag on shared cached posts."""
+    return [
+        post.model_copy(update={"is_liked": True}) if post.id in liked_ids else post
+        for post in posts
+    ]
+
+
+def feed_page_json(page: FeedPage, liked_ids: set, page_number: int, page_size: int) -> bytes:
+    """
+    The PostListResponse body for one user, spliced from pre-serialized posts.
+
+    Equivalent to serializing PostListResponse(posts=with_is_liked(...), ...)
+    without copying or re-encoding the shared posts on every request.
+    """
+    posts = b",".join(
+        liked if post.id in liked_ids else not_liked
+        for post, (not_liked, liked) in zip(page.posts, page.posts_json)
+    )
+    # Remaining PostListResponse fields, in declaration order
+    rest = dump_plain_json({
+        "total": page.total,
+        "page": page_number,
+        "page_size": page_size,
+        "next_cursor": page.next_cursor,
+    })
+    return b'{"posts":[' + posts + b"]," + rest[1:]
+
+
+forum_cache = ForumCache(
+    max_entries=settings.FORUM_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.FORUM_CACHE_TTL_SECONDS,
+    enabled=settings.FORUM_CACHE_ENABLED
+)
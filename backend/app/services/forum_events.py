@@ -0,0 +1,99 @@
+"""
+MindSupport Backend - Forum Events
+In-process pub/sub broker that pushes small forum deltas to subscribers
+"""
+from datetime import datetime
+from typing import Optional, Set
+import asyncio
+import json
+
+from app.core.config import settings
+
+
+class Subscription:
+    """One connected client with a bounded queue of pre-encoded events."""
+
+    def __init__(self, queue_size: int, mood: Optional[str] = None):
+        self.queue: "asyncio.Queue[Optional[str]]" = asyncio.Queue(maxsize=queue_size)
+        self.mood = mood
+        self.evicted = False
+
+    def wants(self, mood: Optional[str]) -> bool:
+        # Events without a mood (likes, comments, deletions) go to everyone
+        return self.mood is None or mood is None or mood == self.mood
+
+
+class ForumEventBroker:
+    """
+    Fan-out broker for forum events.
+
+    Publishing never blocks: each event is encoded once and offered to every
+    subscriber queue; a subscriber whose queue is full is evicted so a slow
+    client can't hold memory or delay everyone else.
+    """
+
+    def __init__(self, queue_size: int, max_subscribers: int):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self._subscribers: Set[Subscription] = set()
+        self.published = 0
+        self.evicted = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self, mood: Optional[str] = None) -> Optional[Subscription]:
+        """Register a subscriber, or return None when the worker is at capacity."""
+        if len(self._subscribers) >= self.max_subscribers:
+            return None
+        subscription = Subscription(self.queue_size, mood)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self._subscribers.discard(subscription)
+
+    def publish(self, event: str, data: dict, mood: Optional[str] = None):
+        """Encode an event once as an SSE frame and offer it to all matching subscribers."""
+        if not self._subscribers:
+            return
+
+        frame = f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=_json_default)}\n\n"
+        self.published += 1
+
+        for subscription in list(self._subscribers):
+            if not subscription.wants(mood):
+                continue
+            try:
+                subscription.queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                self._evict(subscription)
+
+    def _evict(self, subscription: Subscription):
+        self.unsubscribe(subscription)
+        subscription.evicted = True
+        self.evicted += 1
+        # Make room for the close signal so the consumer wakes up and exits
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(None)
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "evicted": self.evicted
+        }
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+forum_events = ForumEventBroker(
+    queue_size=settings.FORUM_EVENTS_QUEUE_SIZE,
+    max_subscribers=settings.FORUM_EVENTS_MAX_SUBSCRIBERS
+)
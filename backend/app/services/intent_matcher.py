@@ -0,0 +1,147 @@
+"""
+MindSupport Backend - Fallback Intent Matcher
+Data-driven keyword intents compiled once into word-level lookup tables
+"""
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+import json
+import re
+
+
+DEFAULT_INTENTS_PATH = Path(__file__).parent / "data" / "fallback_intents.json"
+
+
+@dataclass(frozen=True)
+class Intent:
+    """A canned reply and the keywords that trigger it (lower priority wins)."""
+    name: str
+    priority: int
+    keywords: Tuple[str, ...]
+    response: str
+
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+# A keyword is a tuple of word patterns; the first/last may carry "*" affixes
+Keyword = Tuple[str, ...]
+
+
+def word_matches(pattern: str, word: str) -> bool:
+    """Match one word against a keyword word ("*akhiri" matches "mengakhiri")."""
+    if "*" not in pattern:
+        return word == pattern
+    if len(pattern) > 1 and pattern[0] == "*" and pattern[-1] == "*":
+        return pattern[1:-1] in word
+    if pattern[0] == "*":
+        return word.endswith(pattern[1:])
+    return word.startswith(pattern[:-1])
+
+
+class IntentMatcher:
+    """
+    Picks the highest-priority intent mentioned anywhere in a message.
+
+    Keywords match whole words only ("hi" does not match "hilang"), spaces
+    in a keyword match any whitespace, and a leading or trailing "*" allows
+    affixes on that side. The message is split into words once; keywords
+    are indexed by their first word, so finding candidates is one set
+    intersection; affixed keywords are only tried when their stem appears
+    in the message at all.
+    """
+
+    def __init__(self, intents: List[Intent], default_response: str):
+        self.intents = sorted(intents, key=lambda intent: intent.priority)
+        self.default_response = default_response
+
+        # first word -> [(remaining words, intent index)], best intent first
+        self._by_first_word: Dict[str, List[Tuple[Keyword, int]]] = {}
+        # [(stem, first word pattern, remaining words, intent index)], best intent first
+        self._affixed: List[Tuple[str, str, Keyword, int]] = []
+
+        for index, intent in enumerate(self.intents):
+            for keyword in intent.keywords:
+                words = tuple(keyword.lower().split())
+                if not words:
+                    continue
+                if "*" in words[0]:
+                    self._affixed.append((words[0].strip("*"), words[0], words[1:], index))
+                else:
+                    self._by_first_word.setdefault(words[0], []).append((words[1:], index))
+
+    def match(self, message: str) -> Optional[Intent]:
+        """Return the best matching intent, or None."""
+        best = len(self.intents)
+        lowered = message.lower()
+        words = _WORD.findall(lowered)
+
+        # Set intersection finds every keyword start in one C-level pass
+        for word in self._by_first_word.keys() & set(words):
+            for rest, index in self._by_first_word[word]:
+                if index >= best:
+                    break
+                if not rest or self._phrase_occurs(words, word, rest):
+                    best = index
+                    break
+
+        # Affixed keywords are only tried when their stem occurs at all
+        for stem, pattern, rest, index in self._affixed:
+            if index >= best:
+                break
+            if stem in lowered and self._phrase_occurs(words, pattern, rest):
+                best = index
+
+        return self.intents[best] if best < len(self.intents) else None
+
+    def respond(self, message: str) -> str:
+        intent = self.match(message)
+        return intent.response if intent else self.default_response
+
+    def restricted_to(self, *names: str) -> "IntentMatcher":
+        """A matcher over just the named intents, keeping their keywords and order."""
+        return IntentMatcher(
+            [intent for intent in self.intents if intent.name in names],
+            self.default_response
+        )
+
+    @staticmethod
+    def _phrase_occurs(words: List[str], first: str, rest: Keyword) -> bool:
+        """Whether `first` followed by `rest` occurs anywhere in `words`."""
+        size = len(rest)
+        for position in _positions(words, first):
+            following = words[position + 1:position + 1 + size]
+            if len(following) == size and all(map(word_matches, rest, following)):
+                return True
+        return False
+
+
+def _positions(words: List[str], pattern: str) -> Iterator[int]:
+    """Indexes of the words matching `pattern` (exact words use list.index)."""
+    if "*" in pattern:
+        yield from (position for position, word in enumerate(words) if word_matches(pattern, word))
+        return
+
+    position = -1
+    while True:
+        try:
+            position = words.index(pattern, position + 1)
+        except ValueError:
+            return
+        yield position
+
+
+def load_intent_matcher(path: Union[str, Path, None] = None) -> IntentMatcher:
+    """Load and compile the intent table (JSON with `intents` and `default_response`)."""
+    with open(path or DEFAULT_INTENTS_PATH, encoding="utf-8") as f:
+        data = json.load(f)
+
+    intents = [
+        Intent(
+            name=item["name"],
+            priority=item["priority"],
+            keywords=tuple(item["keywords"]),
+            response=item["response"]
+        )
+        for item in data["intents"]
+    ]
+    return IntentMatcher(intents, data["default_response"])
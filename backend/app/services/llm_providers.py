@@ -0,0 +1,289 @@
+"""
+MindSupport Backend - LLM Providers
+Interchangeable chat model backends (Gemini, OpenAI-compatible, local stub)
+"""
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional
+import asyncio
+import os
+import random
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+
+@dataclass
+class LLMRequest:
+    """Provider-neutral generation request."""
+    messages: List[Dict[str, str]]  # {"role": "user" | "assistant", "content"}, oldest first
+    system: Optional[str] = None
+    temperature: float = 0.7
+    max_tokens: int = 1000
+
+
+class LLMProviderError(Exception):
+    """Raised by providers when a generation fails."""
+
+
+class LLMProvider(ABC):
+    """Interface for chat model backends."""
+
+    name = "base"
+
+    @abstractmethod
+    async def generate(self, request: LLMRequest) -> str:
+        """The whole reply text."""
+
+    @abstractmethod
+    def stream(self, request: LLMRequest) -> AsyncIterator[str]:
+        """Reply text chunks as they arrive (implemented as an async generator)."""
+
+
+# ==================== Gemini ====================
+
+class GeminiProvider(LLMProvider):
+    """Google Gemini through the google-genai async client."""
+
+    name = "gemini"
+
+    def __init__(self, api_key: str, model: str):
+        from google import genai
+
+        self.client = genai.Client(api_key=api_key)
+        self.model = model
+
+    async def generate(self, request: LLMRequest) -> str:
+        response = await self.client.aio.models.generate_content(
+            model=self.model,
+            contents=self._build_contents(request),
+            config=self._generation_config(request)
+        )
+        return response.text
+
+    async def stream(self, request: LLMRequest) -> AsyncIterator[str]:
+        stream = await self.client.aio.models.generate_content_stream(
+            model=self.model,
+            contents=self._build_contents(request),
+            config=self._generation_config(request)
+        )
+        async for chunk in stream:
+            if chunk.text:
+                yield chunk.text
+
+    def _build_contents(self, request: LLMRequest) -> list:
+        """Build Gemini contents; the system prompt rides on the first user turn."""
+        from google.genai import types
+
+        messages = request.messages
+        if not request.system:
+            return [
+                types.Content(
+                    role="user" if msg["role"] == "user" else "model",
+                    parts=[types.Part(text=msg["content"])]
+                )
+                for msg in messages
+            ]
+
+        # Single turn: system + message together; otherwise open with a greeting
+        opener = messages[0]["content"] if len(messages) == 1 else "Halo"
+        contents = [types.Content(
+            role="user",
+            parts=[types.Part(text=f"[SYSTEM INSTRUCTION]\n{request.system}\n\n[USER MESSAGE]\n{opener}")]
+        )]
+        if len(messages) > 1:
+            for msg in messages:
+                contents.append(types.Content(
+                    role="user" if msg["role"] == "user" else "model",
+                    parts=[types.Part(text=msg["content"])]
+                ))
+        return contents
+
+    def _generation_config(self, request: LLMRequest):
+        from google.genai import types
+
+        return types.GenerateContentConfig(
+            temperature=request.temperature,
+            max_output_tokens=request.max_tokens,
+        )
+
+
+# ==================== OpenAI-compatible ====================
+
+class OpenAICompatibleProvider(LLMProvider):
+    """Any Chat Completions API (OpenAI, vLLM, Ollama, LM Studio, ...)."""
+
+    name = "openai"
+
+    def __init__(self, api_key: str, model: str, base_url: Optional[str] = None):
+        from openai import AsyncOpenAI
+
+        self.client = AsyncOpenAI(api_key=api_key, base_url=base_url or None)
+        self.model = model
+
+    async def generate(self, request: LLMRequest) -> str:
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=self._build_messages(request),
+            temperature=request.temperature,
+            max_tokens=request.max_tokens
+        )
+        return response.choices[0].message.content or ""
+
+    async def stream(self, request: LLMRequest) -> AsyncIterator[str]:
+        stream = await self.client.chat.completions.create(
+            model=self.model,
+            messages=self._build_messages(request),
+            temperature=request.temperature,
+            max_tokens=request.max_tokens,
+            stream=True
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    def _build_messages(self, request: LLMRequest) -> List[Dict[str, str]]:
+        messages = [{"role": "system", "content": request.system}] if request.system else []
+        messages.extend(
+            {"role": "user" if msg["role"] == "user" else "assistant", "content": msg["content"]}
+            for msg in request.messages
+        )
+        return messages
+
+
+# ==================== Local stub ====================
+
+STUB_REPLY = (
+    "Terima kasih sudah bercerita. Aku mendengarkanmu dan perasaanmu valid. "
+    "Coba tarik napas perlahan selama empat detik, tahan sebentar, lalu hembuskan. "
+    "Kalau kamu mau, ceritakan lebih lanjut apa yang paling berat buatmu hari ini, "
+    "aku di sini untuk menemanimu. "
+)
+
+
+class StubProvider(LLMProvider):
+    """
+    Offline provider for load tests: no network, realistic timing.
+
+    Each call waits a time-to-first-token drawn from the configured
+    distribution, then emits `reply_tokens` word-sized chunks at
+    `tokens_per_second`, failing with probability `error_rate`.
+    """
+
+    name = "stub"
+
+    DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal")
+
+    def __init__(
+        self,
+        latency_ms: float,
+        distribution: str = "lognormal",
+        spread: float = 0.5,
+        tokens_per_second: float = 50.0,
+        reply_tokens: int = 120,
+        error_rate: float = 0.0,
+        seed: Optional[int] = None
+    ):
+        if distribution not in self.DISTRIBUTIONS:
+            raise ValueError(f"Unknown stub latency distribution: {distribution}")
+        self.latency_ms = latency_ms
+        self.distribution = distribution
+        self.spread = spread
+        self.tokens_per_second = tokens_per_second
+        self.reply_tokens = reply_tokens
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+
+        words = STUB_REPLY.split()
+        self.tokens = [f"{words[i % len(words)]} " for i in range(reply_tokens)]
+
+    def sample_latency(self) -> float:
+        """Time to first token in seconds."""
+        median = self.latency_ms / 1000
+        if self.distribution == "fixed":
+            latency = median
+        elif self.distribution == "uniform":
+            latency = self.random.uniform(median * (1 - self.spread), median * (1 + self.spread))
+        elif self.distribution == "normal":
+            latency = self.random.gauss(median, median * self.spread)
+        else:
+            # Long right tail, like real model latency; `spread` is sigma
+            latency = self.random.lognormvariate(0, self.spread) * median
+        return max(0.0, latency)
+
+    async def generate(self, request: LLMRequest) -> str:
+        await self._first_token()
+        if self.tokens_per_second > 0:
+            await asyncio.sleep(len(self.tokens) / self.tokens_per_second)
+        return "".join(self.tokens).strip()
+
+    async def stream(self, request: LLMRequest) -> AsyncIterator[str]:
+        await self._first_token()
+        delay = 1 / self.tokens_per_second if self.tokens_per_second > 0 else 0
+        for index, token in enumerate(self.tokens):
+            if index and delay:
+                await asyncio.sleep(delay)
+            yield token
+
+    async def _first_token(self):
+        await asyncio.sleep(self.sample_latency())
+        if self.error_rate and self.random.random() < self.error_rate:
+            raise LLMProviderError("Simulated provider error")
+
+
+# ==================== Factory ====================
+
+def create_llm_provider() -> Optional[LLMProvider]:
+    """
+    Build the provider selected by LLM_PROVIDER.
+
+    Returns None when the selected provider has no credentials, in which
+    case the chat service answers with fallback responses.
+    """
+    provider = settings.LLM_PROVIDER.strip().lower()
+    log = get_logger("llm")
+
+    if provider == "stub":
+        log.warning(
+            "llm_provider_configured",
+            f"Using stub LLM provider ({settings.LLM_STUB_LATENCY_DISTRIBUTION}, ~{settings.LLM_STUB_LATENCY_MS:g} ms)",
+            provider="stub"
+        )
+        return StubProvider(
+            latency_ms=settings.LLM_STUB_LATENCY_MS,
+            distribution=settings.LLM_STUB_LATENCY_DISTRIBUTION,
+            spread=settings.LLM_STUB_LATENCY_SPREAD,
+            tokens_per_second=settings.LLM_STUB_TOKENS_PER_SECOND,
+            reply_tokens=settings.LLM_STUB_REPLY_TOKENS,
+            error_rate=settings.LLM_STUB_ERROR_RATE,
+            seed=settings.LLM_STUB_SEED
+        )
+
+    if provider == "openai":
+        api_key = settings.OPENAI_API_KEY or os.getenv("OPENAI_API_KEY", "")
+        if not api_key:
+            log.warning("llm_provider_missing_key", "OPENAI_API_KEY not set, using fallback responses", provider="openai")
+            return None
+        try:
+            llm = OpenAICompatibleProvider(api_key, settings.OPENAI_MODEL, settings.OPENAI_BASE_URL)
+            log.info("llm_provider_configured", "OpenAI-compatible provider configured", provider="openai", model=settings.OPENAI_MODEL)
+            return llm
+        except Exception as e:
+            log.error("llm_provider_failed", "Failed to configure OpenAI-compatible provider", provider="openai", error=str(e))
+            return None
+
+    if provider != "gemini":
+        raise ValueError(f"Unknown LLM_PROVIDER: {settings.LLM_PROVIDER}")
+
+    # Read API key from settings or directly from env
+    api_key = settings.GEMINI_API_KEY or os.getenv("GEMINI_API_KEY", "")
+    if not api_key or api_key == "your-gemini-api-key-here":
+        log.warning("llm_provider_missing_key", "GEMINI_API_KEY not set, using fallback responses", provider="gemini")
+        return None
+    try:
+        llm = GeminiProvider(api_key, settings.GEMINI_MODEL)
+        log.info("llm_provider_configured", "Gemini AI configured successfully", provider="gemini", model=settings.GEMINI_MODEL)
+        return llm
+    except Exception as e:
+        log.error("llm_provider_failed", "Failed to configure Gemini", provider="gemini", error=str(e))
+        return None
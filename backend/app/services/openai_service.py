@@ -1,13 +1,32 @@
 """
 MindSupport Backend - AI Service
-Handles integration with Google Gemini API for AI chatbot functionality
+Chatbot replies through the configured LLM provider, with caching and fallbacks
 """
-from google import genai
-from google.genai import types
-from typing import List, Dict
-import os
+from typing import Awaitable, Callable, List, Dict, AsyncIterator, Optional
+import asyncio
+import time
 
 from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import (
+    llm_errors,
+    llm_fallback_responses,
+    llm_hedged_requests,
+    llm_request_duration,
+    llm_requests_in_progress,
+    llm_time_to_first_token,
+    llm_tokens
+)
+from app.services.circuit_breaker import CircuitBreaker, Permit
+from app.services.context_builder import CHARS_PER_TOKEN, MESSAGE_OVERHEAD_TOKENS, estimate_tokens
+from app.services.intent_matcher import load_intent_matcher
+from app.services.llm_providers import LLMProvider, LLMRequest, create_llm_provider
+from app.services.response_cache import (
+    ResponseCache,
+    ResponseCachePolicy,
+    create_response_cache,
+    make_cache_key
+)
 
 
 # System prompt for the empathetic AI counselor
@@ -43,152 +62,404 @@ GAYA KOMUNIKASI:
 Ingat: Kamu adalah teman curhat, bukan terapis. Kamu di sini untuk mendengarkan dan memberikan dukungan emosional."""
 
 
-class GeminiService:
-    """Service for interacting with Google Gemini API using new google-genai package."""
+log = get_logger("llm")
+
+# Fallback intent whose messages must always reach the model (or its crisis reply)
+CRISIS_INTENT = "krisis"
+
+
+class AIService:
+    """Counselor chatbot on top of a pluggable LLM provider (see llm_providers)."""
     
-    def __init__(self):
-        self.client = None
-        # Read API key from settings or directly from env
-        api_key = settings.GEMINI_API_KEY or os.getenv("GEMINI_API_KEY", "")
-        
-        if api_key and api_key != "your-gemini-api-key-here":
-            try:
-                self.client = genai.Client(api_key=api_key)
-                print("✅ Gemini AI configured successfully")
-            except Exception as e:
-                print(f"❌ Failed to configure Gemini: {e}")
-                self.client = None
-        else:
-            print("⚠️ GEMINI_API_KEY not set, using fallback responses")
+    def __init__(self, provider: Optional[LLMProvider] = None, cache: Optional[ResponseCache] = None):
+        self.provider = provider
+        # Canned replies for when the model is unavailable, compiled once
+        self.fallback = load_intent_matcher(settings.FALLBACK_INTENTS_FILE or None)
+        # Crisis messages are never cached, using the same keywords the fallback routes on
+        crisis = self.fallback.restricted_to(CRISIS_INTENT)
+        if not crisis.intents:
+            log.warning("crisis_intent_missing", "Fallback intents have no crisis intent", intent=CRISIS_INTENT)
+        self.cache = cache
+        self.cache_policy = ResponseCachePolicy(
+            safe_messages=settings.chat_cache_safe_messages_list,
+            blocked=crisis
+        )
+        # Bound in-flight model calls so a slow provider can't pile up unbounded work
+        self.semaphore = asyncio.Semaphore(max(1, settings.LLM_MAX_CONCURRENCY))
+        # Serve fallbacks at once while the provider keeps failing or timing out
+        self.breaker = CircuitBreaker(
+            "llm",
+            failure_threshold=settings.LLM_BREAKER_FAILURE_THRESHOLD,
+            open_seconds=settings.LLM_BREAKER_OPEN_SECONDS,
+            slow_call_seconds=settings.LLM_BREAKER_SLOW_CALL_SECONDS
+        )
     
     async def get_response(
         self,
         user_message: str,
-        chat_history: List[Dict[str, str]] = None
+        chat_history: List[Dict[str, str]] = None,
+        summary: Optional[str] = None
     ) -> str:
         """
         Get AI response for user message.
         
         Args:
             user_message: The user's message
-            chat_history: Previous messages in the conversation
+            chat_history: Previous messages in the conversation (already budgeted)
+            summary: Rolling summary of older turns
             
         Returns:
             AI response string
         """
-        if not self.client:
+        if not self.provider:
+            llm_fallback_responses.inc("no_provider")
             return self._get_fallback_response(user_message)
         
+        cache_key = self._cache_key(user_message, chat_history, summary)
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        permit = self.breaker.allow()
+        if permit is None:
+            llm_fallback_responses.inc("circuit_open")
+            return self._get_fallback_response(user_message)
+        
+        request = self._build_request(user_message, chat_history, summary)
+        llm_requests_in_progress.inc(self.provider.name)
+        queued = time.perf_counter()
+        started = None
         try:
-            # Build contents array with history
-            contents = []
+            async with asyncio.timeout(settings.LLM_TIMEOUT_SECONDS):
+                async with self.semaphore:
+                    started = time.perf_counter()
+                    text = await self._hedged(lambda: self.provider.generate(request))
+            self._record_success("generate", permit, started, request, text)
             
-            # Add system instruction as first message
-            contents.append(types.Content(
-                role="user",
-                parts=[types.Part(text=f"[SYSTEM INSTRUCTION]\n{SYSTEM_PROMPT}\n\n[USER MESSAGE]\n{user_message if not chat_history else 'Halo'}")]
-            ))
+            if cache_key and text:
+                self.cache.set(cache_key, text)
+            if not text:
+                # Blocked or empty completions must still answer the user
+                llm_fallback_responses.inc("empty")
+                return self._get_fallback_response(user_message)
+            return text
             
-            # If we have chat history, add it
-            if chat_history:
-                for msg in chat_history[-10:]:
-                    role = "user" if msg["role"] == "user" else "model"
-                    contents.append(types.Content(
-                        role=role,
-                        parts=[types.Part(text=msg["content"])]
-                    ))
-                # Add current message
-                contents.append(types.Content(
-                    role="user",
-                    parts=[types.Part(text=user_message)]
-                ))
-            
-            # Generate response
-            response = self.client.models.generate_content(
-                model="gemini-2.5-flash-lite",
-                contents=contents,
-                config=types.GenerateContentConfig(
-                    temperature=0.7,
-                    max_output_tokens=1000,
-                )
-            )
+        except asyncio.CancelledError:
+            self.breaker.release(permit)
+            raise
+        except Exception as e:
+            llm_fallback_responses.inc(self._record_failure("generate", permit, queued, started, e))
+            return self._get_fallback_response(user_message)
+        finally:
+            llm_requests_in_progress.dec(self.provider.name)
+    
+    async def stream_response(
+        self,
+        user_message: str,
+        chat_history: List[Dict[str, str]] = None,
+        summary: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream AI response chunks for user message as they are generated.
+        
+        Falls back to the canned response (as a single chunk) when the model
+        is unavailable, the breaker is open, or no text arrives within
+        LLM_FIRST_TOKEN_TIMEOUT_SECONDS. A stream that stalls for
+        LLM_STREAM_IDLE_TIMEOUT_SECONDS after producing text just ends.
+        """
+        if not self.provider:
+            llm_fallback_responses.inc("no_provider")
+            yield self._get_fallback_response(user_message)
+            return
+        
+        cache_key = self._cache_key(user_message, chat_history, summary)
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+        
+        permit = self.breaker.allow()
+        if permit is None:
+            llm_fallback_responses.inc("circuit_open")
+            yield self._get_fallback_response(user_message)
+            return
+        
+        request = self._build_request(user_message, chat_history, summary)
+        produced = False
+        chunks = []
+        llm_requests_in_progress.inc(self.provider.name)
+        queued = time.perf_counter()
+        started = None
+        first_token_seconds = None
+        stream = None
+        # Deadlines wrap each await only, never a yield, so time spent by
+        # the consumer between chunks is not charged to the provider
+        first_token_deadline = asyncio.get_running_loop().time() + settings.LLM_FIRST_TOKEN_TIMEOUT_SECONDS
+        try:
+            async with asyncio.timeout_at(first_token_deadline):
+                await self.semaphore.acquire()
+            try:
+                started = time.perf_counter()
+                stream = self.provider.stream(request)
+                while True:
+                    deadline = (
+                        asyncio.get_running_loop().time() + settings.LLM_STREAM_IDLE_TIMEOUT_SECONDS
+                        if produced else first_token_deadline
+                    )
+                    async with asyncio.timeout_at(deadline):
+                        chunk = await anext(stream, None)
+                    if chunk is None:
+                        break
+                    if not produced:
+                        first_token_seconds = time.perf_counter() - started
+                        llm_time_to_first_token.observe(first_token_seconds, self.provider.name)
+                    produced = True
+                    chunks.append(chunk)
+                    yield chunk
+            finally:
+                self.semaphore.release()
+            # Long replies stream for a while; only a slow start counts as slow
+            self._record_success("stream", permit, started, request, "".join(chunks), first_token_seconds)
             
-            return response.text
+            # Only cache replies that streamed to completion
+            if cache_key and chunks:
+                self.cache.set(cache_key, "".join(chunks))
             
+            # Blocked or empty completions must still answer the user
+            if not produced:
+                llm_fallback_responses.inc("empty")
+                yield self._get_fallback_response(user_message)
+        
+        except (asyncio.CancelledError, GeneratorExit):
+            # The client went away; that says nothing about the provider
+            self.breaker.release(permit)
+            raise
         except Exception as e:
-            print(f"Gemini API Error: {e}")
-            return self._get_fallback_response(user_message)
+            reason = self._record_failure("stream", permit, queued, started, e)
+            if not produced:
+                llm_fallback_responses.inc(reason)
+                yield self._get_fallback_response(user_message)
+        finally:
+            if stream is not None:
+                await stream.aclose()
+            llm_requests_in_progress.dec(self.provider.name)
     
-    def _get_fallback_response(self, user_message: str) -> str:
-        """Generate fallback response when Gemini is unavailable."""
-        lower_msg = user_message.lower()
+    def _cache_key(
+        self,
+        user_message: str,
+        chat_history: List[Dict[str, str]] = None,
+        summary: Optional[str] = None
+    ) -> Optional[str]:
+        """Cache key for this turn, or None when it must not be cached."""
+        if self.cache is None:
+            return None
+        if not self.cache_policy.is_cacheable(user_message, chat_history, summary):
+            return None
+        return make_cache_key(user_message, chat_history, summary)
+    
+    async def summarize(
+        self,
+        previous_summary: Optional[str],
+        messages: List[Dict[str, str]]
+    ) -> str:
+        """
+        Fold older messages into the rolling conversation summary.
         
-        if any(word in lower_msg for word in ['cemas', 'khawatir', 'takut', 'panik']):
-            return """Aku mengerti perasaan cemasmu. Rasa cemas adalah respons alami tubuh, dan kamu tidak salah merasakannya. 💜
-
-Mari kita coba teknik pernapasan sederhana:
-
-🌬️ **Tarik napas dalam** selama 4 detik
-⏸️ **Tahan** selama 4 detik  
-💨 **Hembuskan** selama 4 detik
-
-Ulangi 3-5 kali. Bagaimana perasaanmu setelah mencoba?"""
-
-        if any(word in lower_msg for word in ['sedih', 'menangis', 'down', 'murung']):
-            return """Terima kasih sudah berbagi perasaanmu. Menangis itu tidak apa-apa, itu cara tubuh melepaskan emosi. 💜
-
-Kamu tidak harus kuat setiap saat. Kadang, mengakui bahwa kita sedih adalah langkah pertama untuk merasa lebih baik.
-
-Maukah kamu ceritakan apa yang membuatmu merasa seperti ini?"""
-
-        if any(word in lower_msg for word in ['stress', 'tugas', 'kuliah', 'skripsi', 'deadline']):
-            return """Tekanan akademik memang bisa sangat overwhelming. Kamu tidak sendirian merasakannya. 💜
-
-Coba kita uraikan bebanmu:
-
-1. **Identifikasi** - Apa tugas yang paling mendesak?
-2. **Prioritaskan** - Mana yang bisa dikerjakan hari ini?
-3. **Mulai kecil** - Kerjakan dalam potongan 25 menit (Pomodoro)
-
-Ingat, progress kecil tetap progress. Apa yang paling membuatmu khawatir sekarang?"""
-
-        if any(word in lower_msg for word in ['bunuh', 'mati', 'menyakiti', 'akhiri']):
-            return """💜 Aku sangat peduli dengan keselamatanmu.
-
-Jika kamu memiliki pikiran untuk menyakiti diri sendiri, tolong hubungi bantuan profesional sekarang:
-
-📞 **Into The Light Indonesia**: 119 ext. 8
-📞 **Yayasan Pulih**: (021) 788-42580
-📞 **LSM Jangan Bunuh Diri**: (021) 9696-9293
-
-Kamu tidak harus menghadapi ini sendirian. Ada orang yang peduli dan siap membantu 24/7.
-
-Apakah ada orang terdekat yang bisa kamu hubungi sekarang?"""
-
-        if any(word in lower_msg for word in ['terima kasih', 'makasih', 'thanks']):
-            return """Sama-sama! 💜 Aku senang bisa menemanimu.
-
-Ingat, kamu selalu bisa kembali ke sini kapanpun kamu butuh teman untuk berbagi. Jaga dirimu ya!"""
-
-        if any(word in lower_msg for word in ['halo', 'hai', 'hi', 'hello', 'selamat']):
-            return """Hai! 👋 Aku MindSupport AI, temanmu untuk berbagi cerita.
-
-Aku di sini untuk mendengarkan apapun yang kamu rasakan hari ini. Ceritakan saja, aku tidak akan menghakimi.
-
-Apa yang sedang kamu rasakan sekarang? 💜"""
-
-        if any(word in lower_msg for word in ['bahagia', 'senang', 'happy', 'gembira']):
-            return """Wah, senang sekali mendengar kamu merasa bahagia! 🎉💜
-
-Kebahagiaan adalah sesuatu yang berharga. Bolehkah kamu ceritakan apa yang membuatmu senang hari ini? Aku ingin ikut merayakannya bersamamu!"""
-
-        # Default empathetic response
-        return """Terima kasih sudah berbagi itu denganku. Aku mendengarkanmu. 💜
+        Args:
+            previous_summary: Summary so far (None for the first fold)
+            messages: Messages to add to the summary, oldest first
+            
+        Returns:
+            Updated summary, at most roughly CHAT_SUMMARY_MAX_TOKENS long
+        """
+        permit = self.breaker.allow() if self.provider else None
+        if permit is not None:
+            transcript = "\n".join(
+                f"{'Pengguna' if msg['role'] == 'user' else 'MindSupport'}: {msg['content']}"
+                for msg in messages
+            )
+            prompt = (
+                "Perbarui ringkasan percakapan konseling berikut. Pertahankan hal penting: "
+                "perasaan pengguna, masalah utama, teknik yang sudah dicoba, dan tanda risiko. "
+                "Tulis dalam Bahasa Indonesia, maksimal satu paragraf.\n\n"
+                f"[RINGKASAN SEBELUMNYA]\n{previous_summary or '-'}\n\n"
+                f"[PERCAKAPAN BARU]\n{transcript}"
+            )
+            request = LLMRequest(
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.2,
+                max_tokens=settings.CHAT_SUMMARY_MAX_TOKENS
+            )
+            llm_requests_in_progress.inc(self.provider.name)
+            queued = time.perf_counter()
+            started = None
+            try:
+                async with asyncio.timeout(settings.LLM_TIMEOUT_SECONDS):
+                    async with self.semaphore:
+                        started = time.perf_counter()
+                        text = await self.provider.generate(request)
+                self._record_success("summary", permit, started, request, text)
+                if text:
+                    return text.strip()
+            except asyncio.CancelledError:
+                self.breaker.release(permit)
+                raise
+            except Exception as e:
+                self._record_failure("summary", permit, queued, started, e)
+            finally:
+                llm_requests_in_progress.dec(self.provider.name)
+        
+        return self._get_fallback_summary(previous_summary, messages)
+    
+    def _get_fallback_summary(
+        self,
+        previous_summary: Optional[str],
+        messages: List[Dict[str, str]]
+    ) -> str:
+        """Extractive summary used when the model is unavailable: keep what the user said."""
+        parts = [previous_summary] if previous_summary else []
+        parts.extend(
+            f"Pengguna: {msg['content'][:200]}"
+            for msg in messages if msg["role"] == "user"
+        )
+        summary = "\n".join(parts)
+        
+        # Keep the most recent part when over budget
+        max_chars = settings.CHAT_SUMMARY_MAX_TOKENS * CHARS_PER_TOKEN
+        return summary[-max_chars:]
+    
+    def _build_request(
+        self,
+        user_message: str,
+        chat_history: List[Dict[str, str]] = None,
+        summary: Optional[str] = None
+    ) -> LLMRequest:
+        """Build the provider request with system prompt, summary and history."""
+        system_text = SYSTEM_PROMPT
+        if summary:
+            system_text += f"\n\n[RINGKASAN PERCAKAPAN SEBELUMNYA]\n{summary}"
+        
+        messages = [{"role": msg["role"], "content": msg["content"]} for msg in chat_history or []]
+        messages.append({"role": "user", "content": user_message})
+        
+        return LLMRequest(messages=messages, system=system_text, temperature=0.7, max_tokens=1000)
+    
+    async def _hedged(self, attempt: Callable[[], Awaitable[str]]) -> str:
+        """
+        Run `attempt`; if it has not finished after LLM_HEDGE_AFTER_SECONDS,
+        start a second one and return whichever succeeds first.
 
-Perasaanmu valid dan penting. Tidak ada yang salah dengan apa yang kamu rasakan.
+        The hedge only starts when a concurrency slot is free right away,
+        so hedging never queues behind (or adds to) an overload.
+        """
+        hedge_after = settings.LLM_HEDGE_AFTER_SECONDS
+        if hedge_after <= 0:
+            return await attempt()
+        
+        primary = asyncio.ensure_future(attempt())
+        tasks = [primary]
+        hedge_slot = False
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+            if done or self.semaphore.locked():
+                return await primary
+            
+            await self.semaphore.acquire()  # Free slot: returns without waiting
+            hedge_slot = True
+            tasks.append(asyncio.ensure_future(attempt()))
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        winner = "primary" if task is primary else "hedge"
+                        llm_hedged_requests.inc(self.provider.name, winner)
+                        return task.result()
+            llm_hedged_requests.inc(self.provider.name, "none")
+            raise primary.exception()
+        finally:
+            for task in tasks:
+                task.cancel()
+            if hedge_slot:
+                self.semaphore.release()
+    
+    def _record_success(
+        self,
+        operation: str,
+        permit: Permit,
+        started: float,
+        request: LLMRequest,
+        reply: Optional[str],
+        breaker_latency: Optional[float] = None
+    ):
+        """Record latency (excluding the wait for a concurrency slot) and estimated tokens."""
+        provider = self.provider.name
+        duration = time.perf_counter() - started
+        self.breaker.record_success(permit, duration if breaker_latency is None else breaker_latency)
+        llm_request_duration.observe(duration, provider, operation, "ok")
+        prompt_tokens = estimate_tokens(request.system) + sum(
+            estimate_tokens(msg["content"]) + MESSAGE_OVERHEAD_TOKENS
+            for msg in request.messages
+        )
+        llm_tokens.inc(provider, "prompt", amount=prompt_tokens)
+        llm_tokens.inc(provider, "completion", amount=estimate_tokens(reply))
+    
+    def _record_failure(
+        self,
+        operation: str,
+        permit: Permit,
+        queued: float,
+        started: Optional[float],
+        error: Exception
+    ) -> str:
+        """
+        Record a call that produced no reply; returns the fallback reason.
 
-Ceritakan lebih lanjut, aku di sini untukmu."""
+        Deadlines include the wait for a concurrency slot (`started` is None
+        while still waiting). A timeout where most of the deadline went on
+        that wait means this worker is saturated, not that the provider is
+        failing, so it is released from the breaker instead of counted.
+        """
+        if isinstance(error, TimeoutError):
+            now = time.perf_counter()
+            waited = (started or now) - queued
+            if waited >= (now - started if started is not None else 0.0):
+                self.breaker.release(permit)
+                log.warning(
+                    "llm_saturated",
+                    f"LLM deadline spent waiting for a concurrency slot ({operation})",
+                    provider=self.provider.name,
+                    operation=operation,
+                    waited_ms=round(waited * 1000, 1),
+                    max_concurrency=settings.LLM_MAX_CONCURRENCY
+                )
+                return "saturated"
+        
+        self._record_error(operation, permit, started, error)
+        return "timeout" if isinstance(error, TimeoutError) else "error"
+    
+    def _record_error(self, operation: str, permit: Permit, started: Optional[float], error: Exception):
+        """Count and log a failed provider call; sampled, so an outage can't flood the logs."""
+        provider = self.provider.name
+        self.breaker.record_failure(permit)
+        if started is not None:
+            llm_request_duration.observe(time.perf_counter() - started, provider, operation, "error")
+        llm_errors.inc(provider, operation, type(error).__name__)
+        log.warning(
+            "llm_error",
+            f"LLM call failed ({provider}, {operation})",
+            provider=provider,
+            operation=operation,
+            error_type=type(error).__name__,
+            error=str(error) or repr(error)
+        )
+    
+    def _get_fallback_response(self, user_message: str) -> str:
+        """Generate fallback response when the model is unavailable."""
+        return self.fallback.respond(user_message)
 
 
 # Create service instance
-openai_service = GeminiService()
+openai_service = AIService(provider=create_llm_provider(), cache=create_response_cache())
@@ -0,0 +1,104 @@
+"""
+MindSupport Backend - AI Response Cache
+TTL + LRU cache for repeated, context-free chat turns
+"""
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+import hashlib
+import json
+import re
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.services.intent_matcher import IntentMatcher
+
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_message(message: str) -> str:
+    """Normalize a message for cache lookups ("Halo!!  " -> "halo")."""
+    message = _PUNCTUATION.sub(" ", message.lower())
+    return _WHITESPACE.sub(" ", message).strip()
+
+
+def make_cache_key(
+    message: str,
+    chat_history: Optional[List[Dict[str, str]]] = None,
+    summary: Optional[str] = None
+) -> str:
+    """Cache key from the normalized message plus a hash of the context window."""
+    context = json.dumps([summary, chat_history or []], ensure_ascii=False, sort_keys=True)
+    context_hash = hashlib.sha256(context.encode("utf-8")).hexdigest()[:16]
+    return f"{normalize_message(message)}|{context_hash}"
+
+
+class ResponseCache(ABC):
+    """Interface for AI response caches."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """Cached reply for `key`, or None."""
+
+    @abstractmethod
+    def set(self, key: str, value: str):
+        """Store a reply under `key`."""
+
+    @abstractmethod
+    def stats(self) -> dict:
+        """Counters for /health."""
+
+
+class InMemoryResponseCache(ResponseCache):
+    """Per-process response cache with TTL expiry and LRU eviction."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self._cache = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+
+    def get(self, key: str) -> Optional[str]:
+        return self._cache.get(key)
+
+    def set(self, key: str, value: str):
+        self._cache.set(key, value)
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+class ResponseCachePolicy:
+    """Decides which chat turns are safe to answer from the cache."""
+
+    def __init__(self, safe_messages: List[str], blocked: IntentMatcher):
+        self.safe_messages = {normalize_message(m) for m in safe_messages if m.strip()}
+        # Messages matching any of these intents always go to the model
+        self.blocked = blocked
+
+    def is_cacheable(
+        self,
+        message: str,
+        chat_history: Optional[List[Dict[str, str]]] = None,
+        summary: Optional[str] = None
+    ) -> bool:
+        # Only context-free openers; anything with history is personal
+        if chat_history or summary:
+            return False
+
+        normalized = normalize_message(message)
+        if self.blocked.match(normalized):
+            return False
+
+        return normalized in self.safe_messages
+
+
+def create_response_cache() -> Optional[ResponseCache]:
+    """Build the configured response cache, or None when disabled."""
+    if not settings.CHAT_CACHE_ENABLED:
+        return None
+    return InMemoryResponseCache(
+        max_entries=settings.CHAT_CACHE_MAX_ENTRIES,
+        ttl_seconds=settings.CHAT_CACHE_TTL_SECONDS
+    )
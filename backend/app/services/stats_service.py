@@ -0,0 +1,141 @@
+"""
+MindSupport Backend - Admin Statistics Service
+Counters maintained by the write paths, with periodic reconciliation
+"""
+from datetime import datetime
+import asyncio
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.singleflight import single_flight
+from app.db.mongodb import (
+    get_stats_collection,
+    get_users_collection,
+    get_posts_collection,
+    get_reports_collection,
+    get_chats_collection
+)
+
+
+GLOBAL_STATS_ID = "global"
+
+log = get_logger("stats")
+
+# Dashboards polling at once share one read
+_stats_loads = single_flight("admin_stats")
+
+
+def today_start() -> datetime:
+    """Midnight (UTC) of the current day."""
+    return datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _daily_stats_id(day: datetime = None) -> str:
+    return f"daily:{(day or datetime.utcnow()).strftime('%Y-%m-%d')}"
+
+
+def is_today(timestamp: datetime) -> bool:
+    """Whether a timestamp falls on the current UTC day."""
+    return timestamp is not None and timestamp >= today_start()
+
+
+# ==================== Write paths ====================
+
+async def increment_stats(**deltas: int):
+    """Atomically adjust global counters, e.g. increment_stats(total_posts=1)."""
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    await get_stats_collection().update_one(
+        {"_id": GLOBAL_STATS_ID},
+        {"$inc": deltas},
+        upsert=True
+    )
+
+
+async def increment_active_sessions(delta: int = 1):
+    """Adjust today's count of chat sessions with activity."""
+    if not delta:
+        return
+    await get_stats_collection().update_one(
+        {"_id": _daily_stats_id()},
+        {"$inc": {"active_sessions": delta}},
+        upsert=True
+    )
+
+
+# ==================== Read path ====================
+
+async def get_stats() -> dict:
+    """Read dashboard statistics from the counter documents (two point lookups in one query)."""
+    today_id = _daily_stats_id()
+    # Copied so callers sharing the read can't change each other's result
+    return dict(await _stats_loads.do(today_id, lambda: _read_stats(today_id)))
+
+
+async def _read_stats(today_id: str) -> dict:
+    docs = {
+        doc["_id"]: doc
+        async for doc in get_stats_collection().find({"_id": {"$in": [GLOBAL_STATS_ID, today_id]}})
+    }
+    totals = docs.get(GLOBAL_STATS_ID, {})
+    today = docs.get(today_id, {})
+
+    return {
+        "total_users": totals.get("total_users", 0),
+        "total_posts": totals.get("total_posts", 0),
+        "pending_reports": totals.get("pending_reports", 0),
+        "active_sessions": today.get("active_sessions", 0)
+    }
+
+
+# ==================== Reconciliation ====================
+
+async def reconcile_stats() -> dict:
+    """Recount everything from the source collections and overwrite the counters."""
+    total_users, total_posts, pending_reports, active_sessions = await asyncio.gather(
+        get_users_collection().count_documents({}),
+        get_posts_collection().count_documents({"is_deleted": {"$ne": True}}),
+        get_reports_collection().count_documents({"status": "pending"}),
+        get_chats_collection().count_documents({"updated_at": {"$gte": today_start()}})
+    )
+
+    stats = get_stats_collection()
+    await stats.update_one(
+        {"_id": GLOBAL_STATS_ID},
+        {"$set": {
+            "total_users": total_users,
+            "total_posts": total_posts,
+            "pending_reports": pending_reports,
+            "reconciled_at": datetime.utcnow()
+        }},
+        upsert=True
+    )
+    await stats.update_one(
+        {"_id": _daily_stats_id()},
+        {"$set": {"active_sessions": active_sessions}},
+        upsert=True
+    )
+
+    return {
+        "total_users": total_users,
+        "total_posts": total_posts,
+        "pending_reports": pending_reports,
+        "active_sessions": active_sessions
+    }
+
+
+async def ensure_stats():
+    """Seed the counters on first start."""
+    if not await get_stats_collection().find_one({"_id": GLOBAL_STATS_ID}, {"_id": 1}):
+        await reconcile_stats()
+
+
+async def run_stats_reconciliation():
+    """Periodically correct counter drift (runs for the lifetime of the app)."""
+    while True:
+        await asyncio.sleep(settings.STATS_RECONCILE_INTERVAL_SECONDS)
+        try:
+            await reconcile_stats()
+        except Exception as e:
+            log.error("stats_reconcile_failed", "Stats reconciliation failed", error=str(e))
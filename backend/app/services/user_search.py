@@ -0,0 +1,89 @@
+"""
+MindSupport Backend - User Search
+Normalized, index-friendly search fields and relevance-ranked queries for the admin console
+"""
+from typing import Any, Dict, List
+import re
+
+
+# Longest name prefix stored per word; longer search words are truncated to match
+MAX_PREFIX_LENGTH = 20
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def _words(text: str) -> List[str]:
+    return _WORD.findall(text.lower())
+
+
+def build_search_fields(email: str, full_name: str, nim: str) -> Dict[str, Any]:
+    """
+    Search sub-document stored on each user.
+
+    Email and NIM are lowercased for anchored prefix regexes; every word of
+    the name is expanded into its edge n-grams ("dilla" -> "d", "di", ...)
+    so name prefixes become exact matches on a multikey index.
+    """
+    name_prefixes = set()
+    for word in _words(full_name):
+        for length in range(1, min(len(word), MAX_PREFIX_LENGTH) + 1):
+            name_prefixes.add(word[:length])
+
+    return {
+        "email": email.strip().lower(),
+        "nim": nim.strip().lower(),
+        "name": " ".join(_words(full_name)),
+        "name_prefixes": sorted(name_prefixes)
+    }
+
+
+def build_search_match(term: str) -> Dict[str, Any]:
+    """$match stage served by the search indexes (index union over the $or)."""
+    normalized = term.strip().lower()
+    prefix = "^" + re.escape(normalized)
+    clauses = [
+        {"search.email": {"$regex": prefix}},
+        {"search.nim": {"$regex": prefix}},
+    ]
+
+    words = [word[:MAX_PREFIX_LENGTH] for word in _words(normalized)]
+    if words:
+        clauses.append({"search.name_prefixes": {"$all": words}})
+
+    return {"$or": clauses}
+
+
+def build_search_pipeline(term: str, skip: int, limit: int) -> List[Dict[str, Any]]:
+    """
+    Aggregation returning one page of users ordered by relevance.
+
+    Exact email/NIM matches rank first, then email/NIM prefixes, then exact
+    name matches, then name prefix matches; ties go to the newest account.
+    """
+    normalized = term.strip().lower()
+    prefix = "^" + re.escape(normalized)
+    name = " ".join(_words(normalized))
+
+    score = {
+        "$add": [
+            {"$cond": [{"$or": [
+                {"$eq": ["$search.email", normalized]},
+                {"$eq": ["$search.nim", normalized]}
+            ]}, 100, 0]},
+            {"$cond": [{"$or": [
+                {"$regexMatch": {"input": "$search.email", "regex": prefix}},
+                {"$regexMatch": {"input": "$search.nim", "regex": prefix}}
+            ]}, 50, 0]},
+            {"$cond": [{"$eq": ["$search.name", name]}, 40, 0]},
+            {"$cond": [{"$regexMatch": {"input": "$search.name", "regex": "^" + re.escape(name)}}, 10, 0]},
+        ]
+    }
+
+    return [
+        {"$match": build_search_match(term)},
+        {"$addFields": {"_score": score}},
+        {"$sort": {"_score": -1, "created_at": -1, "_id": -1}},
+        {"$skip": skip},
+        {"$limit": limit},
+        {"$project": {"search": 0, "hashed_password": 0}},
+    ]
@@ -0,0 +1,6 @@
+"""
+MindSupport Benchmarks
+Load scenarios, regression checks and microbenchmarks for the backend
+
+Run from the backend directory, e.g. `python -m benchmarks run`.
+"""
@@ -0,0 +1,222 @@
+"""
+MindSupport Benchmarks - Command Line
+Run from backend/: python -m benchmarks {run,micro,compare} --help
+"""
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+
+from benchmarks.harness import configure_environment, install_command_monitor
+
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# Settings that change what a benchmark measures, recorded with every result
+RECORDED_SETTINGS = [
+    "LLM_PROVIDER", "LLM_MAX_CONCURRENCY", "LLM_STUB_LATENCY_MS", "LLM_STUB_LATENCY_DISTRIBUTION",
+    "LLM_STUB_TOKENS_PER_SECOND", "LLM_STUB_REPLY_TOKENS", "LLM_TIMEOUT_SECONDS", "LLM_HEDGE_AFTER_SECONDS",
+    "BCRYPT_ROUNDS",
+    "USER_CACHE_ENABLED", "FORUM_CACHE_ENABLED", "READ_COALESCING_ENABLED", "FORUM_CACHE_TTL_SECONDS", "CHAT_CACHE_ENABLED",
+]
+
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", *args], capture_output=True, text=True, check=True, cwd=Path(__file__).parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _metadata(args: argparse.Namespace) -> Dict[str, Any]:
+    from app.core.config import settings
+
+    return {
+        "commit": _git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--", "app")),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "args": {key: value for key, value in vars(args).items() if key != "handler"},
+        "settings": {name: getattr(settings, name, None) for name in RECORDED_SETTINGS},
+    }
+
+
+def _write_result(result: Dict[str, Any], out: Optional[str]) -> Path:
+    if out:
+        path = Path(out)
+    else:
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        path = RESULTS_DIR / f"{result['metadata']['commit'] or 'nogit'}-{stamp}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(result, indent=2, ensure_ascii=False, default=str), encoding="utf-8")
+    print(f"📄 Results written to {path}")
+    return path
+
+
+def _collect_failures(result: Dict[str, Any]) -> list:
+    """Names of every scenario check, regression check or micro check that failed."""
+    failures = []
+    for name, scenario in result.get("scenarios", {}).items():
+        if scenario.get("check", {}).get("ok") is False:
+            failures.append(f"scenario:{name}")
+    for name, check in result.get("checks", {}).items():
+        if check.get("ok") is False:
+            failures.append(f"check:{name}")
+    for name, micro in result.get("micro", {}).items():
+        if micro.get("check", {}).get("ok") is False:
+            failures.append(f"micro:{name}")
+    return failures
+
+
+# ==================== Commands ====================
+
+async def _run(args: argparse.Namespace) -> Dict[str, Any]:
+    from app.db.mongodb import get_database
+    from benchmarks.checks import coalescing, commands_per_request, index_coverage
+    from benchmarks.harness import app_session, command_monitor
+    from benchmarks.scenarios import SCENARIOS, ScenarioContext, select_scenarios
+    from benchmarks.seed import reset_database, seed
+
+    names = select_scenarios(args.scenarios)
+    result: Dict[str, Any] = {"scenarios": {}, "checks": {}}
+
+    async with app_session(args.base_url) as http:
+        print("🌱 Seeding benchmark database...")
+        await reset_database()
+        data = await seed(users=args.seed_users, posts=args.seed_posts)
+
+        ctx = ScenarioContext(
+            http=http,
+            data=data,
+            users=args.users,
+            duration=args.duration,
+            in_process=args.base_url is None,
+            search_users=args.search_users,
+        )
+
+        # Regression checks run first, on the freshly seeded data
+        if args.skip_checks:
+            pass
+        elif not ctx.in_process:
+            print("⚠️ Skipping regression checks: they need the app in this process")
+        else:
+            print("🔍 Counting database commands per request...")
+            result["checks"]["commands_per_request"] = await commands_per_request(http, data, command_monitor)
+            print("🔍 Counting queries behind concurrent identical reads...")
+            result["checks"]["coalescing"] = await coalescing(http, data, command_monitor)
+
+        command_monitor.capture = not args.skip_checks and ctx.in_process
+        for name in names:
+            print(f"🚀 Scenario: {name}")
+            result["scenarios"][name] = await SCENARIOS[name](ctx)
+        command_monitor.capture = False
+
+        if command_monitor.examples:
+            print("🔍 Explaining captured query shapes...")
+            result["checks"]["index_coverage"] = await index_coverage(get_database(), command_monitor)
+
+    return result
+
+
+def command_run(args: argparse.Namespace) -> int:
+    configure_environment(args.mongodb_url, args.database)
+    install_command_monitor()
+
+    result = {"metadata": _metadata(args)}
+    result.update(asyncio.run(_run(args)))
+    if not args.no_micro:
+        from benchmarks.micro import run_microbenchmarks
+        print("⏱️ Microbenchmarks...")
+        result["micro"] = run_microbenchmarks()
+
+    _write_result(result, args.out)
+    return _report_failures(result)
+
+
+def command_micro(args: argparse.Namespace) -> int:
+    # The app is imported but never connected; the database is not touched
+    configure_environment(args.mongodb_url, args.database)
+    from benchmarks.micro import run_microbenchmarks
+
+    result = {"metadata": _metadata(args)}
+    print("⏱️ Microbenchmarks...")
+    result["micro"] = run_microbenchmarks()
+    _write_result(result, args.out)
+    return _report_failures(result)
+
+
+def command_compare(args: argparse.Namespace) -> int:
+    from benchmarks.compare import compare_results, load_result, print_comparison
+
+    old, new = load_result(args.old), load_result(args.new)
+    comparison = compare_results(old, new, args.threshold)
+    print_comparison(
+        comparison,
+        old.get("metadata", {}).get("commit") or "old",
+        new.get("metadata", {}).get("commit") or "new",
+    )
+    return 1 if args.fail and comparison["regressions"] else 0
+
+
+def _report_failures(result: Dict[str, Any]) -> int:
+    failures = _collect_failures(result)
+    if failures:
+        print(f"❌ Failed checks: {', '.join(failures)}")
+        return 1
+    print("✅ All checks passed")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="MindSupport benchmark suite")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_database_args(command):
+        command.add_argument("--mongodb-url", default="mongodb://localhost:27017")
+        command.add_argument("--database", default="mindsupport_bench", help="Wiped on every run; must contain 'bench'")
+        command.add_argument("--out", help="Result file (default: benchmarks/results/<commit>-<time>.json)")
+
+    run = commands.add_parser("run", help="Seed a database and run load scenarios, checks and microbenchmarks")
+    run.add_argument("--scenarios", nargs="+", help="Subset of scenarios to run (default: all)")
+    run.add_argument("--duration", type=float, default=15.0, help="Seconds per scenario phase")
+    run.add_argument("--users", type=int, default=32, help="Concurrent virtual users")
+    run.add_argument("--seed-users", type=int, default=500)
+    run.add_argument("--seed-posts", type=int, default=2000)
+    run.add_argument("--search-users", type=int, default=100_000, help="Users added for admin_search")
+    run.add_argument("--base-url", help="Benchmark a running server instead of the in-process app")
+    run.add_argument("--skip-checks", action="store_true", help="Skip command counts and index coverage")
+    run.add_argument("--no-micro", action="store_true", help="Skip microbenchmarks")
+    add_database_args(run)
+    run.set_defaults(handler=command_run)
+
+    micro = commands.add_parser("micro", help="Run only the microbenchmarks (no database needed)")
+    add_database_args(micro)
+    micro.set_defaults(handler=command_micro)
+
+    compare = commands.add_parser("compare", help="Compare two result files")
+    compare.add_argument("old")
+    compare.add_argument("new")
+    compare.add_argument("--threshold", type=float, default=10.0, help="Regression threshold in percent")
+    compare.add_argument("--fail", action="store_true", help="Exit 1 when any metric regresses")
+    compare.set_defaults(handler=command_compare)
+
+    return parser
+
+
+def main() -> int:
+    args = build_parser().parse_args()
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+"""
+MindSupport Benchmarks - Regression Checks
+Database commands per request, read coalescing and index coverage of every captured query
+"""
+from typing import Any, Dict, Iterator, List, Tuple
+import asyncio
+
+from benchmarks.harness import CommandMonitor, query_shape
+from benchmarks.seed import SeedData, clear_app_caches
+
+
+# (name, method, url template, json body, max commands on a cold cache)
+REQUEST_BUDGETS: List[Tuple[str, str, str, Any, int]] = [
+    ("GET /users/me", "GET", "/users/me", None, 1),
+    ("GET /forum/posts", "GET", "/forum/posts?page_size=20", None, 4),
+    ("GET /forum/posts/{id}", "GET", "/forum/posts/{hot_post}", None, 4),
+    ("GET /forum/posts/{id}/comments", "GET", "/forum/posts/{hot_post}/comments", None, 3),
+    ("POST /forum/posts/{id}/like", "POST", "/forum/posts/{post}/like", None, 3),
+    ("POST /forum/posts/{id}/comments", "POST", "/forum/posts/{post}/comments", {"content": "Semangat!"}, 4),
+    ("GET /chat/history", "GET", "/chat/history?limit=20", None, 2),
+    ("GET /admin/stats", "GET", "/admin/stats", None, 2),
+    ("GET /admin/reports", "GET", "/admin/reports?status=pending", None, 4),
+    ("GET /admin/users?search", "GET", "/admin/users?search=dilla", None, 3),
+]
+
+ADMIN_PREFIX = "/admin/"
+
+# (name, url template, admin?, coalesced (collection, command) pairs) for the single-flight check
+COALESCED_READS: List[Tuple[str, str, bool, List[Tuple[str, str]]]] = [
+    ("GET /forum/posts", "/forum/posts?page_size=20", False, [("posts", "find"), ("posts", "aggregate")]),
+    ("GET /forum/posts/{id}", "/forum/posts/{hot_post}", False, [("posts", "find"), ("post_comments", "find")]),
+    ("GET /admin/stats", "/admin/stats", True, [("stats", "find")]),
+]
+
+# Commands that can be explained, and collections that are not router queries
+EXPLAINABLE = {"find", "aggregate", "count", "distinct", "findAndModify", "update", "delete"}
+IGNORED_COLLECTIONS = {"schema_migrations"}
+
+
+async def commands_per_request(http, data: SeedData, monitor: CommandMonitor) -> Dict[str, Any]:
+    """
+    Count the MongoDB commands each endpoint issues, cold and warm.
+
+    Requests run one at a time so every command is attributed to the
+    request that caused it. Cold means all in-process caches were cleared.
+    """
+    results = {}
+    for name, method, template, body, budget in REQUEST_BUDGETS:
+        url = template.format(hot_post=data.hot_post_ids[0], post=data.post_ids[1])
+        token = data.admin.token if url.startswith(ADMIN_PREFIX) else data.users[0].token
+        headers = {"Authorization": f"Bearer {token}"}
+
+        counts = {}
+        for phase in ("cold", "warm"):
+            if phase == "cold":
+                clear_app_caches()
+            before = monitor.count
+            response = await http.request(method, url, headers=headers, json=body)
+            counts[phase] = monitor.count - before
+            counts[f"{phase}_status"] = response.status_code
+
+        results[name] = {**counts, "budget": budget, "ok": counts["cold"] <= budget}
+
+    return {"requests": results, "ok": all(result["ok"] for result in results.values())}
+
+
+async def coalescing(http, data: SeedData, monitor: CommandMonitor, concurrency: int = 50) -> Dict[str, Any]:
+    """
+    Fire identical reads concurrently on a cold cache and count the queries.
+
+    With single-flight each shared query must run once however many
+    requests arrive together; per-user lookups (auth, is_liked) still run
+    per request and are not counted.
+    """
+    users = data.users[:concurrency]
+    results = {}
+    for name, template, admin, commands in COALESCED_READS:
+        url = template.format(hot_post=data.hot_post_ids[0])
+        tokens = [data.admin.token] * concurrency if admin else [user.token for user in users]
+
+        headers = [{"Authorization": f"Bearer {token}"} for token in set(tokens)]
+
+        clear_app_caches()
+        # Warm the user cache so the requests reach the shared read together
+        await asyncio.gather(*[http.get("/users/me", headers=header) for header in headers])
+        before = dict(monitor.by_collection)
+        responses = await asyncio.gather(*[
+            http.get(url, headers={"Authorization": f"Bearer {token}"}) for token in tokens
+        ])
+        queries = {
+            f"{collection}.{command}": monitor.by_collection[(collection, command)] - before.get((collection, command), 0)
+            for collection, command in commands
+        }
+        ok_responses = sum(response.status_code == 200 for response in responses)
+        results[name] = {
+            "requests": len(responses),
+            "ok_responses": ok_responses,
+            "queries": queries,
+            "ok": ok_responses == len(responses) and all(count == 1 for count in queries.values()),
+        }
+
+    return {"requests": results, "ok": all(result["ok"] for result in results.values())}
+
+
+def _winning_plans(explain: Any) -> Iterator[Any]:
+    """Every winningPlan in an explain document (aggregations nest them)."""
+    if isinstance(explain, dict):
+        for key, value in explain.items():
+            if key == "winningPlan":
+                yield value
+            else:
+                yield from _winning_plans(value)
+    elif isinstance(explain, list):
+        for item in explain:
+            yield from _winning_plans(item)
+
+
+def _has_collscan(plan: Any) -> bool:
+    if isinstance(plan, dict):
+        if plan.get("stage") == "COLLSCAN":
+            return True
+        return any(_has_collscan(value) for value in plan.values())
+    if isinstance(plan, list):
+        return any(_has_collscan(item) for item in plan)
+    return False
+
+
+def _is_full_collection_count(command_name: str, command: dict) -> bool:
+    """Counting a whole collection is expected to scan it (e.g. stats reconciliation)."""
+    if command_name == "count":
+        return not command.get("query")
+    if command_name == "aggregate":
+        pipeline = command.get("pipeline") or [{}]
+        return pipeline[0].get("$match", None) == {}
+    return False
+
+
+async def index_coverage(database, monitor: CommandMonitor) -> Dict[str, Any]:
+    """Explain one example of every captured query shape and flag collection scans."""
+    collscans = []
+    explained = 0
+
+    for _, command_name, command in monitor.captured():
+        collection = command.get(command_name)
+        if command_name not in EXPLAINABLE or collection in IGNORED_COLLECTIONS:
+            continue
+        if _is_full_collection_count(command_name, command):
+            continue
+
+        explain = await database.command({"explain": command, "verbosity": "queryPlanner"})
+        explained += 1
+        if any(_has_collscan(plan) for plan in _winning_plans(explain)):
+            collscans.append({
+                "command": command_name,
+                "collection": collection,
+                "shape": query_shape({key: value for key, value in command.items() if key != command_name}),
+            })
+
+    return {"query_shapes": explained, "collscans": collscans, "ok": not collscans}
@@ -0,0 +1,101 @@
+"""
+MindSupport Benchmarks - Result Comparison
+Diff two result files and flag regressions beyond a threshold
+"""
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+import json
+
+
+# (metric, True when a higher value is better)
+ENDPOINT_METRICS: List[Tuple[str, bool]] = [
+    ("rps", True),
+    ("p50_ms", False),
+    ("p95_ms", False),
+    ("p99_ms", False),
+]
+
+
+def load_result(path: str) -> Dict[str, Any]:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def _change(old: float, new: float) -> float:
+    """Relative change in percent."""
+    if not old:
+        return 0.0
+    return (new - old) / old * 100
+
+
+def _micro_timings(micro: Dict[str, Any], prefix: str = "") -> Iterator[Tuple[str, float]]:
+    """(name, us_per_op) for every nested timing in the micro section."""
+    for key, value in micro.items():
+        if not isinstance(value, dict):
+            continue
+        name = f"{prefix}{key}"
+        if "us_per_op" in value:
+            yield name, value["us_per_op"]
+        else:
+            yield from _micro_timings(value, f"{name}.")
+
+
+def compare_results(old: Dict[str, Any], new: Dict[str, Any], threshold: float) -> Dict[str, Any]:
+    """
+    Compare every metric present in both results.
+
+    A row is a regression when it moves the wrong way by more than
+    `threshold` percent.
+    """
+    rows = []
+
+    old_scenarios = old.get("scenarios", {})
+    for scenario, new_result in new.get("scenarios", {}).items():
+        old_endpoints = old_scenarios.get(scenario, {}).get("endpoints", {})
+        for endpoint, new_stats in new_result.get("endpoints", {}).items():
+            old_stats = old_endpoints.get(endpoint)
+            if old_stats is None:
+                continue
+            for metric, higher_is_better in ENDPOINT_METRICS:
+                change = _change(old_stats[metric], new_stats[metric])
+                worse = -change if higher_is_better else change
+                rows.append({
+                    "name": f"{scenario} | {endpoint} | {metric}",
+                    "old": old_stats[metric],
+                    "new": new_stats[metric],
+                    "change_pct": round(change, 1),
+                    "regression": worse > threshold,
+                })
+
+    old_micro = dict(_micro_timings(old.get("micro", {})))
+    for name, new_value in _micro_timings(new.get("micro", {})):
+        if name not in old_micro:
+            continue
+        change = _change(old_micro[name], new_value)
+        rows.append({
+            "name": f"micro | {name} | us_per_op",
+            "old": old_micro[name],
+            "new": new_value,
+            "change_pct": round(change, 1),
+            "regression": change > threshold,
+        })
+
+    return {"rows": rows, "regressions": [row for row in rows if row["regression"]]}
+
+
+def print_comparison(comparison: Dict[str, Any], old_label: str, new_label: str):
+    rows = comparison["rows"]
+    if not rows:
+        print("No metrics in common between the two results")
+        return
+
+    width = max(len(row["name"]) for row in rows)
+    print(f"{'metric'.ljust(width)}  {old_label[:12]:>12}  {new_label[:12]:>12}  {'change':>8}")
+    for row in rows:
+        marker = "  ❌" if row["regression"] else ""
+        print(f"{row['name'].ljust(width)}  {row['old']:>12}  {row['new']:>12}  {row['change_pct']:>+7.1f}%{marker}")
+
+    regressions = comparison["regressions"]
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s)")
+    else:
+        print("\n✅ No regressions")
@@ -0,0 +1,255 @@
+"""
+MindSupport Benchmarks - Harness
+Benchmark environment, latency recording and the HTTP client driving the app
+"""
+from collections import Counter, defaultdict
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+import asyncio
+import math
+import os
+import random
+import time
+
+from pymongo import monitoring
+
+
+# Defaults for the app under test; override through the environment
+BENCH_ENV = {
+    "LLM_PROVIDER": "stub",
+    "LLM_STUB_LATENCY_DISTRIBUTION": "lognormal",
+    "LLM_STUB_LATENCY_MS": "300",
+    "LLM_STUB_TOKENS_PER_SECOND": "200",
+    "LLM_STUB_REPLY_TOKENS": "60",
+    "LLM_STUB_SEED": "42",
+    "SECRET_KEY": "benchmark-secret-key-do-not-use-in-production",
+}
+
+
+def configure_environment(mongodb_url: str, database: str):
+    """
+    Point the app at the benchmark database and the stub LLM.
+
+    Must run before anything from `app` is imported, because settings are
+    read at import time. The database URL and name are always set
+    explicitly so a developer's .env can never send a benchmark (which
+    wipes its database) to a real deployment.
+    """
+    if "bench" not in database:
+        raise SystemExit(f"Refusing to use database '{database}': benchmark database names must contain 'bench'")
+
+    os.environ["MONGODB_URL"] = mongodb_url
+    os.environ["DATABASE_NAME"] = database
+    for name, value in BENCH_ENV.items():
+        os.environ.setdefault(name, value)
+
+
+# ==================== Latency recording ====================
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = min(len(sorted_values), max(1, math.ceil(fraction * len(sorted_values))))
+    return sorted_values[rank - 1]
+
+
+def summarize_latencies(samples: List[float]) -> Dict[str, float]:
+    """Latency statistics in milliseconds."""
+    ordered = sorted(samples)
+    if not ordered:
+        return {"mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    return {
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+class LatencyRecorder:
+    """Per-endpoint latency samples and status codes for one scenario."""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+
+    def record(self, name: str, seconds: float, status: int):
+        self.samples[name].append(seconds)
+        self.statuses[name][status] += 1
+
+    def summary(self, wall_seconds: float) -> Dict[str, Any]:
+        endpoints = {}
+        for name in sorted(self.samples):
+            samples = self.samples[name]
+            statuses = self.statuses[name]
+            endpoints[name] = {
+                "requests": len(samples),
+                "errors": sum(count for status, count in statuses.items() if status >= 400),
+                "rps": round(len(samples) / wall_seconds, 2) if wall_seconds else 0.0,
+                **summarize_latencies(samples),
+                "statuses": {str(status): count for status, count in sorted(statuses.items())},
+            }
+
+        total = sum(len(samples) for samples in self.samples.values())
+        return {
+            "duration_s": round(wall_seconds, 3),
+            "requests": total,
+            "rps": round(total / wall_seconds, 2) if wall_seconds else 0.0,
+            "endpoints": endpoints,
+        }
+
+
+# ==================== HTTP client ====================
+
+class BenchClient:
+    """Thin wrapper over httpx that records the latency of every request."""
+
+    def __init__(self, http, recorder: LatencyRecorder):
+        self.http = http
+        self.recorder = recorder
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        name: Optional[str] = None,
+        token: Optional[str] = None,
+        **kwargs
+    ):
+        """Send a request and record it under `name` (defaults to "METHOD /path")."""
+        headers = kwargs.pop("headers", {})
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+
+        started = time.perf_counter()
+        response = await self.http.request(method, url, headers=headers, **kwargs)
+        self.recorder.record(name or f"{method} {url.split('?')[0]}", time.perf_counter() - started, response.status_code)
+        return response
+
+    async def get(self, url: str, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs):
+        return await self.request("POST", url, **kwargs)
+
+
+@asynccontextmanager
+async def app_session(base_url: Optional[str] = None):
+    """
+    Yield an httpx client for the app under test.
+
+    Without `base_url` the real FastAPI app runs in-process (lifespan
+    included) behind httpx's ASGI transport; client and server then share
+    one event loop, so numbers include client overhead. With `base_url`
+    requests go over the network to a running server, and this process
+    only connects to MongoDB for seeding.
+    """
+    import httpx
+    from app.db.mongodb import connect_to_mongo, close_mongo_connection
+
+    timeout = httpx.Timeout(120.0)
+    if base_url:
+        await connect_to_mongo()
+        try:
+            limits = httpx.Limits(max_connections=1000, max_keepalive_connections=1000)
+            async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as http:
+                yield http
+        finally:
+            await close_mongo_connection()
+        return
+
+    from app.main import app
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=timeout) as http:
+            yield http
+
+
+async def run_virtual_users(
+    count: int,
+    duration: float,
+    user: Callable[[int, random.Random], Awaitable[None]],
+    seed: int = 0
+) -> float:
+    """
+    Run `count` closed-loop virtual users for `duration` seconds.
+
+    Each virtual user calls `user(index, rng)` back to back until the time
+    is up. Returns the wall time in seconds.
+    """
+    deadline = time.perf_counter() + duration
+
+    async def loop(index: int):
+        rng = random.Random(seed * 100003 + index)
+        while time.perf_counter() < deadline:
+            await user(index, rng)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(loop(index) for index in range(count)))
+    return time.perf_counter() - started
+
+
+# ==================== MongoDB command monitoring ====================
+
+# Command fields that are transport noise rather than part of the query
+_COMMAND_NOISE = {"lsid", "txnNumber", "$db", "$clusterTime", "$readPreference", "readConcern", "writeConcern", "cursor"}
+
+
+def query_shape(value: Any) -> Any:
+    """Replace literal values with their type names, keeping keys and operators."""
+    if isinstance(value, dict):
+        return {key: query_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        shapes = []
+        for item in value:
+            shape = query_shape(item)
+            if shape not in shapes:
+                shapes.append(shape)
+        return shapes
+    return type(value).__name__
+
+
+class CommandMonitor(monitoring.CommandListener):
+    """
+    Counts MongoDB commands and optionally keeps one example per query shape.
+
+    Registered globally before the app creates its Motor client, so it sees
+    every command the routers issue.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.by_collection: Counter = Counter()  # (collection, command name) -> count
+        self.capture = False
+        self.examples: Dict[Tuple[str, str, str], Tuple[str, dict]] = {}
+
+    def started(self, event):
+        self.count += 1
+        self.by_collection[(str(event.command.get(event.command_name, "")), event.command_name)] += 1
+        if self.capture:
+            command = {key: value for key, value in dict(event.command).items() if key not in _COMMAND_NOISE}
+            collection = str(command.get(event.command_name, ""))
+            key = (event.command_name, collection, repr(query_shape(command)))
+            self.examples.setdefault(key, (event.database_name, command))
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+    def captured(self) -> Iterable[Tuple[str, str, dict]]:
+        """(database, command name, command) for each distinct query shape."""
+        for (command_name, _, _), (database, command) in self.examples.items():
+            yield database, command_name, command
+
+
+command_monitor = CommandMonitor()
+
+
+def install_command_monitor() -> CommandMonitor:
+    """Register the monitor; must run before the app connects to MongoDB."""
+    monitoring.register(command_monitor)
+    return command_monitor
@@ -0,0 +1,394 @@
+"""
+MindSupport Benchmarks - Microbenchmarks
+Per-call cost of hot helpers that run on every request
+"""
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict
+import json
+import time
+import timeit
+
+from fastapi.encoders import jsonable_encoder
+
+
+CORPUS_PATH = Path(__file__).parent / "data" / "fallback_corpus.json"
+
+
+def measure(function: Callable[[], Any], min_time: float = 0.5, repeat: int = 5) -> Dict[str, float]:
+    """Best-of-`repeat` time per call, with the loop count picked by timeit."""
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    number = max(1, int(number * min_time / 0.2))
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+    return {
+        "us_per_op": round(best * 1e6, 3),
+        "ops_per_s": round(1 / best, 1) if best else 0.0,
+        "loops": number,
+    }
+
+
+def _sample_posts(count: int = 50) -> list:
+    """Raw post documents shaped like a feed page from MongoDB."""
+    from bson import ObjectId
+
+    now = datetime.utcnow()
+    return [
+        {
+            "_id": ObjectId(),
+            "anonymous_id": f"Anonim#{1000 + index}",
+            "mood": "Curhat",
+            "content": "Akhir-akhir ini aku merasa capek karena deadline tugas numpuk. " * 3,
+            "created_at": now - timedelta(minutes=index),
+            "like_count": index,
+            "comment_count": 3,
+            "comment_preview": [
+                {
+                    "comment_id": f"c{index}-{offset}",
+                    "anonymous_id": "Anonim#42",
+                    "content": "Semangat ya, kamu pasti bisa!",
+                    "created_at": now,
+                }
+                for offset in range(3)
+            ],
+        }
+        for index in range(count)
+    ]
+
+
+def bench_post_page() -> Dict[str, Any]:
+    """Building and serializing a 50-post feed page (the /forum/posts response)."""
+    from app.models.forum import PostListResponse
+    from app.routers.forum import build_post_response
+
+    docs = _sample_posts()
+
+    def build():
+        posts = [build_post_response(doc, doc["comment_preview"]) for doc in docs]
+        return PostListResponse(posts=posts, total=len(posts), page=1, page_size=len(posts))
+
+    page = build()
+
+    def fastapi_style():
+        # What FastAPI does with a response_model: validate, encode, json.dumps
+        validated = PostListResponse.model_validate(page.model_dump())
+        return json.dumps(jsonable_encoder(validated), ensure_ascii=False).encode("utf-8")
+
+    return {
+        "build_models": measure(build),
+        "model_dump_json": measure(page.model_dump_json),
+        "validate_and_encode": measure(fastapi_style),
+    }
+
+
+def _starlette_json(content: Any) -> bytes:
+    """How FastAPI sends a body it had to run through jsonable_encoder."""
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def bench_list_responses() -> Dict[str, Any]:
+    """
+    List endpoint bodies: the previous path (models built per item, then
+    validated and encoded by FastAPI) against the prebuilt serializers,
+    with a check that both produce the same bytes.
+    """
+    from pydantic import TypeAdapter
+
+    from app.core.responses import dump_plain_json
+    from app.models.chat import ChatMessageResponse, ChatSessionDetailResponse, ChatSessionResponse, MessageRole
+    from app.models.forum import PostListResponse
+    from app.routers.chat import _session_detail, _session_list
+    from app.routers.forum import build_post_response
+    from app.services.forum_cache import FeedPage, feed_page_json, with_is_liked
+
+    now = datetime.utcnow()
+    docs = _sample_posts()
+    posts = [build_post_response(doc, doc["comment_preview"]) for doc in docs]
+    liked_ids = {post.id for post in posts[::3]}
+    feed = FeedPage(posts=posts, total=1000, next_cursor="cursor")
+    feed.posts_json  # Filled once per cached page, not per request
+    post_list = TypeAdapter(PostListResponse)
+
+    def feed_before():
+        page = PostListResponse(
+            posts=with_is_liked(posts, liked_ids), total=1000, page=1, page_size=50, next_cursor="cursor"
+        )
+        return post_list.dump_json(post_list.validate_python(page))
+
+    sessions = [
+        {
+            "session_id": f"session-{index}",
+            "title": "Curhat soal skripsi",
+            "created_at": now - timedelta(days=index),
+            "updated_at": now - timedelta(hours=index),
+            "message_count": 24,
+            "last_message": "Makasih ya, aku jadi lebih tenang sekarang.",
+        }
+        for index in range(100)
+    ]
+
+    def history_before():
+        result = [
+            ChatSessionResponse(
+                session_id=session["session_id"],
+                title=session.get("title", "Sesi Tanpa Judul"),
+                created_at=session["created_at"],
+                updated_at=session.get("updated_at", session["created_at"]),
+                message_count=session.get("message_count", 0),
+                last_message=session["last_message"]
+            )
+            for session in sessions
+        ]
+        return _session_list.dump_json(_session_list.validate_python(result))
+
+    def history_after():
+        return _session_list.dump_json(_session_list.validate_python([dict(session) for session in sessions]))
+
+    messages = [
+        {
+            "role": "user" if index % 2 else "assistant",
+            "content": "Aku lagi cemas banget menjelang sidang, rasanya nggak siap. " * 2,
+            "timestamp": now + timedelta(seconds=index),
+        }
+        for index in range(100)
+    ]
+
+    def detail_before():
+        detail = ChatSessionDetailResponse(
+            session_id="session-0",
+            title="Curhat soal skripsi",
+            created_at=now,
+            messages=[
+                ChatMessageResponse(role=MessageRole(msg["role"]), content=msg["content"], timestamp=msg["timestamp"])
+                for msg in messages
+            ]
+        )
+        return _session_detail.dump_json(_session_detail.validate_python(detail))
+
+    def detail_after():
+        detail = _session_detail.validate_python({
+            "session_id": "session-0", "title": "Curhat soal skripsi", "created_at": now, "messages": messages
+        })
+        return _session_detail.dump_json(detail)
+
+    admin_page = {
+        "posts": [
+            {
+                "id": str(doc["_id"]),
+                "anonymous_id": doc["anonymous_id"],
+                "mood": doc["mood"],
+                "content": doc["content"],
+                "like_count": doc["like_count"],
+                "comment_count": doc["comment_count"],
+                "is_deleted": False,
+                "created_at": doc["created_at"].isoformat(),
+            }
+            for doc in docs
+        ],
+        "total": 1000,
+        "page": 1,
+        "page_size": 50,
+        "next_cursor": None,
+    }
+
+    cases = {
+        "forum_posts": (feed_before, lambda: feed_page_json(feed, liked_ids, 1, 50)),
+        "chat_history": (history_before, history_after),
+        "chat_session": (detail_before, detail_after),
+        "admin_posts": (lambda: _starlette_json(admin_page), lambda: dump_plain_json(admin_page)),
+    }
+
+    results = {}
+    mismatches = []
+    for name, (before, after) in cases.items():
+        if before() != after():
+            mismatches.append(name)
+        timings = {"before": measure(before), "after": measure(after)}
+        timings["speedup"] = round(timings["before"]["us_per_op"] / timings["after"]["us_per_op"], 1)
+        results[name] = timings
+
+    results["check"] = {"same_bytes": not mismatches, "mismatches": mismatches, "ok": not mismatches}
+    return results
+
+
+def bench_fallback_matching() -> Dict[str, Any]:
+    """Fallback intent matching over the Indonesian corpus, with a correctness check."""
+    from app.services.intent_matcher import load_intent_matcher
+
+    matcher = load_intent_matcher()
+    cases = json.loads(CORPUS_PATH.read_text(encoding="utf-8"))["cases"]
+
+    mismatches = []
+    for case in cases:
+        intent = matcher.match(case["message"])
+        name = intent.name if intent else None
+        if name != case["intent"]:
+            mismatches.append({"message": case["message"], "expected": case["intent"], "got": name})
+
+    messages = [case["message"] for case in cases]
+
+    def match_all():
+        for message in messages:
+            matcher.match(message)
+
+    timing = measure(match_all)
+    per_message = timing["us_per_op"] / len(messages)
+    return {
+        "match_corpus": timing,
+        "us_per_message": round(per_message, 3),
+        "check": {"cases": len(cases), "mismatches": mismatches, "ok": not mismatches},
+    }
+
+
+def bench_jwt() -> Dict[str, Any]:
+    """Access token decode (every authenticated request) and encode (every login)."""
+    from app.core.security import create_access_token, decode_access_token
+
+    token = create_access_token({"sub": "65f0c0ffee0000000000beef"}, expires_delta=timedelta(days=1))
+    return {
+        "decode": measure(lambda: decode_access_token(token)),
+        "encode": measure(lambda: create_access_token({"sub": "65f0c0ffee0000000000beef"})),
+    }
+
+
+def bench_chat_context() -> Dict[str, Any]:
+    """Token-budgeted context building for a long chat session."""
+    from app.services.context_builder import build_context
+
+    recent = [
+        {"role": "user" if index % 2 else "assistant", "content": "Aku lagi capek banget sama tugas kuliah. " * 4}
+        for index in range(60)
+    ]
+    return {"build_context": measure(lambda: build_context(recent, "Ringkasan percakapan sebelumnya.", 800))}
+
+
+def bench_metrics() -> Dict[str, Any]:
+    """Metrics recording on the hot path: per HTTP request and per MongoDB command."""
+    from types import SimpleNamespace
+    from app.core.metrics import (
+        Histogram,
+        http_request_duration,
+        http_requests_in_progress,
+        MongoCommandMetrics
+    )
+
+    def record_request():
+        # What MetricsMiddleware does around every request
+        http_requests_in_progress.inc("GET")
+        http_requests_in_progress.dec("GET")
+        http_request_duration.observe(0.0042, "GET", "/forum/posts", "200")
+
+    listener = MongoCommandMetrics()
+    started = SimpleNamespace(
+        command_name="find", command={"find": "posts", "filter": {}},
+        connection_id=("localhost", 27017), request_id=1
+    )
+    succeeded = SimpleNamespace(
+        command_name="find", duration_micros=850, connection_id=("localhost", 27017), request_id=1
+    )
+
+    def record_command():
+        listener.started(started)
+        listener.succeeded(succeeded)
+
+    render_histogram = Histogram("bench_render_seconds", "Render benchmark", ("route", "status"))
+    for index in range(40):
+        render_histogram.observe(0.01 * index, f"/route/{index}", "200")
+
+    return {
+        "per_request": measure(record_request),
+        "per_mongo_command": measure(record_command),
+        "render_40_series": measure(lambda: list(render_histogram.render())),
+    }
+
+
+class _BackpressuredSink:
+    """File-like sink where every write blocks, like a full pipe to a container log driver."""
+
+    def __init__(self, write_seconds: float):
+        self.write_seconds = write_seconds
+        self.lines = 0
+
+    def write(self, text: str):
+        time.sleep(self.write_seconds)
+        self.lines += 1
+
+    def flush(self):
+        pass
+
+
+def bench_logging(storm_size: int = 5000, write_ms: float = 0.05) -> Dict[str, Any]:
+    """
+    Caller-side cost of logging LLM errors during a provider outage.
+
+    Every write to the sink blocks for `write_ms`, modelling stdout backed
+    up behind a container log driver. `print` is the old synchronous path.
+    `queued` goes through the app's queue handler with sampling off, so the
+    writer thread absorbs the blocking, and records are dropped once the
+    queue is full. `sampled` adds the default per-event cap.
+    """
+    import logging
+    import queue
+    from logging.handlers import QueueListener
+    from app.core.logging import EventLogger, EventSampler, JSONFormatter, NonBlockingQueueHandler
+
+    error = "Simulated provider error"
+
+    def pipeline(name: str, burst: int, sink: _BackpressuredSink):
+        records = queue.Queue(maxsize=10_000)
+        output = logging.StreamHandler(sink)
+        output.setFormatter(JSONFormatter())
+        logger = logging.getLogger(f"bench.logging.{name}")
+        logger.handlers = [NonBlockingQueueHandler(records)]
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        return EventLogger(logger, EventSampler(burst)), QueueListener(records, output)
+
+    def storm(log_one: Callable[[], None]) -> float:
+        """Microseconds per error on the calling thread."""
+        started = time.perf_counter()
+        for _ in range(storm_size):
+            log_one()
+        return round((time.perf_counter() - started) / storm_size * 1e6, 3)
+
+    results = {"storm_size": storm_size, "sink_write_ms": write_ms, "us_per_error": {}, "lines_written": {}}
+
+    sink = _BackpressuredSink(write_ms / 1000)
+    results["us_per_error"]["print"] = storm(lambda: print(f"LLM API Error (stub): {error}", file=sink, flush=True))
+    results["lines_written"]["print"] = sink.lines
+
+    for name, burst in (("queued", 0), ("sampled", 20)):
+        sink = _BackpressuredSink(write_ms / 1000)
+        log, listener = pipeline(name, burst, sink)
+        listener.start()
+        try:
+            results["us_per_error"][name] = storm(lambda: log.warning(
+                "llm_error", "LLM call failed (stub, generate)",
+                provider="stub", operation="generate", error_type="LLMProviderError", error=error
+            ))
+        finally:
+            listener.stop()
+        results["lines_written"][name] = sink.lines
+
+    return results
+
+
+MICROBENCHMARKS: Dict[str, Callable[[], Dict[str, Any]]] = {
+    "post_page": bench_post_page,
+    "list_responses": bench_list_responses,
+    "fallback_matching": bench_fallback_matching,
+    "jwt": bench_jwt,
+    "chat_context": bench_chat_context,
+    "metrics": bench_metrics,
+    "logging": bench_logging,
+}
+
+
+def run_microbenchmarks() -> Dict[str, Any]:
+    results = {}
+    for name, bench in MICROBENCHMARKS.items():
+        print(f"  micro: {name}")
+        results[name] = bench()
+    return results
@@ -0,0 +1,389 @@
+"""
+MindSupport Benchmarks - Load Scenarios
+Realistic student and admin traffic, each reported per endpoint
+"""
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import asyncio
+import random
+import time
+
+from benchmarks.harness import BenchClient, LatencyRecorder, run_virtual_users
+from benchmarks.seed import BENCH_PASSWORD, SeedData, clear_app_caches, seed_search_users
+
+
+MOODS = [None, "Sedih", "Butuh Saran", "Curhat", "Kesal", "Sukses"]
+
+CHAT_TURNS = [
+    "Halo, aku lagi capek banget sama kuliah",
+    "Tugasku numpuk dan deadline-nya minggu ini semua",
+    "Aku jadi susah tidur dan gampang cemas",
+    "Makasih ya, aku coba teknik napasnya dulu",
+]
+
+
+@dataclass
+class ScenarioContext:
+    http: Any  # httpx.AsyncClient
+    data: SeedData
+    users: int  # Concurrent virtual users
+    duration: float  # Seconds per phase
+    in_process: bool  # App runs in this process (settings can be toggled)
+    search_users: int = 100_000
+
+    def client(self, recorder: LatencyRecorder) -> BenchClient:
+        return BenchClient(self.http, recorder)
+
+    def student(self, rng: random.Random):
+        return rng.choice(self.data.users)
+
+
+ScenarioResult = Dict[str, Any]
+
+
+def _hot_or_random_post(ctx: ScenarioContext, rng: random.Random) -> str:
+    """Traffic is skewed: a third of interactions hit the hot threads."""
+    if rng.random() < 0.33:
+        return rng.choice(ctx.data.hot_post_ids)
+    return rng.choice(ctx.data.post_ids[:200])
+
+
+def _mood_query(mood: Optional[str]) -> str:
+    return f"&mood={mood}" if mood else ""
+
+
+# ==================== Student scenarios ====================
+
+async def login_storm(ctx: ScenarioContext) -> ScenarioResult:
+    """Everyone logs in at once (e.g. right after a class ends)."""
+    recorder = LatencyRecorder()
+    client = ctx.client(recorder)
+
+    async def user(index: int, rng: random.Random):
+        student = ctx.student(rng)
+        await client.post(
+            "/auth/token",
+            data={"username": student.email, "password": BENCH_PASSWORD},
+            name="POST /auth/token"
+        )
+
+    wall = await run_virtual_users(ctx.users, ctx.duration, user, seed=1)
+    return recorder.summary(wall)
+
+
+async def forum_scroll(ctx: ScenarioContext) -> ScenarioResult:
+    """Scroll the feed with mood filters, open posts and read their comments."""
+    recorder = LatencyRecorder()
+    client = ctx.client(recorder)
+
+    async def user(index: int, rng: random.Random):
+        token = ctx.student(rng).token
+        mood = rng.choice(MOODS)
+
+        response = await client.get(
+            f"/forum/posts?page_size=20{_mood_query(mood)}",
+            name="GET /forum/posts", token=token
+        )
+        cursor = response.json().get("next_cursor") if response.status_code == 200 else None
+        for _ in range(rng.randint(0, 4)):
+            if not cursor:
+                break
+            response = await client.get(
+                f"/forum/posts?page_size=20&include_total=false&cursor={cursor}{_mood_query(mood)}",
+                name="GET /forum/posts (cursor)", token=token
+            )
+            cursor = response.json().get("next_cursor") if response.status_code == 200 else None
+
+        if rng.random() < 0.3:
+            post_id = _hot_or_random_post(ctx, rng)
+            response = await client.get(f"/forum/posts/{post_id}", name="GET /forum/posts/{id}", token=token)
+            comments_cursor = response.json().get("comments_next_cursor") if response.status_code == 200 else None
+            if comments_cursor and rng.random() < 0.5:
+                await client.get(
+                    f"/forum/posts/{post_id}/comments?cursor={comments_cursor}",
+                    name="GET /forum/posts/{id}/comments", token=token
+                )
+
+    wall = await run_virtual_users(ctx.users, ctx.duration, user, seed=2)
+    return recorder.summary(wall)
+
+
+async def forum_engage(ctx: ScenarioContext) -> ScenarioResult:
+    """Like and comment on posts while the feed keeps being read."""
+    recorder = LatencyRecorder()
+    client = ctx.client(recorder)
+
+    async def user(index: int, rng: random.Random):
+        token = ctx.student(rng).token
+        post_id = _hot_or_random_post(ctx, rng)
+        action = rng.random()
+
+        if action < 0.5:
+            await client.post(f"/forum/posts/{post_id}/like", name="POST /forum/posts/{id}/like", token=token)
+        elif action < 0.7:
+            await client.post(
+                f"/forum/posts/{post_id}/comments",
+                json={"content": "Semangat, kamu nggak sendirian!"},
+                name="POST /forum/posts/{id}/comments", token=token
+            )
+        else:
+            await client.get("/forum/posts?page_size=20", name="GET /forum/posts", token=token)
+
+    wall = await run_virtual_users(ctx.users, ctx.duration, user, seed=3)
+    return recorder.summary(wall)
+
+
+async def like_storm(ctx: ScenarioContext) -> ScenarioResult:
+    """
+    Hundreds of parallel like toggles on one post, then check the count.
+
+    Every student taps an odd or even number of times concurrently; the
+    final like_count must equal the number of students left liking it.
+    """
+    from bson import ObjectId
+    from app.db.mongodb import get_likes_collection, get_posts_collection
+
+    recorder = LatencyRecorder()
+    client = ctx.client(recorder)
+    post_id = ctx.data.post_ids[-1]  # An old post nobody else touches
+    rng = random.Random(4)
+
+    students = ctx.data.users[:300]
+    taps = {student.id: rng.randint(1, 4) for student in students}
+    tokens = {student.id: student.token for student in students}
+
+    async def tap(user_id: str):
+        await client.post(f"/forum/posts/{post_id}/like", name="POST /forum/posts/{id}/like", token=tokens[user_id])
+
+    requests = [user_id for user_id, count in taps.items() for _ in range(count)]
+    rng.shuffle(requests)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(tap(user_id) for user_id in requests))
+    wall = time.perf_counter() - started
+
+    expected = sum(1 for count in taps.values() if count % 2 == 1)
+    post = await get_posts_collection().find_one({"_id": ObjectId(post_id)}, {"like_count": 1})
+    liked = await get_likes_collection().count_documents({"post_id": post_id, "liked": True})
+
+    result = recorder.summary(wall)
+    result["check"] = {
+        "toggles": len(requests),
+        "expected_likes": expected,
+        "like_count": post["like_count"],
+        "liked_documents": liked,
+        "ok": post["like_count"] == expected == liked,
+    }
+    return result
+
+
+async def chat(ctx: ScenarioContext) -> ScenarioResult:
+    """Multi-turn counseling chats against the stub LLM, plus history reads."""
+    recorder = LatencyRecorder()
+    client = ctx.client(recorder)
+
+    async def user(index: int, rng: random.Random):
+        token = ctx.student(rng).token
+        session_id = None
+        for content in CHAT_TURNS[:rng.randint(2, len(CHAT_TURNS))]:
+            response = await client.post(
+                "/chat/message",
+                json={"content": content, "session_id": session_id},
+                name="POST /chat/message", token=token
+            )
+            if response.status_code != 200:
+                return
+            session_id = response.json()["session_id"]
+
+        await client.get("/chat/history?limit=20", name="GET /chat/history", token=token)
+        await client.get(f"/chat/history/{session_id}", name="GET /chat/history/{id}", token=token)
+
+    wall = await run_virtual_users(ctx.users, ctx.duration, user, seed=5)
+    return recorder.summary(wall)
+
+
+# ==================== Admin scenarios ====================
+
+async def admin_dashboard(ctx: ScenarioContext) -> ScenarioResult:
+    """A few moderators refreshing the dashboard, report queue and user list."""
+    recorder = LatencyRecorder()
+    client = ctx.client(recorder)
+    token = ctx.data.admin.token
+
+    async def user(index: int, rng: random.Random):
+        await client.get("/admin/stats", token=token)
+        await client.get("/admin/reports?status=pending&page_size=20", name="GET /admin/reports", token=token)
+        await client.get("/admin/users?page_size=20", name="GET /admin/users", token=token)
+        await client.get("/admin/posts?page_size=20", name="GET /admin/posts", token=token)
+
+    wall = await run_virtual_users(max(1, ctx.users // 8), ctx.duration, user, seed=6)
+    return recorder.summary(wall)
+
+
+async def admin_search(ctx: ScenarioContext) -> ScenarioResult:
+    """User search over a large synthetic student body, with a relevance check."""
+    sample = await seed_search_users(ctx.search_users)
+    recorder = LatencyRecorder()
+    client = ctx.client(recorder)
+    token = ctx.data.admin.token
+
+    def term(rng: random.Random) -> str:
+        student = rng.choice(sample)
+        kind = rng.random()
+        if kind < 0.25:
+            return student["email"]
+        if kind < 0.5:
+            return student["nim"][:rng.randint(4, len(student["nim"]))]
+        if kind < 0.75:
+            return student["full_name"].split()[0][:rng.randint(2, 5)]
+        return student["full_name"]
+
+    async def user(index: int, rng: random.Random):
+        await client.get(
+            "/admin/users",
+            params={"search": term(rng), "page_size": 20},
+            name="GET /admin/users?search", token=token
+        )
+
+    wall = await run_virtual_users(max(1, ctx.users // 4), ctx.duration, user, seed=7)
+    result = recorder.summary(wall)
+
+    # Exact email and NIM matches must rank first
+    misranked = []
+    for student in sample[:20]:
+        for field in ("email", "nim"):
+            response = await ctx.http.get(
+                "/admin/users", params={"search": student[field], "page_size": 5},
+                headers={"Authorization": f"Bearer {token}"}
+            )
+            users = response.json().get("users", []) if response.status_code == 200 else []
+            if not users or users[0][field] != student[field]:
+                misranked.append(student[field])
+
+    result["check"] = {"users": ctx.search_users, "misranked": misranked, "ok": not misranked}
+    return result
+
+
+# ==================== Isolation and cache comparisons ====================
+
+async def chat_isolation(ctx: ScenarioContext) -> ScenarioResult:
+    """
+    Forum latency alone vs. while many slow chat calls are waiting on the LLM.
+
+    Chat calls must not block the event loop, so /forum/posts latency should
+    stay flat while they are in flight.
+    """
+    if not ctx.in_process:
+        return {"skipped": "needs the in-process app to slow down the stub provider"}
+
+    from app.services.llm_providers import StubProvider
+    from app.services.openai_service import openai_service
+
+    provider = openai_service.provider
+    if not isinstance(provider, StubProvider):
+        return {"skipped": "needs LLM_PROVIDER=stub"}
+
+    recorder = LatencyRecorder()
+    client = ctx.client(recorder)
+    readers = max(1, ctx.users // 4)
+
+    def reader(label: str) -> Callable[[int, random.Random], Awaitable[None]]:
+        async def user(index: int, rng: random.Random):
+            await client.get(
+                f"/forum/posts?page_size=20{_mood_query(rng.choice(MOODS))}",
+                name=f"GET /forum/posts ({label})", token=ctx.student(rng).token
+            )
+        return user
+
+    baseline_wall = await run_virtual_users(readers, ctx.duration / 2, reader("alone"), seed=8)
+
+    original_latency = provider.latency_ms
+    provider.latency_ms = 2000
+    stop = asyncio.Event()
+
+    async def chatter(index: int):
+        rng = random.Random(900 + index)
+        while not stop.is_set():
+            await client.post(
+                "/chat/message", json={"content": rng.choice(CHAT_TURNS)},
+                name="POST /chat/message (slow LLM)", token=ctx.student(rng).token
+            )
+
+    chatters = [asyncio.create_task(chatter(index)) for index in range(ctx.users)]
+    try:
+        await asyncio.sleep(0.5)  # Let the chat calls pile up first
+        loaded_wall = await run_virtual_users(readers, ctx.duration / 2, reader("under chat load"), seed=9)
+    finally:
+        stop.set()
+        await asyncio.gather(*chatters, return_exceptions=True)
+        provider.latency_ms = original_latency
+
+    result = recorder.summary(baseline_wall + loaded_wall)
+    alone = result["endpoints"].get("GET /forum/posts (alone)", {})
+    loaded = result["endpoints"].get("GET /forum/posts (under chat load)", {})
+    if alone.get("p95_ms"):
+        result["check"] = {
+            "in_flight_chats": ctx.users,
+            "p95_ratio": round(loaded.get("p95_ms", 0) / alone["p95_ms"], 2),
+        }
+    return result
+
+
+async def user_cache(ctx: ScenarioContext) -> ScenarioResult:
+    """GET /users/me throughput with the authenticated-user cache on and off."""
+    if not ctx.in_process:
+        return {"skipped": "needs the in-process app to toggle USER_CACHE_ENABLED"}
+
+    from app.core.config import settings
+
+    recorder = LatencyRecorder()
+    client = ctx.client(recorder)
+    walls = {}
+    original = settings.USER_CACHE_ENABLED
+
+    try:
+        for enabled in (True, False):
+            settings.USER_CACHE_ENABLED = enabled
+            clear_app_caches()
+            label = "cache on" if enabled else "cache off"
+
+            async def user(index: int, rng: random.Random, label=label):
+                await client.get("/users/me", name=f"GET /users/me ({label})", token=ctx.student(rng).token)
+
+            walls[label] = await run_virtual_users(ctx.users, ctx.duration / 2, user, seed=10)
+    finally:
+        settings.USER_CACHE_ENABLED = original
+
+    result = recorder.summary(sum(walls.values()))
+    # Per-phase throughput (the summary divides by the combined wall time)
+    for label, wall in walls.items():
+        endpoint = result["endpoints"][f"GET /users/me ({label})"]
+        endpoint["rps"] = round(endpoint["requests"] / wall, 2)
+    on = result["endpoints"]["GET /users/me (cache on)"]["rps"]
+    off = result["endpoints"]["GET /users/me (cache off)"]["rps"]
+    result["check"] = {"speedup": round(on / off, 2) if off else None}
+    return result
+
+
+# Run order matters: admin_search adds 100k users, so it goes last
+SCENARIOS: Dict[str, Callable[[ScenarioContext], Awaitable[ScenarioResult]]] = {
+    "login_storm": login_storm,
+    "forum_scroll": forum_scroll,
+    "forum_engage": forum_engage,
+    "like_storm": like_storm,
+    "chat": chat,
+    "admin_dashboard": admin_dashboard,
+    "chat_isolation": chat_isolation,
+    "user_cache": user_cache,
+    "admin_search": admin_search,
+}
+
+
+def select_scenarios(names: Optional[List[str]]) -> List[str]:
+    """Scenario names in run order; unknown names are an error."""
+    if not names:
+        return list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        raise SystemExit(f"Unknown scenario(s): {', '.join(unknown)}. Available: {', '.join(SCENARIOS)}")
+    return [name for name in SCENARIOS if name in names]
@@ -0,0 +1,236 @@
+"""
+MindSupport Benchmarks - Synthetic Data
+Seeds the benchmark database with students, posts, comments and reports
+"""
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List
+import random
+
+from bson import ObjectId
+
+from app.core.security import create_access_token, get_password_hash
+from app.db.mongodb import (
+    get_database,
+    get_users_collection,
+    get_posts_collection,
+    get_comments_collection,
+    get_reports_collection
+)
+from app.models.forum import COMMENT_PREVIEW_SIZE, MoodType
+from app.services.stats_service import reconcile_stats
+from app.services.user_search import build_search_fields
+
+
+BENCH_PASSWORD = "benchmark123"
+
+FIRST_NAMES = [
+    "Dilla", "Rahma", "Budi", "Siti", "Agus", "Dewi", "Rizky", "Putri", "Fajar", "Ayu",
+    "Andi", "Intan", "Bayu", "Nadia", "Yoga", "Sari", "Dimas", "Lestari", "Hendra", "Maya",
+    "Arif", "Nur", "Galih", "Wulan", "Teguh", "Citra", "Eko", "Fitri", "Joko", "Rina",
+]
+LAST_NAMES = [
+    "Pratama", "Saputra", "Wijaya", "Lestari", "Hidayat", "Kurniawan", "Santoso", "Rahayu",
+    "Nugroho", "Permata", "Setiawan", "Utami", "Siregar", "Nasution", "Simanjuntak", "Harahap",
+    "Gunawan", "Anggraini", "Firmansyah", "Maharani",
+]
+
+POST_TEMPLATES = [
+    "Akhir-akhir ini aku merasa {feeling} karena {cause}. Ada yang pernah ngalamin hal yang sama?",
+    "Hari ini {cause}, rasanya {feeling} banget. Gimana cara kalian menghadapinya?",
+    "Mau cerita aja, aku lagi {feeling}. Semua gara-gara {cause}.",
+    "Akhirnya setelah {cause}, aku merasa {feeling}. Terima kasih buat yang selalu support!",
+]
+FEELINGS = ["sedih", "cemas", "capek", "bingung", "lega", "kesal", "senang", "overthinking"]
+CAUSES = [
+    "deadline tugas numpuk", "skripsi belum di-ACC", "nilai UTS turun", "berantem sama teman kos",
+    "kangen rumah", "organisasi yang melelahkan", "magang yang berat", "presentasi besok pagi",
+]
+COMMENTS = [
+    "Semangat ya, kamu pasti bisa!", "Aku juga pernah ngalamin, pelan-pelan aja.",
+    "Peluk jauh 🤗", "Coba istirahat dulu sebentar, jangan lupa makan.",
+    "Kamu nggak sendirian kok.", "Bangga sama kamu!",
+]
+
+
+@dataclass
+class BenchUser:
+    id: str
+    email: str
+    token: str
+
+
+@dataclass
+class SeedData:
+    users: List[BenchUser]
+    admin: BenchUser
+    post_ids: List[str]
+    hot_post_ids: List[str]  # Posts with long comment threads
+    report_ids: List[str] = field(default_factory=list)
+
+
+def _student(index: int, rng: random.Random, hashed_password: str, created_at: datetime) -> Dict:
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    full_name = f"{first} {last}"
+    email = f"{first.lower()}.{last.lower()}{index}@ui.ac.id"
+    nim = f"22{index:08d}"
+    return {
+        "email": email,
+        "hashed_password": hashed_password,
+        "full_name": full_name,
+        "nim": nim,
+        "search": build_search_fields(email, full_name, nim),
+        "anonymous_id": f"Anonim#{rng.randint(100, 9999)}",
+        "created_at": created_at,
+        "is_active": True,
+        "is_superuser": False,
+    }
+
+
+async def reset_database():
+    """Empty every collection but keep indexes and the migration history."""
+    database = get_database()
+    for name in await database.list_collection_names():
+        if name != "schema_migrations":
+            await database[name].delete_many({})
+
+
+def clear_app_caches():
+    """Drop the in-process caches so each scenario starts cold."""
+    from app.db.pagination import count_cache
+    from app.routers.users import user_cache
+    from app.services.forum_cache import forum_cache
+    from app.services.openai_service import openai_service
+
+    count_cache.clear()
+    user_cache.clear()
+    forum_cache.feeds.clear()
+    forum_cache.posts.clear()
+    if openai_service.cache is not None:
+        openai_service.cache.clear()
+
+
+async def seed(
+    users: int = 500,
+    posts: int = 2000,
+    hot_posts: int = 10,
+    hot_post_comments: int = 300,
+    reports: int = 200,
+    seed_value: int = 42
+) -> SeedData:
+    """Insert a realistic campus dataset and mint tokens for every user."""
+    rng = random.Random(seed_value)
+    now = datetime.utcnow()
+    # One bcrypt hash shared by everyone keeps seeding fast
+    hashed_password = get_password_hash(BENCH_PASSWORD)
+
+    # Users (plus one admin)
+    user_docs = [
+        _student(index, rng, hashed_password, now - timedelta(minutes=index))
+        for index in range(users)
+    ]
+    admin_doc = _student(users, rng, hashed_password, now - timedelta(days=365))
+    admin_doc.update(email="admin.bench@ui.ac.id", is_superuser=True)
+    admin_doc["search"] = build_search_fields(admin_doc["email"], admin_doc["full_name"], admin_doc["nim"])
+    await get_users_collection().insert_many(user_docs + [admin_doc])
+
+    # Posts, newest first; the first `hot_posts` get long threads
+    post_docs = []
+    for index in range(posts):
+        author = rng.choice(user_docs)
+        template = rng.choice(POST_TEMPLATES)
+        post_docs.append({
+            "_id": ObjectId(),
+            "user_id": str(author["_id"]),
+            "anonymous_id": author["anonymous_id"],
+            "mood": rng.choice(list(MoodType)).value,
+            "content": template.format(feeling=rng.choice(FEELINGS), cause=rng.choice(CAUSES)),
+            "created_at": now - timedelta(minutes=5 * index),
+            "like_count": 0,
+            "comment_count": 0,
+            "comment_preview": [],
+            "is_deleted": False,
+        })
+
+    comment_docs = []
+    for index, post in enumerate(post_docs):
+        count = hot_post_comments if index < hot_posts else rng.randint(0, 8)
+        comments = []
+        for offset in range(count):
+            author = rng.choice(user_docs)
+            comments.append({
+                "comment_id": str(ObjectId()),
+                "user_id": str(author["_id"]),
+                "anonymous_id": author["anonymous_id"],
+                "content": rng.choice(COMMENTS),
+                "created_at": post["created_at"] + timedelta(seconds=30 * (offset + 1)),
+            })
+        post["comment_count"] = len(comments)
+        post["comment_preview"] = comments[:COMMENT_PREVIEW_SIZE]
+        comment_docs.extend({**comment, "post_id": str(post["_id"])} for comment in comments)
+
+    await get_posts_collection().insert_many(post_docs)
+    for start in range(0, len(comment_docs), 5000):
+        await get_comments_collection().insert_many(comment_docs[start:start + 5000])
+
+    # Pending reports for the admin queue
+    report_docs = [
+        {
+            "post_id": str(rng.choice(post_docs)["_id"]),
+            "reporter_id": str(rng.choice(user_docs)["_id"]),
+            "reason": rng.choice(["Spam", "Konten tidak pantas", "Pelecehan"]),
+            "note": None,
+            "created_at": now - timedelta(minutes=index),
+            "status": "pending",
+        }
+        for index in range(reports)
+    ]
+    if report_docs:
+        await get_reports_collection().insert_many(report_docs)
+
+    await reconcile_stats()
+    clear_app_caches()
+
+    def bench_user(doc: Dict) -> BenchUser:
+        user_id = str(doc["_id"])
+        return BenchUser(id=user_id, email=doc["email"], token=create_access_token({"sub": user_id}))
+
+    post_ids = [str(post["_id"]) for post in post_docs]
+    return SeedData(
+        users=[bench_user(doc) for doc in user_docs],
+        admin=bench_user(admin_doc),
+        post_ids=post_ids,
+        hot_post_ids=post_ids[:hot_posts],
+        report_ids=[str(doc["_id"]) for doc in report_docs],
+    )
+
+
+async def seed_search_users(count: int, seed_value: int = 7) -> List[Dict]:
+    """
+    Add `count` synthetic students for the admin search benchmark.
+
+    Returns a small sample of the inserted users to build queries from.
+    """
+    rng = random.Random(seed_value)
+    users = get_users_collection()
+    hashed_password = get_password_hash(BENCH_PASSWORD)
+    now = datetime.utcnow()
+    offset = 1_000_000  # Keep emails/NIMs distinct from the main seed
+
+    sample_every = max(1, count // 100)
+    sample = []
+    batch = []
+    for index in range(count):
+        doc = _student(offset + index, rng, hashed_password, now - timedelta(seconds=index))
+        batch.append(doc)
+        if index % sample_every == 0:
+            sample.append(doc)
+        if len(batch) == 5000:
+            await users.insert_many(batch)
+            batch = []
+    if batch:
+        await users.insert_many(batch)
+
+    await reconcile_stats()
+    clear_app_caches()
+    return sample
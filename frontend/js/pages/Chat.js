@@ -121,16 +121,20 @@ const Chat = {
       this.isTyping = true;
 
       try {
-        // Call real backend API
-        const response = await api.sendMessage(userMessage, this.sessionId);
+        // Stream the reply from the backend so text appears as it is generated
+        let aiMessage = null;
+        const response = await api.sendMessageStream(userMessage, this.sessionId, (chunk, fullContent) => {
+          if (!aiMessage) {
+            this.messages.push({ sender: 'ai', content: '' });
+            aiMessage = this.messages[this.messages.length - 1];
+            this.isTyping = false;
+          }
+          aiMessage.content = fullContent;
+          this.scrollToBottom();
+        });
 
         // Store session ID for context continuity
         this.sessionId = response.session_id;
-
-        this.messages.push({
-          sender: 'ai',
-          content: response.content
-        });
       } catch (error) {
         this.messages.push({
           sender: 'ai',
@@ -49,7 +49,7 @@ const Forum = {
                     {{ post.supported ? '❤️' : '🤍' }} {{ post.supportCount }} support
                   </span>
                   <span class="post-stat" @click="viewPost(post)">
-                    💬 {{ post.comments.length }} komentar
+                    💬 {{ post.commentCount }} komentar
                   </span>
                   <span class="post-stat">
                     🕐 {{ formatTime(post.createdAt) }}
@@ -62,12 +62,12 @@ const Forum = {
               
               <!-- Comments Preview -->
               <div v-if="post.comments.length > 0" class="comments-preview">
-                <div v-for="comment in post.comments.slice(0, 2)" :key="comment.id" class="comment-item">
+                <div v-for="comment in (post.expanded ? post.comments : post.comments.slice(0, 2))" :key="comment.id" class="comment-item">
                   <span class="comment-author">{{ comment.anonymousId }}</span>
                   <span class="comment-text">{{ comment.content }}</span>
                 </div>
-                <a v-if="post.comments.length > 2" href="#" @click.prevent="viewPost(post)" class="view-more">
-                  Lihat {{ post.comments.length - 2 }} komentar lainnya...
+                <a v-if="hasMoreComments(post)" href="#" @click.prevent="viewPost(post)" class="view-more">
+                  Lihat {{ post.commentCount - (post.expanded ? post.comments.length : Math.min(post.comments.length, 2)) }} komentar lainnya...
                 </a>
               </div>
               
@@ -221,12 +221,22 @@ const Forum = {
         'Mengandung data pribadi',
         'Lainnya'
       ],
-      userAnonymousId: 'Loading...'
+      userAnonymousId: 'Loading...',
+      eventsController: null,
+      reconnectTimer: null,
+      reconnectDelay: 1000,
+      unmounting: false
     }
   },
   async created() {
     await this.loadPosts();
     this.loadUserProfile();
+    this.subscribeToUpdates();
+  },
+  beforeUnmount() {
+    this.unmounting = true;
+    clearTimeout(this.reconnectTimer);
+    if (this.eventsController) this.eventsController.abort();
   },
   computed: {
     filteredPosts() {
@@ -283,11 +293,14 @@ const Forum = {
           supportCount: post.like_count,
           supported: post.is_liked,
           createdAt: new Date(post.created_at),
+          commentCount: post.comment_count,
           comments: post.comments.map(c => ({
             id: c.comment_id,
             anonymousId: c.anonymous_id,
             content: c.content
           })),
+          commentsCursor: null,
+          expanded: false,
           newComment: ''
         }));
       } catch (error) {
@@ -297,6 +310,64 @@ const Forum = {
       }
     },
 
+    // Apply small live deltas instead of re-polling the feed
+    subscribeToUpdates() {
+      this.eventsController = api.subscribeForumEvents((event, payload) => {
+        this.reconnectDelay = 1000;
+        if (event === 'post_created') {
+          const post = payload.post;
+          if (this.posts.some(p => p.id === post.id)) return;
+          this.posts.unshift({
+            id: post.id,
+            anonymousId: post.anonymous_id,
+            mood: post.mood,
+            content: post.content,
+            supportCount: post.like_count,
+            supported: false,
+            createdAt: new Date(post.created_at),
+            commentCount: 0,
+            comments: [],
+            commentsCursor: null,
+            expanded: false,
+            newComment: ''
+          });
+        } else if (event === 'post_deleted') {
+          this.posts = this.posts.filter(p => p.id !== payload.post_id);
+        } else if (event === 'post_liked') {
+          const post = this.posts.find(p => p.id === payload.post_id);
+          if (post) post.supportCount = payload.like_count;
+        } else if (event === 'comment_added') {
+          const post = this.posts.find(p => p.id === payload.post_id);
+          if (post && !post.comments.some(c => c.id === payload.comment.comment_id)) {
+            post.commentCount++;
+            post.comments.push({
+              id: payload.comment.comment_id,
+              anonymousId: payload.comment.anonymous_id,
+              content: payload.comment.content
+            });
+          }
+        }
+        // 'evicted' needs nothing here: the server closes the stream right after
+      }, {
+        onClose: () => this.scheduleReconnect()
+      });
+    },
+
+    // Any drop (eviction, server restart, network error) may have missed
+    // events, so reconnect with exponential backoff and reload the feed
+    scheduleReconnect() {
+      if (this.unmounting) return;
+      const delay = this.reconnectDelay;
+      this.reconnectDelay = Math.min(delay * 2, 30000);
+
+      clearTimeout(this.reconnectTimer);
+      this.reconnectTimer = setTimeout(() => {
+        if (this.unmounting) return;
+        this.loadPosts();
+        this.subscribeToUpdates();
+      }, delay + Math.random() * delay / 2);
+    },
+
     async loadUserProfile() {
       try {
         const user = await api.getProfile();
@@ -319,8 +390,30 @@ const Forum = {
       }
     },
 
-    viewPost(post) {
-      console.log('View post:', post.id);
+    hasMoreComments(post) {
+      if (post.expanded) return !!post.commentsCursor;
+      return post.commentCount > 2;
+    },
+
+    // Expand the comment list, loading further pages on demand
+    async viewPost(post) {
+      try {
+        const response = await api.getComments(post.id, post.expanded ? post.commentsCursor : null);
+        const comments = post.expanded ? post.comments : [];
+        for (const c of response.comments) {
+          if (comments.some(existing => existing.id === c.comment_id)) continue;
+          comments.push({
+            id: c.comment_id,
+            anonymousId: c.anonymous_id,
+            content: c.content
+          });
+        }
+        post.comments = comments;
+        post.commentsCursor = response.next_cursor;
+        post.expanded = true;
+      } catch (error) {
+        console.error('Failed to load comments:', error);
+      }
     },
 
     async addComment(post) {
@@ -328,11 +421,14 @@ const Forum = {
 
       try {
         const result = await api.addComment(post.id, post.newComment);
-        post.comments.push({
-          id: result.comment_id,
-          anonymousId: result.anonymous_id,
-          content: result.content
-        });
+        if (!post.comments.some(c => c.id === result.comment_id)) {
+          post.commentCount++;
+          post.comments.push({
+            id: result.comment_id,
+            anonymousId: result.anonymous_id,
+            content: result.content
+          });
+        }
         post.newComment = '';
       } catch (error) {
         console.error('Failed to add comment:', error);
@@ -345,7 +441,7 @@ const Forum = {
 
       try {
         const result = await api.createPost(this.newPost.mood, this.newPost.content);
-        this.posts.unshift({
+        if (!this.posts.some(p => p.id === result.id)) this.posts.unshift({
           id: result.id,
           anonymousId: result.anonymous_id,
           mood: result.mood,
@@ -353,7 +449,10 @@ const Forum = {
           supportCount: 0,
           supported: false,
           createdAt: new Date(result.created_at),
+          commentCount: 0,
           comments: [],
+          commentsCursor: null,
+          expanded: false,
           newComment: ''
         });
         this.newPost = { mood: '', content: '' };
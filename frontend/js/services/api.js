@@ -147,6 +147,74 @@ class ApiService {
         });
     }
 
+    // Open a Server-Sent Events stream and call onEvent(event, payload) per frame
+    async streamEvents(endpoint, options = {}, onEvent = () => {}) {
+        const response = await fetch(`${this.baseUrl}${endpoint}`, {
+            ...options,
+            headers: this.getHeaders(),
+        });
+
+        if (response.status === 401) {
+            localStorage.removeItem('token');
+            localStorage.removeItem('user');
+            window.location.hash = '#/login';
+            throw new Error('Sesi telah berakhir. Silakan login kembali.');
+        }
+
+        if (!response.ok || !response.body) {
+            const data = await response.json().catch(() => ({}));
+            throw new Error(data.detail || 'Terjadi kesalahan');
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const frame = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+
+                let event = 'message';
+                let data = '';
+                for (const line of frame.split('\n')) {
+                    if (line.startsWith('event: ')) event = line.slice(7);
+                    else if (line.startsWith('data: ')) data += line.slice(6);
+                }
+                if (!data) continue;  // Comments / heartbeats
+                onEvent(event, JSON.parse(data));
+            }
+        }
+    }
+
+    // Stream AI reply via Server-Sent Events; onToken is called for each chunk
+    async sendMessageStream(content, sessionId = null, onToken = () => {}) {
+        let fullContent = '';
+        let result = { session_id: sessionId };
+
+        await this.streamEvents('/chat/message/stream', {
+            method: 'POST',
+            body: JSON.stringify({
+                content: content,
+                session_id: sessionId,
+            }),
+        }, (event, payload) => {
+            if (event === 'token') {
+                fullContent += payload.content;
+                onToken(payload.content, fullContent);
+            } else {
+                result = { ...result, ...payload };
+            }
+        });
+
+        return { ...result, content: fullContent };
+    }
+
     async getChatHistory() {
         return this.request('/chat/history');
     }
@@ -169,6 +237,25 @@ class ApiService {
 
     // ==================== FORUM ====================
 
+    // Subscribe to live forum updates; returns an AbortController to unsubscribe.
+    // onClose(error) runs when the stream ends or fails, but not when aborted.
+    subscribeForumEvents(onEvent, { mood = null, onClose = () => {} } = {}) {
+        const controller = new AbortController();
+        const endpoint = mood ? `/forum/events?mood=${encodeURIComponent(mood)}` : '/forum/events';
+
+        this.streamEvents(endpoint, { signal: controller.signal }, onEvent)
+            .then(() => {
+                if (!controller.signal.aborted) onClose(null);
+            })
+            .catch(error => {
+                if (error.name === 'AbortError' || controller.signal.aborted) return;
+                console.error('Forum events error:', error);
+                onClose(error);
+            });
+
+        return controller;
+    }
+
     async getPosts(page = 1, pageSize = 20, mood = null) {
         let url = `/forum/posts?page=${page}&page_size=${pageSize}`;
         if (mood) {
@@ -181,6 +268,14 @@ class ApiService {
         return this.request(`/forum/posts/${postId}`);
     }
 
+    async getComments(postId, cursor = null, pageSize = 20) {
+        let url = `/forum/posts/${postId}/comments?page_size=${pageSize}`;
+        if (cursor) {
+            url += `&cursor=${encodeURIComponent(cursor)}`;
+        }
+        return this.request(url);
+    }
+
     async createPost(mood, content) {
         return this.request('/forum/posts', {
             method: 'POST',